@@ -0,0 +1,65 @@
+"""
+Tablas de amortización de los créditos.
+
+Regla del banco: cada mes se paga capital = saldo / plazo pendiente más
+interés = saldo * tasa mensual. Como el saldo baja siempre lo mismo, el abono a
+capital es constante y el interés decrece linealmente, así que la tabla completa
+se puede construir con operaciones vectoriales de NumPy, tanto para una cuenta
+como para miles a la vez (proyecciones de cartera).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+TablaAmortizacion = namedtuple("TablaAmortizacion", [
+    "mes", "saldoInicial", "capital", "interes", "cuota", "saldoFinal",
+])
+
+
+def cuotaMes(saldo, plazoPendiente, interes):
+    """
+    Cuota del próximo mes: (capital, interés, total). Es la primera fila de la tabla.
+    """
+    capital = saldo / plazoPendiente
+    interes_mes = saldo * (interes / 100)
+    return capital, interes_mes, capital + interes_mes
+
+
+def tablaAmortizacion(saldo, plazoPendiente, interes):
+    """
+    Tabla restante de un crédito como arreglos NumPy de largo plazoPendiente.
+    """
+    plazo = max(int(plazoPendiente), 0)
+    mes = np.arange(1, plazo + 1)
+    if plazo == 0:
+        vacio = np.zeros(0)
+        return TablaAmortizacion(mes, vacio, vacio, vacio, vacio, vacio)
+    capital = np.full(plazo, saldo / plazo)
+    saldo_inicial = saldo - (mes - 1) * capital
+    cuota_interes = saldo_inicial * (interes / 100)
+    return TablaAmortizacion(
+        mes, saldo_inicial, capital, cuota_interes, capital + cuota_interes, saldo_inicial - capital
+    )
+
+
+def tablasAmortizacion(saldos, plazos, intereses):
+    """
+    Versión por lotes: recibe arreglos de N créditos y retorna una TablaAmortizacion
+    cuyos campos son matrices N x (plazo máximo). Los meses que sobran después del
+    plazo de cada crédito quedan en cero.
+    """
+    saldos = np.asarray(saldos, dtype=float)[:, None]
+    plazos = np.asarray(plazos, dtype=np.int64)[:, None]
+    tasas = np.asarray(intereses, dtype=float)[:, None] / 100
+    maximo = int(plazos.max()) if plazos.size else 0
+
+    mes = np.arange(1, maximo + 1)[None, :]
+    vigente = mes <= plazos
+    capital = np.divide(saldos, plazos, out=np.zeros_like(saldos), where=plazos > 0)
+    capital = np.where(vigente, capital, 0.0)
+    saldo_inicial = np.where(vigente, saldos - (mes - 1) * capital, 0.0)
+    cuota_interes = saldo_inicial * tasas
+    return TablaAmortizacion(
+        np.broadcast_to(mes, vigente.shape), saldo_inicial, capital, cuota_interes,
+        capital + cuota_interes, np.where(vigente, saldo_inicial - capital, 0.0)
+    )
@@ -0,0 +1,387 @@
+"""
+Archivo histórico del libro de Transacciones en bases de datos por año.
+
+Los movimientos de meses cerrados (y todos los de créditos ya pagados, con
+plazoPendiente = 0) se trasladan de 'basemibanco.db' a archivos hermanos
+'basemibanco_archivo_<año>.db', según el año de fechaPago. Así la base caliente,
+la que usa el camino de pagos, solo conserva los meses abiertos.
+
+El traslado corre en línea, por lotes pequeños, con su propia conexión y en dos
+pasos por lote: primero se copia el lote al archivo (INSERT OR IGNORE, con el
+mismo idTransaccion) y se confirma; después se borran de la base caliente solo
+las filas que ya están en el archivo. En modo WAL SQLite no garantiza que una
+transacción sobre varias bases adjuntas sea atómica entre ellas, así que este
+orden asegura que una caída nunca pierde movimientos: a lo sumo quedan
+duplicados que la siguiente corrida termina de mover.
+
+SQLite admite a lo sumo MAX_ADJUNTOS bases adjuntas, así que cuando hay más
+archivos anuales de los que caben junto a uno más, los años más antiguos se
+consolidan en 'basemibanco_archivo_anterior.db' (ver consolidarArchivos). El
+consolidado siempre guarda años anteriores al primer archivo anual, y lo que se
+archive de esos años va directo a él.
+
+La vista temporal TransaccionesHistoricas (ver adjuntarArchivos) une la base
+caliente con los archivos del rango de años pedido (todos, si no se indica).
+Quien lea movimientos de meses que pueden estar archivados debe ir por ahí, como
+historialCuenta, los estados de cuenta (recibos_pdf), los reportes y
+ServicioBanco.movimientosEntre (con lecturaHistorica). Los pagos siguen
+escribiendo solo en Transacciones.
+
+Notas:
+- El control de "un pago por mes" (cuentas.pagoRegistradoEnMes) mira la base
+  caliente y, si no encuentra el pago, el archivo del año (ver pagoArchivadoEnMes).
+- El resumen de cartera (ResumenCartera) no cambia: sus triggers no reaccionan a DELETE.
+
+Uso: python archivo_historico.py archivar [--hasta 2025-07] [--lote 2000] [--pausa 0.01]
+     python archivo_historico.py historial <idCuenta>
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sqlite3
+import time
+from collections import defaultdict, namedtuple
+from contextlib import contextmanager
+from datetime import date
+
+from basedatos import PRAGMAS, RUTA_BD, TIEMPO_ESPERA_MS, Sesion, conexionLectura
+
+MESES_ABIERTOS = 3
+TAMANO_LOTE = 2000
+MAX_ADJUNTOS = 10           # límite por defecto de SQLite (SQLITE_MAX_ATTACHED)
+ANTERIOR = "anterior"       # en lugar del año, nombre del archivo consolidado
+
+ResultadoArchivo = namedtuple("ResultadoArchivo", [
+    "movidas", "lotes", "porAnio", "segundos", "filasPorSegundo",
+])
+
+SQL_CANDIDATAS = """
+    SELECT T.idTransaccion, T.idCuentaCredito, T.fechaPago, T.valorPagado
+    FROM main.Transacciones T
+    WHERE T.idTransaccion > :ultimo
+      AND T.fechaPago GLOB '[0-9][0-9][0-9][0-9]-*'
+      AND (
+          T.mesPago < :corte
+          OR T.idCuentaCredito IN (
+              SELECT PC.idCuentaCredito
+              FROM main.ProductosContratados PC
+              JOIN main.PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+              WHERE P.TipoProducto = 1 AND PC.plazoPendiente = 0
+          )
+      )
+    ORDER BY T.idTransaccion
+    LIMIT :limite
+"""
+
+
+def rutaArchivo(anio, ruta=RUTA_BD):
+    """
+    Ruta del archivo del año, o del consolidado si 'anio' es ANTERIOR.
+    """
+    base, extension = os.path.splitext(ruta)
+    return f"{base}_archivo_{anio}{extension or '.db'}"
+
+
+def archivosDisponibles(ruta=RUTA_BD):
+    """
+    [(año, ruta)] de los archivos anuales que existen junto a la base, en orden
+    (sin el consolidado).
+    """
+    base, extension = os.path.splitext(ruta)
+    encontrados = []
+    for candidato in glob.glob(f"{glob.escape(base)}_archivo_*{extension or '.db'}"):
+        coincidencia = re.search(r"_archivo_(\d{4})\.[^.]*$", candidato)
+        if coincidencia:
+            encontrados.append((int(coincidencia.group(1)), candidato))
+    return sorted(encontrados)
+
+
+def archivosEnRango(ruta=RUTA_BD, desde=None, hasta=None):
+    """
+    [(año o ANTERIOR, ruta)] de los archivos que pueden tener movimientos de los
+    años 'desde' a 'hasta' (inclusive; None es sin límite). El consolidado entra
+    si el rango llega hasta el primer archivo anual.
+    """
+    anuales = archivosDisponibles(ruta)
+    archivos = []
+    anterior = rutaArchivo(ANTERIOR, ruta)
+    if os.path.exists(anterior) and (desde is None or not anuales or desde <= anuales[0][0]):
+        archivos.append((ANTERIOR, anterior))
+    archivos += [
+        (anio, archivo) for anio, archivo in anuales
+        if (desde is None or anio >= desde) and (hasta is None or anio <= hasta)
+    ]
+    return archivos
+
+
+def _adjuntar(con, anio, ruta):
+    """
+    Adjunta el archivo del año (o el consolidado) como 'archivo_<año>', creándolo
+    si no existe, y retorna el alias.
+    """
+    alias = f"archivo_{anio}"
+    adjuntas = {fila[1] for fila in con.execute("PRAGMA database_list")}
+    if alias not in adjuntas:
+        con.execute("ATTACH DATABASE ? AS " + alias, (rutaArchivo(anio, ruta),))
+    return alias
+
+
+def _prepararArchivo(con, alias):
+    con.execute(f"PRAGMA {alias}.journal_mode=WAL")
+    con.execute(f'''
+        CREATE TABLE IF NOT EXISTS {alias}.Transacciones(
+            idTransaccion INTEGER PRIMARY KEY,
+            idCuentaCredito INTEGER,
+            fechaPago TEXT,
+            valorPagado REAL
+        )
+    ''')
+    con.execute(f'''
+        CREATE INDEX IF NOT EXISTS {alias}.idxArchivoCuentaFecha
+        ON Transacciones(idCuentaCredito, fechaPago, valorPagado)
+    ''')
+
+
+def mesCorte(mesesAbiertos=MESES_ABIERTOS, hoy=None):
+    """
+    Primer mes que sigue en la base caliente (YYYY-MM): se archiva todo lo anterior.
+    """
+    hoy = hoy or date.today()
+    total = hoy.year * 12 + hoy.month - 1 - (mesesAbiertos - 1)
+    return f"{total // 12:04d}-{total % 12 + 1:02d}"
+
+
+def _primerAnual(ruta):
+    """
+    Primer año que se archiva en su propio archivo: los anteriores van al
+    consolidado. None si todavía no hay consolidado.
+    """
+    if not os.path.exists(rutaArchivo(ANTERIOR, ruta)):
+        return None
+    anuales = archivosDisponibles(ruta)
+    return anuales[0][0] if anuales else float("inf")
+
+
+def _desadjuntarArchivos(con):
+    for fila in con.execute("PRAGMA database_list").fetchall():
+        if fila[1].startswith("archivo_"):
+            con.execute("DETACH DATABASE " + fila[1])
+
+
+def consolidarArchivos(con, ruta=RUTA_BD):
+    """
+    Si hay más archivos anuales de los que caben adjuntos junto al consolidado,
+    traslada los más antiguos a él y borra esos archivos. Igual que el traslado
+    desde la base caliente, primero copia y confirma y después vacía el archivo
+    anual, así que una caída deja a lo sumo duplicados. Retorna los años
+    consolidados. 'con' es una conexión sin transacción abierta.
+    """
+    anuales = archivosDisponibles(ruta)
+    sobrantes = anuales[:max(0, len(anuales) - (MAX_ADJUNTOS - 1))]
+    for anio, archivo in sobrantes:
+        _desadjuntarArchivos(con)
+        destino = _adjuntar(con, ANTERIOR, ruta)
+        _prepararArchivo(con, destino)
+        origen = _adjuntar(con, anio, ruta)
+        for sql in (f"INSERT OR IGNORE INTO {destino}.Transacciones SELECT * FROM {origen}.Transacciones",
+                    f"DELETE FROM {origen}.Transacciones"):
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                con.execute(sql)
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+        con.execute("DETACH DATABASE " + origen)
+        try:
+            for sufijo in ("", "-wal", "-shm"):
+                if os.path.exists(archivo + sufijo):
+                    os.remove(archivo + sufijo)
+        except OSError:
+            # Un lector lo tiene abierto (Windows): queda vacío y la próxima corrida lo borra
+            pass
+    return [anio for anio, _ in sobrantes]
+
+
+def archivarTransacciones(ruta=RUTA_BD, corte=None, tamanoLote=TAMANO_LOTE, pausa=0.0):
+    """
+    Traslada a los archivos anuales los movimientos de meses anteriores a 'corte'
+    (YYYY-MM) y los de créditos pagados. Retorna un ResultadoArchivo.
+    'pausa' (segundos) se espera entre lotes para dejar pasar a los pagos en línea.
+    """
+    corte = corte or mesCorte()
+    if not re.fullmatch(r"\d{4}-\d{2}", corte):
+        raise ValueError(f"Mes inválido: {corte!r}. Use el formato YYYY-MM.")
+
+    con = sqlite3.connect(ruta, timeout=TIEMPO_ESPERA_MS / 1000, isolation_level=None)
+    for pragma in PRAGMAS:
+        con.execute(pragma)
+
+    inicio = time.perf_counter()
+    movidas = lotes = 0
+    por_anio = defaultdict(int)
+    preparados = set()
+    ultimo = 0
+    try:
+        consolidarArchivos(con, ruta)
+        while True:
+            filas = con.execute(SQL_CANDIDATAS, {"ultimo": ultimo, "corte": corte, "limite": tamanoLote}).fetchall()
+            if not filas:
+                break
+            ultimo = filas[-1][0]
+            por_archivo = defaultdict(list)
+            primer_anual = _primerAnual(ruta)
+            for fila in filas:
+                anio = int(fila[2][:4])
+                por_archivo[ANTERIOR if primer_anual is not None and anio < primer_anual else anio].append(fila)
+
+            # ATTACH/DETACH no se pueden hacer dentro de una transacción
+            adjuntas = [f[1] for f in con.execute("PRAGMA database_list") if f[1].startswith("archivo_")]
+            if len(adjuntas) + len(por_archivo) > MAX_ADJUNTOS - 1:
+                for alias in adjuntas:
+                    con.execute("DETACH DATABASE " + alias)
+            alias_de = {anio: _adjuntar(con, anio, ruta) for anio in por_archivo}
+            for alias in alias_de.values():
+                if alias not in preparados:
+                    _prepararArchivo(con, alias)
+                    preparados.add(alias)
+
+            # Paso 1: copiar al archivo y confirmar
+            con.execute("BEGIN")
+            try:
+                for anio, grupo in por_archivo.items():
+                    con.executemany(
+                        f"INSERT OR IGNORE INTO {alias_de[anio]}.Transacciones VALUES (?, ?, ?, ?)", grupo
+                    )
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+
+            # Paso 2: borrar de la base caliente lo que ya quedó archivado
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                for anio, grupo in por_archivo.items():
+                    cursor = con.execute(f"""
+                        DELETE FROM main.Transacciones
+                        WHERE idTransaccion IN (
+                            SELECT idTransaccion FROM {alias_de[anio]}.Transacciones
+                            WHERE idTransaccion IN (SELECT value FROM json_each(?))
+                        )
+                    """, (json.dumps([f[0] for f in grupo]),))
+                    por_anio[anio] += cursor.rowcount
+                    movidas += cursor.rowcount
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+
+            lotes += 1
+            consolidarArchivos(con, ruta)
+            if pausa:
+                time.sleep(pausa)
+    finally:
+        con.close()
+
+    segundos = time.perf_counter() - inicio
+    velocidad = movidas / segundos if segundos > 0 else 0.0
+    return ResultadoArchivo(movidas, lotes, dict(por_anio), segundos, velocidad)
+
+
+# === Consulta unificada ===
+
+def adjuntarArchivos(con, ruta=RUTA_BD, desde=None, hasta=None):
+    """
+    Adjunta a 'con' los archivos de los años 'desde' a 'hasta' (todos por
+    defecto, ver archivosEnRango) y crea la vista temporal TransaccionesHistoricas
+    (misma forma que Transacciones, sin mesPago) con la base caliente más esos
+    archivos. Retorna los años adjuntados.
+    """
+    archivos = archivosEnRango(ruta, desde, hasta)
+    if len(archivos) > MAX_ADJUNTOS:
+        raise ValueError(f"Hay {len(archivos)} archivos por adjuntar y SQLite admite {MAX_ADJUNTOS}; "
+                         "ejecute 'archivo_historico.py archivar' para consolidar los más antiguos.")
+    partes = ["SELECT idTransaccion, idCuentaCredito, fechaPago, valorPagado FROM main.Transacciones"]
+    for anio, _ in archivos:
+        alias = _adjuntar(con, anio, ruta)
+        partes.append(f"SELECT idTransaccion, idCuentaCredito, fechaPago, valorPagado FROM {alias}.Transacciones")
+    con.execute("DROP VIEW IF EXISTS temp.TransaccionesHistoricas")
+    con.execute("CREATE TEMP VIEW TransaccionesHistoricas AS " + " UNION ALL ".join(partes))
+    return [anio for anio, _ in archivos]
+
+
+@contextmanager
+def lecturaHistorica(bd, desde=None, hasta=None):
+    """
+    Como bd.lectura(), pero con una conexión propia de solo lectura que tiene
+    adjuntos los archivos de los años 'desde' a 'hasta' (todos por defecto) y la
+    vista TransaccionesHistoricas. Las sentencias quedan medidas en las métricas de 'bd'.
+    """
+    con = conexionLectura(bd.ruta)
+    try:
+        adjuntarArchivos(con, bd.ruta, desde, hasta)
+        yield Sesion(bd, con)
+    finally:
+        con.close()
+
+
+def pagoArchivadoEnMes(idCuenta, mes, ruta=RUTA_BD):
+    """
+    True si el archivo del año del mes 'YYYY-MM' (o el consolidado) tiene un
+    movimiento de la cuenta en ese mes. Sin archivos solo cuesta dos stat.
+    """
+    for anio in (int(mes[:4]), ANTERIOR):
+        archivo = rutaArchivo(anio, ruta)
+        if not os.path.exists(archivo):
+            continue
+        con = conexionLectura(archivo)
+        try:
+            if con.execute("""
+                SELECT 1 FROM Transacciones
+                WHERE idCuentaCredito = ? AND fechaPago BETWEEN ? AND ? LIMIT 1
+            """, (idCuenta, mes + "-01", mes + "-31")).fetchone() is not None:
+                return True
+        finally:
+            con.close()
+    return False
+
+
+def historialCuenta(idCuenta, ruta=RUTA_BD):
+    """
+    Todos los movimientos de la cuenta (calientes y archivados), por fecha:
+    [(idTransaccion, fechaPago, valorPagado)].
+    """
+    con = conexionLectura(ruta)
+    try:
+        adjuntarArchivos(con, ruta)
+        return con.execute("""
+            SELECT idTransaccion, fechaPago, valorPagado FROM TransaccionesHistoricas
+            WHERE idCuentaCredito = ?
+            ORDER BY fechaPago, idTransaccion
+        """, (idCuenta,)).fetchall()
+    finally:
+        con.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archivo histórico de Transacciones por año")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    archivar = ordenes.add_parser("archivar", help="Trasladar meses cerrados y créditos pagados")
+    archivar.add_argument("--hasta", help=f"Primer mes que se conserva (YYYY-MM); por defecto los últimos {MESES_ABIERTOS}")
+    archivar.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Movimientos por lote")
+    archivar.add_argument("--pausa", type=float, default=0.0, help="Segundos de espera entre lotes")
+    historial = ordenes.add_parser("historial", help="Historia completa de una cuenta")
+    historial.add_argument("idCuenta", type=int)
+    args = parser.parse_args()
+
+    if args.orden == "archivar":
+        r = archivarTransacciones(corte=args.hasta, tamanoLote=args.lote, pausa=args.pausa)
+        print(f"{r.movidas} movimientos archivados en {r.lotes} lotes, {r.segundos:.2f} s "
+              f"({r.filasPorSegundo:,.0f} filas/s)")
+        for anio, n in sorted(r.porAnio.items(), key=lambda e: str(e[0])):
+            print(f"  {anio}: {n} -> {rutaArchivo(anio)}")
+    else:
+        for id_transaccion, fecha, valor in historialCuenta(args.idCuenta):
+            print(f"{fecha:<12}{id_transaccion:>10}{valor:>18,.2f}")
@@ -0,0 +1,268 @@
+"""
+Capa de acceso a datos compartida por todas las vistas del Neobanco.
+
+En lugar de que cada ventana abra su propia conexión a 'basemibanco.db',
+todas usan una única instancia de BaseDatos (ver obtenerBD) que mantiene:
+
+- un escritor único, protegido por un candado, que abre sus transacciones
+  con BEGIN IMMEDIATE para no pelear por el candado de escritura de SQLite;
+- un conjunto de N lectores que, gracias al modo WAL, leen en paralelo sin
+  bloquear al escritor;
+- caché de sentencias preparadas por conexión y pragmas ajustados;
+- histogramas de latencia y filas por consulta, y del tiempo esperando el
+  escritor o un lector (ver estadisticas e instrumentacion.py).
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from instrumentacion import Metricas
+
+RUTA_BD = os.environ.get("NEOBANCO_BD", "basemibanco.db")
+NUM_LECTORES = 4
+CACHE_SENTENCIAS = 256
+TIEMPO_ESPERA_MS = 5000
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    f"PRAGMA busy_timeout={TIEMPO_ESPERA_MS}",
+    "PRAGMA cache_size=-16000",     # ~16 MB de caché de páginas por conexión
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class Sesion:
+    """
+    Envoltura liviana sobre una conexión del pool. Todas las sentencias que
+    pasan por aquí quedan medidas (latencia y filas) en las métricas de la BaseDatos.
+    """
+
+    def __init__(self, bd, con):
+        self.bd = bd
+        self.con = con
+
+    def ejecutar(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        cursor = None
+        try:
+            cursor = self.con.execute(sql, parametros)
+            return cursor
+        finally:
+            self.bd._registrar(sql, time.perf_counter() - inicio, _afectadas(cursor))
+
+    def ejecutarVarios(self, sql, filas):
+        inicio = time.perf_counter()
+        cursor = None
+        try:
+            cursor = self.con.executemany(sql, filas)
+            return cursor
+        finally:
+            self.bd._registrar(sql, time.perf_counter() - inicio, _afectadas(cursor))
+
+    def consultar(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        filas = ()
+        try:
+            filas = self.con.execute(sql, parametros).fetchall()
+            return filas
+        finally:
+            self.bd._registrar(sql, time.perf_counter() - inicio, len(filas))
+
+    def consultarUno(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        fila = None
+        try:
+            fila = self.con.execute(sql, parametros).fetchone()
+            return fila
+        finally:
+            self.bd._registrar(sql, time.perf_counter() - inicio, fila is not None)
+
+    def iterar(self, sql, parametros=(), tamano=1000):
+        """
+        Recorre el resultado por bloques de 'tamano' filas sin cargarlo entero en
+        memoria. Debe consumirse dentro del bloque 'with' que prestó la sesión.
+        """
+        inicio = time.perf_counter()
+        leidas = 0
+        try:
+            cursor = self.con.execute(sql, parametros)
+            while True:
+                filas = cursor.fetchmany(tamano)
+                if not filas:
+                    return
+                leidas += len(filas)
+                yield from filas
+        finally:
+            self.bd._registrar(sql, time.perf_counter() - inicio, leidas)
+
+
+def _afectadas(cursor):
+    # rowcount es -1 para las sentencias que no modifican filas
+    return max(cursor.rowcount, 0) if cursor is not None else 0
+
+
+class BaseDatos:
+    """
+    Pool de conexiones SQLite: un escritor y varios lectores sobre el mismo archivo.
+    No sirve para ':memory:' porque cada conexión vería una base distinta.
+
+    'sincronizacion' es el PRAGMA synchronous: con NORMAL (WAL) un commit no
+    espera al disco; con FULL cada commit hace fsync y queda durable al retornar.
+    """
+
+    def __init__(self, ruta=RUTA_BD, lectores=NUM_LECTORES, sincronizacion="NORMAL"):
+        self.ruta = ruta
+        self.sincronizacion = sincronizacion
+        self._candado_escritura = threading.Lock()
+        self._escritor = self._abrir()
+        self._lectores = queue.Queue()
+        for _ in range(lectores):
+            self._lectores.put(self._abrir(solo_lectura=True))
+        self._num_lectores = lectores
+        self.metricas = Metricas()
+        self._claves = {}
+
+    def _abrir(self, solo_lectura=False):
+        # isolation_level=None: las transacciones se abren de forma explícita
+        con = sqlite3.connect(
+            self.ruta,
+            timeout=TIEMPO_ESPERA_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=CACHE_SENTENCIAS,
+        )
+        for pragma in PRAGMAS:
+            con.execute(pragma)
+        con.execute(f"PRAGMA synchronous={self.sincronizacion}")
+        if solo_lectura:
+            con.execute("PRAGMA query_only=ON")
+        return con
+
+    # === Acceso a conexiones ===
+
+    @contextmanager
+    def lectura(self):
+        """
+        Presta un lector del pool mientras dure el bloque 'with'.
+        """
+        inicio = time.perf_counter()
+        con = self._lectores.get()
+        self.metricas.observar("espera", "lector", time.perf_counter() - inicio)
+        try:
+            yield Sesion(self, con)
+        finally:
+            self._lectores.put(con)
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Abre una transacción de escritura (BEGIN IMMEDIATE) con el escritor único.
+        Confirma al salir del bloque o revierte si ocurre una excepción.
+        """
+        inicio = time.perf_counter()
+        with self._candado_escritura:
+            con = self._escritor
+            con.execute("BEGIN IMMEDIATE")
+            # Candado del pool más el de SQLite (otro proceso escribiendo)
+            self.metricas.observar("espera", "escritor", time.perf_counter() - inicio)
+            try:
+                yield Sesion(self, con)
+            except BaseException:
+                if con.in_transaction:
+                    con.rollback()
+                raise
+            if con.in_transaction:
+                con.commit()
+
+    def consultar(self, sql, parametros=()):
+        with self.lectura() as sesion:
+            return sesion.consultar(sql, parametros)
+
+    def consultarUno(self, sql, parametros=()):
+        with self.lectura() as sesion:
+            return sesion.consultarUno(sql, parametros)
+
+    def ejecutar(self, sql, parametros=()):
+        """
+        Ejecuta una sola sentencia de escritura en su propia transacción y devuelve el cursor.
+        """
+        with self.transaccion() as sesion:
+            return sesion.ejecutar(sql, parametros)
+
+    # === Métricas ===
+
+    def _registrar(self, sql, segundos, filas=0):
+        clave = self._claves.get(sql)
+        if clave is None:
+            clave = self._claves.setdefault(sql, " ".join(sql.split()))
+        self.metricas.observar("sql", clave, segundos, filas)
+
+    def estadisticas(self):
+        """
+        Retorna la latencia acumulada por consulta, ordenada por tiempo total.
+        Los percentiles salen del histograma, así que son aproximados por arriba.
+        """
+        filas = [
+            {
+                "sql": sql,
+                "llamadas": h.llamadas,
+                "total_ms": h.total * 1000,
+                "promedio_ms": h.total * 1000 / h.llamadas,
+                "p50_ms": h.percentil(50) * 1000,
+                "p99_ms": h.percentil(99) * 1000,
+                "maximo_ms": h.maximo * 1000,
+                "filas": h.filas,
+            }
+            for (familia, sql), h in self.metricas.instantanea().items() if familia == "sql"
+        ]
+        filas.sort(key=lambda f: f["total_ms"], reverse=True)
+        return filas
+
+    def reiniciarEstadisticas(self):
+        self.metricas.reiniciar()
+
+    def cerrar(self):
+        with self._candado_escritura:
+            self._escritor.close()
+        for _ in range(self._num_lectores):
+            self._lectores.get().close()
+
+
+def conexionLectura(ruta=RUTA_BD):
+    """
+    Conexión suelta de solo lectura (mode=ro) para procesos por lotes que no
+    necesitan el pool, por ejemplo los trabajadores de un multiprocessing.Pool.
+    """
+    con = sqlite3.connect(f"file:{ruta}?mode=ro", uri=True, timeout=TIEMPO_ESPERA_MS / 1000,
+                          cached_statements=CACHE_SENTENCIAS)
+    for pragma in PRAGMAS[1:]:      # journal_mode no se puede fijar en solo lectura
+        con.execute(pragma)
+    return con
+
+
+# === Instancia compartida ===
+
+_bd = None
+_candado_bd = threading.Lock()
+
+
+def obtenerBD():
+    """
+    Retorna la BaseDatos compartida del proceso, creándola en el primer uso.
+    """
+    global _bd
+    with _candado_bd:
+        if _bd is None:
+            _bd = BaseDatos()
+        return _bd
+
+
+def cerrarBD():
+    global _bd
+    with _candado_bd:
+        if _bd is not None:
+            _bd.cerrar()
+            _bd = None
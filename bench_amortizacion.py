@@ -0,0 +1,64 @@
+"""
+Benchmark: tablas de amortización por lotes con NumPy contra un ciclo Python por crédito.
+
+Uso: python bench_amortizacion.py [--creditos 20000] [--repeticiones 3]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from amortizacion import cuotaMes, tablasAmortizacion
+
+
+def tablasCicloPython(saldos, plazos, intereses):
+    """
+    Referencia: arma la tabla mes a mes y crédito por crédito, como lo haría pagar_cuota.
+    """
+    tablas = []
+    for saldo, plazo, interes in zip(saldos, plazos, intereses):
+        filas = []
+        for _ in range(plazo):
+            capital, interes_mes, total = cuotaMes(saldo, plazo - len(filas), interes)
+            filas.append((saldo, capital, interes_mes, total, saldo - capital))
+            saldo -= capital
+        tablas.append(filas)
+    return tablas
+
+
+def medir(funcion, repeticiones, *args):
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(*args)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--creditos", type=int, default=20000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args()
+
+    azar = random.Random(42)
+    saldos = [azar.uniform(1e6, 5e7) for _ in range(args.creditos)]
+    plazos = [azar.randint(1, 60) for _ in range(args.creditos)]
+    intereses = [azar.choice((1.5, 2.0, 2.5, 3.0)) for _ in range(args.creditos)]
+
+    # Ambas versiones deben dar la misma tabla
+    referencia = tablasCicloPython(saldos[:50], plazos[:50], intereses[:50])
+    lote = tablasAmortizacion(saldos[:50], plazos[:50], intereses[:50])
+    for i, filas in enumerate(referencia):
+        n = len(filas)
+        assert np.allclose(lote.cuota[i, :n], [f[3] for f in filas])
+        assert np.allclose(lote.saldoFinal[i, :n], [f[4] for f in filas])
+
+    t_python = medir(tablasCicloPython, args.repeticiones, saldos, plazos, intereses)
+    t_numpy = medir(tablasAmortizacion, args.repeticiones, saldos, plazos, intereses)
+    cuotas = sum(plazos)
+    print(f"Créditos: {args.creditos}  cuotas generadas: {cuotas}")
+    print(f"Ciclo Python: {t_python * 1000:9.1f} ms ({cuotas / t_python:12.0f} cuotas/s)")
+    print(f"NumPy lotes:  {t_numpy * 1000:9.1f} ms ({cuotas / t_numpy:12.0f} cuotas/s)")
+    print(f"Aceleración:  {t_python / t_numpy:9.1f}x")
@@ -0,0 +1,99 @@
+"""
+Benchmark de arranque: tiempo hasta el primer pintado de la pantalla de bienvenida.
+
+- En frío: se lanza un proceso nuevo por medición, así que incluye el intérprete,
+  las importaciones de PyQt5, la migración del esquema y la construcción de la ventana.
+- En caliente: dentro de un mismo proceso, con los módulos ya importados, se
+  construye y muestra NeobancoApp otra vez.
+
+Uso: python bench_arranque.py [--repeticiones 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+
+def primerPintado(app):
+    """
+    Construye y muestra NeobancoApp y retorna (segundos desde la construcción,
+    time.time() del momento) del primer evento de pintado de la bienvenida.
+    """
+    from PyQt5.QtCore import QObject, QEvent
+    from main import NeobancoApp
+
+    class Vigia(QObject):
+        pintado = None
+        momento = None
+
+        def eventFilter(self, objeto, evento):
+            if evento.type() == QEvent.Paint and self.pintado is None:
+                self.pintado = time.perf_counter()
+                self.momento = time.time()
+            return False
+
+    inicio = time.perf_counter()
+    win = NeobancoApp()
+    vigia = Vigia()
+    win.stack.widget(0).installEventFilter(vigia)
+    win.show()
+    while vigia.pintado is None and time.perf_counter() - inicio < 10:
+        app.processEvents()
+    win.close()
+    win.deleteLater()
+    return vigia.pintado - inicio, vigia.momento
+
+
+def hijo():
+    """
+    Proceso medido en frío: imprime el time.time() del primer pintado.
+    """
+    from PyQt5.QtWidgets import QApplication
+    from basedatos import obtenerBD, cerrarBD
+    from tablas import crearTablas
+
+    app = QApplication(sys.argv)
+    with obtenerBD().transaccion() as sesion:
+        crearTablas(sesion.con)
+    _, momento = primerPintado(app)
+    print(repr(momento))
+    cerrarBD()
+
+
+def resumen(nombre, tiempos):
+    print(f"{nombre}: mediana {statistics.median(tiempos) * 1000:8.1f} ms  "
+          f"mín {min(tiempos) * 1000:8.1f} ms  máx {max(tiempos) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    if "--hijo" in sys.argv:
+        hijo()
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description="Tiempo hasta el primer pintado de NeobancoApp")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    frio = []
+    for _ in range(args.repeticiones):
+        lanzado = time.time()
+        salida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--hijo"],
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        frio.append(float(salida[-1]) - lanzado)
+
+    from PyQt5.QtWidgets import QApplication
+    from basedatos import obtenerBD
+    from tablas import crearTablas
+
+    app = QApplication(sys.argv)
+    with obtenerBD().transaccion() as sesion:
+        crearTablas(sesion.con)
+    primerPintado(app)          # calentamiento
+    caliente = [primerPintado(app)[0] for _ in range(args.repeticiones)]
+
+    resumen("En frío    ", frio)
+    resumen("En caliente", caliente)
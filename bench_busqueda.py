@@ -0,0 +1,88 @@
+"""
+Benchmark: búsqueda de clientes con el índice FTS5 (ClientesBusqueda) contra LIKE '%x%'.
+
+Crea una base aparte con N clientes sintéticos (1.000.000 por defecto), cargados
+con los triggers de la migración 8 activos, y mide la latencia de búsquedas
+típicas de ventanilla: prefijo de apellido, nombre y apellido, correo y prefijo
+de teléfono. LIKE recorre toda la tabla en cada consulta, así que se mide con
+menos repeticiones.
+
+Uso: python bench_busqueda.py [--clientes 1000000] [--ruta bench_busqueda.db] [--repeticiones 200]
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from basedatos import BaseDatos
+from datos_sinteticos import APELLIDOS, NOMBRES, clienteSintetico
+from servicios import ServicioBanco
+from tablas import crearTablas
+
+TAMANO_LOTE = 20000
+
+
+def poblar(bd, clientes):
+    azar = random.Random(7)
+    inicio = time.perf_counter()
+    for desde in range(1, clientes + 1, TAMANO_LOTE):
+        with bd.transaccion() as s:
+            s.ejecutarVarios("INSERT INTO Clientes VALUES (?, ?, ?, ?, ?, ?)", [
+                clienteSintetico(azar, noId) for noId in range(desde, min(desde + TAMANO_LOTE, clientes + 1))
+            ])
+    return time.perf_counter() - inicio
+
+
+def latencias(funcion, consultas, repeticiones):
+    tiempos = []
+    for i in range(repeticiones):
+        texto = consultas[i % len(consultas)]
+        inicio = time.perf_counter()
+        funcion(texto)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return statistics.median(tiempos) * 1000, tiempos[int(len(tiempos) * 0.99)] * 1000
+
+
+def buscarLike(bd, texto, limite=50):
+    patron = f"%{texto}%"
+    return bd.consultar("""
+        SELECT * FROM Clientes
+        WHERE nombre LIKE ? OR apellido LIKE ? OR correo LIKE ? OR telefono LIKE ?
+        LIMIT ?
+    """, (patron, patron, patron, patron, limite))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clientes", type=int, default=1000000)
+    parser.add_argument("--ruta", default="bench_busqueda.db")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    args = parser.parse_args()
+
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(args.ruta + sufijo):
+            os.remove(args.ruta + sufijo)
+    bd = BaseDatos(args.ruta)
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    segundos = poblar(bd, args.clientes)
+    print(f"Clientes: {args.clientes}  carga con triggers FTS: {segundos:.1f} s "
+          f"({args.clientes / segundos:,.0f} clientes/s)")
+
+    servicio = ServicioBanco(bd)
+    azar = random.Random(11)
+    casos = {
+        "apellido (3 letras)": [a[:3] for a in APELLIDOS],
+        "nombre y apellido": [f"{azar.choice(NOMBRES)} {azar.choice(APELLIDOS)[:4]}" for _ in range(50)],
+        "correo": [clienteSintetico(random.Random(i), azar.randint(1, args.clientes))[5][:12]
+                   for i in range(50)],
+        "teléfono (6 dígitos)": [str(azar.randint(300000, 350999)) for _ in range(50)],
+    }
+    print(f"{'consulta':<24}{'FTS p50':>10}{'FTS p99':>10}{'LIKE p50':>11}{'LIKE p99':>11}  ms")
+    for nombre, consultas in casos.items():
+        fts = latencias(servicio.buscarClientes, consultas, args.repeticiones)
+        like = latencias(lambda t: buscarLike(bd, t), consultas, max(5, args.repeticiones // 20))
+        print(f"{nombre:<24}{fts[0]:>10.2f}{fts[1]:>10.2f}{like[0]:>11.2f}{like[1]:>11.2f}")
+    bd.cerrar()
@@ -0,0 +1,259 @@
+"""
+Suite de benchmarks de las operaciones del banco sobre datos sintéticos.
+
+Cada caso se mide como en pytest-benchmark: unas rondas de calentamiento y
+luego N rondas cronometradas, de las que se reportan mínimo, mediana, media,
+desviación, p99 y operaciones por segundo.
+
+    cotizar_cuota       ServicioBanco.cotizarCuota sobre créditos vigentes
+    pagar_cuota         ServicioBanco.pagarCuota, un crédito distinto por ronda
+    movimiento_ahorro   ServicioBanco.consignarRetirar (consignaciones)
+    listar_clientes     páginas sucesivas de ModeloClientes, como al desplazarse
+                        por la tabla de ConsultaClientesGUI
+    listar_productos    ServicioBanco.listarProductos
+
+La base de cada escala se genera una sola vez con datos_sinteticos (misma
+semilla, mismos datos) y cada corrida trabaja sobre una copia, así que los
+pagos de una corrida no cambian los datos de la siguiente. Cada corrida queda
+en resultados_bench/ como un JSON con el commit, las versiones y la escala, y se
+compara con la corrida anterior de la misma escala y semilla: una mediana que
+empeora más que el umbral se marca como regresión y el proceso sale con código 1.
+
+Uso: python bench_operaciones.py [--filas 100k] [--rondas 500] [--casos pagar_cuota,listar_clientes] [--umbral 0.10]
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from basedatos import BaseDatos
+from cuentas import AHORROS, CREDITO
+from datos_sinteticos import SEMILLA, cantidad, generarBase, mesRelativo
+from servicios import ServicioBanco, SolicitudMovimiento, SolicitudPago
+from tablas import MIGRACIONES, versionEsquema
+
+CARPETA_RESULTADOS = "resultados_bench"
+RONDAS = 500
+CALENTAMIENTO = 20
+UMBRAL = 0.10
+
+Estadistica = namedtuple("Estadistica", [
+    "rondas", "minimo_ms", "mediana_ms", "media_ms", "desviacion_ms", "p99_ms", "ops_s",
+])
+
+
+def _cuentas(bd, tipo, cuantas, semilla):
+    """
+    Muestra determinista de cuentas del tipo dado (créditos solo si están vigentes).
+    """
+    ids = [fila[0] for fila in bd.consultar("""
+        SELECT PC.idCuentaCredito FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE P.TipoProducto = ? AND (P.TipoProducto <> ? OR PC.plazoPendiente > 0)
+        ORDER BY PC.idCuentaCredito
+    """, (tipo, CREDITO))]
+    if not ids:
+        raise SystemExit(f"La base no tiene cuentas de tipo {tipo}.")
+    return random.Random(semilla).sample(ids, min(cuantas, len(ids)))
+
+
+# === Casos: cada uno prepara sus datos y retorna la función de una ronda ===
+
+def casoCotizarCuota(bd, servicio, rondas, semilla):
+    creditos = _cuentas(bd, CREDITO, rondas, semilla)
+    return lambda i: servicio.cotizarCuota(creditos[i % len(creditos)])
+
+
+def casoPagarCuota(bd, servicio, rondas, semilla):
+    # Un pago por crédito y mes: si hay menos créditos que rondas, la vuelta siguiente paga el mes siguiente
+    creditos = _cuentas(bd, CREDITO, rondas, semilla)
+
+    def ronda(i):
+        vuelta, posicion = divmod(i, len(creditos))
+        fecha = mesRelativo(vuelta).replace(day=15).isoformat()
+        servicio.pagarCuota(SolicitudPago(creditos[posicion], fecha, None))
+    return ronda
+
+
+def casoMovimientoAhorro(bd, servicio, rondas, semilla):
+    ahorros = _cuentas(bd, AHORROS, rondas, semilla)
+    fecha = mesRelativo(0).replace(day=15).isoformat()
+    return lambda i: servicio.consignarRetirar(SolicitudMovimiento(ahorros[i % len(ahorros)], 10000.0, fecha))
+
+
+def casoListarClientes(bd, servicio, rondas, semilla):
+    from consulta_clientes_gui import ModeloClientes
+
+    modelo = ModeloClientes(bd)
+    modelo.recargar()
+    paginas = max(1, -(-modelo.total // modelo.TAMANO_PAGINA))
+
+    def ronda(i):
+        pagina = i % paginas
+        if pagina == 0 and i:
+            modelo.recargar()       # fin de la tabla: se vuelve a consultar desde arriba
+        modelo.data(modelo.index(pagina * modelo.TAMANO_PAGINA, 0))
+    return ronda
+
+
+def casoListarProductos(bd, servicio, rondas, semilla):
+    return lambda i: servicio.listarProductos()
+
+
+CASOS = {
+    "cotizar_cuota": casoCotizarCuota,
+    "pagar_cuota": casoPagarCuota,
+    "movimiento_ahorro": casoMovimientoAhorro,
+    "listar_clientes": casoListarClientes,
+    "listar_productos": casoListarProductos,
+}
+
+
+def medir(ronda, rondas, calentamiento=CALENTAMIENTO):
+    for i in range(calentamiento):
+        ronda(i)
+    tiempos = []
+    for i in range(calentamiento, calentamiento + rondas):
+        inicio = time.perf_counter()
+        ronda(i)
+        tiempos.append(time.perf_counter() - inicio)
+    tiempos.sort()
+    return Estadistica(
+        rondas,
+        tiempos[0] * 1000,
+        statistics.median(tiempos) * 1000,
+        statistics.fmean(tiempos) * 1000,
+        (statistics.stdev(tiempos) if rondas > 1 else 0.0) * 1000,
+        tiempos[min(rondas - 1, int(rondas * 0.99))] * 1000,
+        rondas / sum(tiempos),
+    )
+
+
+# === Bases de trabajo ===
+
+def prepararPlantilla(filas, semilla):
+    """
+    Ruta de la base sintética de esta escala, generándola si no existe o si su
+    esquema quedó atrás de las migraciones actuales.
+    """
+    ruta = f"bench_sintetico_{filas}_{semilla}.db"
+    if os.path.exists(ruta):
+        con = sqlite3.connect(ruta)
+        try:
+            vigente = versionEsquema(con) == MIGRACIONES[-1][0]
+        finally:
+            con.close()
+        if vigente:
+            return ruta
+    print(f"Generando {ruta}...")
+    r = generarBase(ruta, filas, semilla)
+    print(f"  {r.clientes + r.productos + r.contratos + r.transacciones} filas en {r.segundos:.1f} s")
+    return ruta
+
+
+def copiaDeTrabajo(plantilla):
+    ruta = "bench_trabajo.db"
+    for sufijo in ("-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+    shutil.copyfile(plantilla, ruta)
+    return ruta
+
+
+# === Resultados ===
+
+def _commit():
+    try:
+        salida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except OSError:
+        return None
+    return salida.stdout.strip() or None
+
+
+def corridaAnterior(carpeta, filas, semilla):
+    """
+    La última corrida guardada con la misma escala y semilla, o None.
+    """
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "*.json")), reverse=True):
+        with open(ruta, encoding="utf-8") as archivo:
+            corrida = json.load(archivo)
+        if corrida.get("filas") == filas and corrida.get("semilla") == semilla:
+            return corrida
+    return None
+
+
+def guardarCorrida(carpeta, corrida):
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"{corrida['fecha'].replace(':', '').replace('-', '')}_{corrida['filas']}.json")
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        json.dump(corrida, archivo, ensure_ascii=False, indent=1)
+    return ruta
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=cantidad, default="100k", help="escala de la base: 10k, 1m, 10m...")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    parser.add_argument("--rondas", type=int, default=RONDAS)
+    parser.add_argument("--casos", default=",".join(CASOS), help="casos separados por coma")
+    parser.add_argument("--umbral", type=float, default=UMBRAL, help="fracción de empeoramiento de la mediana")
+    parser.add_argument("--resultados", default=CARPETA_RESULTADOS)
+    args = parser.parse_args()
+
+    casos = [c.strip() for c in args.casos.split(",") if c.strip()]
+    for caso in casos:
+        if caso not in CASOS:
+            parser.error(f"Caso desconocido: {caso}. Opciones: {', '.join(CASOS)}")
+
+    anterior = corridaAnterior(args.resultados, args.filas, args.semilla)
+    ruta = copiaDeTrabajo(prepararPlantilla(args.filas, args.semilla))
+    bd = BaseDatos(ruta)
+    servicio = ServicioBanco(bd)
+    resultados = {}
+    for caso in casos:
+        ronda = CASOS[caso](bd, servicio, args.rondas + CALENTAMIENTO, args.semilla)
+        resultados[caso] = medir(ronda, args.rondas)
+    bd.cerrar()
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "maquina": platform.platform(),
+        "filas": args.filas,
+        "semilla": args.semilla,
+        "casos": {caso: e._asdict() for caso, e in resultados.items()},
+    }
+    print(f"Escala: {args.filas} filas  semilla {args.semilla}  commit {corrida['commit']}")
+    print(f"{'caso':<20}{'mín':>9}{'mediana':>9}{'media':>9}{'desv':>9}{'p99':>9}{'ops/s':>11}"
+          f"{'anterior':>10}{'cambio':>9}  ms")
+    regresiones = []
+    for caso, e in resultados.items():
+        previo = (anterior or {}).get("casos", {}).get(caso)
+        comparacion = ""
+        if previo:
+            cambio = e.mediana_ms / previo["mediana_ms"] - 1
+            comparacion = f"{previo['mediana_ms']:>10.3f}{cambio:>+9.1%}"
+            if cambio > args.umbral:
+                regresiones.append(caso)
+                comparacion += "  REGRESIÓN"
+        print(f"{caso:<20}{e.minimo_ms:>9.3f}{e.mediana_ms:>9.3f}{e.media_ms:>9.3f}{e.desviacion_ms:>9.3f}"
+              f"{e.p99_ms:>9.3f}{e.ops_s:>11,.0f}{comparacion}")
+    print(f"Resultados: {guardarCorrida(args.resultados, corrida)}"
+          + (f"  (comparado con {anterior['fecha']}, commit {anterior['commit']})" if anterior else ""))
+    if regresiones:
+        sys.exit(1)
@@ -0,0 +1,114 @@
+"""
+Generador de carga para servidor_http.py: abre varias conexiones keep-alive
+(una por cajero simulado) y mezcla consultas de cliente, cotizaciones, saldos,
+consignaciones/retiros y pagos. Al final reporta solicitudes por segundo y la
+latencia p50/p99 por tipo de operación.
+
+Uso: python carga_http.py --creditos 1 --ahorros 2 --clientes 123,456
+                          [--conexiones 32] [--solicitudes 5000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+
+MEZCLA = [("cliente", 20), ("cuota", 30), ("saldo", 30), ("movimiento", 15), ("pago", 5)]
+
+
+def lista(texto):
+    return [int(x) for x in texto.split(",") if x.strip()]
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+
+def armarSolicitud(tipo, args, azar):
+    if tipo == "cliente":
+        return "GET", f"/clientes/{azar.choice(args.clientes)}", None
+    if tipo == "cuota":
+        return "GET", f"/cuentas/{azar.choice(args.creditos)}/cuota", None
+    if tipo == "saldo":
+        return "GET", f"/cuentas/{azar.choice(args.ahorros)}/saldo", None
+    if tipo == "movimiento":
+        # Consignaciones algo mayores que los retiros para no agotar el saldo
+        valor = azar.choice([1000, 2000, -1000])
+        return "POST", f"/cuentas/{azar.choice(args.ahorros)}/movimientos", {"valor": valor}
+    # Pagos en meses aleatorios: los repetidos se rechazan (422), igual ejercitan al escritor
+    mes = f"{azar.randint(2000, 2099)}-{azar.randint(1, 12):02d}-01"
+    return "POST", f"/cuentas/{azar.choice(args.creditos)}/pagos", {"fecha": mes}
+
+
+async def cajero(args, cola, latencias, estados, semilla):
+    azar = random.Random(semilla)
+    tipos = [t for t, _ in MEZCLA]
+    pesos = [p for _, p in MEZCLA]
+    lector, escritor = await asyncio.open_connection(args.host, args.puerto)
+    try:
+        while True:
+            try:
+                cola.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            tipo = azar.choices(tipos, pesos)[0]
+            metodo, ruta, cuerpo = armarSolicitud(tipo, args, azar)
+            datos = json.dumps(cuerpo).encode() if cuerpo is not None else b""
+
+            inicio = time.perf_counter()
+            escritor.write(
+                f"{metodo} {ruta} HTTP/1.1\r\nHost: {args.host}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(datos)}\r\n\r\n".encode() + datos
+            )
+            await escritor.drain()
+            estado = int((await lector.readline()).split()[1])
+            largo = 0
+            while True:
+                linea = await lector.readline()
+                if linea in (b"\r\n", b""):
+                    break
+                if linea.lower().startswith(b"content-length:"):
+                    largo = int(linea.split(b":")[1])
+            await lector.readexactly(largo)
+            latencias[tipo].append(time.perf_counter() - inicio)
+            estados[estado] += 1
+    finally:
+        escritor.close()
+
+
+async def correr(args):
+    cola = asyncio.Queue()
+    for i in range(args.solicitudes):
+        cola.put_nowait(i)
+    latencias = defaultdict(list)
+    estados = defaultdict(int)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cajero(args, cola, latencias, estados, args.semilla + i)
+                           for i in range(args.conexiones)))
+    segundos = time.perf_counter() - inicio
+
+    todas = [x for valores in latencias.values() for x in valores]
+    print(f"{len(todas)} solicitudes en {segundos:.2f} s con {args.conexiones} conexiones "
+          f"({len(todas) / segundos:,.0f} sol/s)")
+    print("Estados HTTP: " + ", ".join(f"{e}: {n}" for e, n in sorted(estados.items())))
+    print(f"{'operación':<12}{'n':>8}{'p50 ms':>10}{'p99 ms':>10}{'media ms':>10}")
+    for tipo, valores in sorted(latencias.items()) + [("total", todas)]:
+        print(f"{tipo:<12}{len(valores):>8}{percentil(valores, 50) * 1000:>10.2f}"
+              f"{percentil(valores, 99) * 1000:>10.2f}{statistics.mean(valores) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga concurrente contra servidor_http.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--creditos", type=lista, required=True, help="ids de cuentas de crédito, separados por coma")
+    parser.add_argument("--ahorros", type=lista, required=True, help="ids de cuentas de ahorros, separados por coma")
+    parser.add_argument("--clientes", type=lista, required=True, help="ids de clientes, separados por coma")
+    parser.add_argument("--conexiones", type=int, default=32)
+    parser.add_argument("--solicitudes", type=int, default=5000)
+    parser.add_argument("--semilla", type=int, default=1)
+    asyncio.run(correr(parser.parse_args()))
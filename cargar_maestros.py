@@ -0,0 +1,252 @@
+"""
+Carga masiva de Clientes y ProductosContratados desde extractos CSV o JSON-lines.
+
+Pensado para dar de alta una sucursal completa: el archivo se lee como un flujo
+(ver importar_pagos.leerFilas) y cada fila se valida con las mismas reglas que
+aplican las vistas (correo, ID y teléfono numéricos, capital/plazo y ahorro
+mínimo, ver servicios). Las filas válidas se insertan con executemany por
+lotes y las rechazadas van a un archivo CSV con el número de línea y el motivo.
+
+Por defecto toda la carga es una sola transacción: se quitan los índices
+secundarios de la tabla y los triggers que trabajan por fila (el índice FTS5
+ClientesBusqueda y el resumen ResumenCartera), se insertan todos los lotes y al
+final se vuelven a crear los índices y los triggers, se reconstruye el índice de
+búsqueda y se suma al resumen lo cargado, de una vez. Como en SQLite el DDL también
+es transaccional, si la carga falla a mitad la base queda como estaba, índices y
+triggers incluidos. Con --sin-diferir-indices cada lote se confirma por separado
+y los triggers siguen activos.
+
+Columnas esperadas:
+    clientes:  noIdCliente, nombre, apellido, direccion, telefono, correo
+    contratos: idCliente, idProducto, capital, plazo, fechaEntrega
+
+Uso: python cargar_maestros.py clientes clientes.csv [--errores errores.csv] [--lote 20000]
+"""
+import argparse
+import csv
+import json
+import time
+from collections import namedtuple
+from itertools import islice
+
+from basedatos import obtenerBD
+from catalogo import catalogoDe
+from contabilidad import registrarAperturas
+from importar_pagos import leerFilas
+from servicios import OperacionInvalida, SolicitudCliente, SolicitudContrato
+from tablas import crearTablas
+
+TAMANO_LOTE = 20000
+
+ResumenCarga = namedtuple("ResumenCarga", [
+    "tabla", "leidas", "cargadas", "rechazadas", "segundos", "filasPorSegundo",
+])
+
+
+def _campos(fila, columnas):
+    if "error" in fila:
+        raise OperacionInvalida("Registro JSON mal formado.")
+    # Un 0 numérico del JSON es un valor, no un campo vacío
+    return ["" if fila.get(c) is None else str(fila.get(c)).strip() for c in columnas]
+
+
+def _existentes(s, sql, ids):
+    """
+    Subconjunto de 'ids' que ya está en la base, con una sola consulta por lote.
+    """
+    return {fila[0] for fila in s.consultar(sql, (json.dumps(sorted(ids)),))}
+
+
+# === Clientes ===
+
+COLUMNAS_CLIENTES = ["noIdCliente", "nombre", "apellido", "direccion", "telefono", "correo"]
+
+
+def _lote_clientes(s, lote, errores):
+    solicitudes = []
+    for numero, fila in lote:
+        try:
+            solicitudes.append((numero, fila, SolicitudCliente.desdeTexto(*_campos(fila, COLUMNAS_CLIENTES))))
+        except OperacionInvalida as e:
+            errores.writerow([numero] + [fila.get(c, "") for c in COLUMNAS_CLIENTES] + [str(e)])
+
+    repetidos = _existentes(
+        s, "SELECT noIdCliente FROM Clientes WHERE noIdCliente IN (SELECT value FROM json_each(?))",
+        {sol.noIdCliente for _, _, sol in solicitudes}
+    )
+    filas = []
+    for numero, fila, sol in solicitudes:
+        if sol.noIdCliente in repetidos:
+            errores.writerow([numero] + [fila.get(c, "") for c in COLUMNAS_CLIENTES] + ["Ya existe un cliente con ese ID."])
+            continue
+        repetidos.add(sol.noIdCliente)
+        filas.append((sol.noIdCliente, sol.nombre, sol.apellido, sol.direccion, sol.telefono, sol.correo))
+
+    s.ejecutarVarios("INSERT INTO Clientes VALUES (?, ?, ?, ?, ?, ?)", filas)
+    return len(filas)
+
+
+# === Contratos ===
+
+COLUMNAS_CONTRATOS = ["idCliente", "idProducto", "capital", "plazo", "fechaEntrega"]
+
+
+def _lote_contratos(s, lote, errores):
+    catalogo = catalogoDe(s)
+    solicitudes = []
+    for numero, fila in lote:
+        try:
+            id_cliente, id_producto, capital, plazo, fecha = _campos(fila, COLUMNAS_CONTRATOS)
+            try:
+                id_cliente, id_producto = int(id_cliente), int(id_producto)
+            except ValueError:
+                raise OperacionInvalida("idCliente e idProducto deben ser numéricos.")
+            producto = catalogo.obtener(s, id_producto)
+            if producto is None:
+                raise OperacionInvalida("El producto no existe.")
+            if not fecha:
+                raise OperacionInvalida("Falta la fecha de entrega.")
+            solicitudes.append((numero, fila, SolicitudContrato.desdeTexto(
+                id_cliente, id_producto, producto.tipo, capital, plazo, fecha
+            )))
+        except OperacionInvalida as e:
+            errores.writerow([numero] + [fila.get(c, "") for c in COLUMNAS_CONTRATOS] + [str(e)])
+
+    clientes = _existentes(
+        s, "SELECT noIdCliente FROM Clientes WHERE noIdCliente IN (SELECT value FROM json_each(?))",
+        {sol.idCliente for _, _, sol in solicitudes}
+    )
+    filas = []
+    for numero, fila, sol in solicitudes:
+        if sol.idCliente not in clientes:
+            errores.writerow([numero] + [fila.get(c, "") for c in COLUMNAS_CONTRATOS] + ["El cliente no existe."])
+            continue
+        filas.append((sol.idProducto, sol.idCliente, sol.capital, sol.plazo, sol.fechaEntrega, sol.capital, sol.plazo))
+
+    ultimo = s.consultarUno("SELECT IFNULL(MAX(idCuentaCredito), 0) FROM ProductosContratados")[0]
+    s.ejecutarVarios('''
+        INSERT INTO ProductosContratados
+        (idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega, saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
+        VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+    ''', filas)
+    # Con el escritor tomado, las cuentas nuevas son todas las de id mayor al último
+    nuevo = s.consultarUno("SELECT MAX(idCuentaCredito) FROM ProductosContratados")[0]
+    if filas:
+        registrarAperturas(s, ultimo + 1, nuevo)
+    return len(filas)
+
+
+# === Al terminar una carga diferida ===
+
+def _reconstruirBusqueda(s, ultimo):
+    s.ejecutar("INSERT INTO ClientesBusqueda (ClientesBusqueda) VALUES ('rebuild')")
+
+
+def _sumarResumenCartera(s, ultimo):
+    """
+    Lo que hace trgCarteraContrato por cada contrato, en una sola sentencia
+    agrupada por cliente para las cuentas con id mayor a 'ultimo'.
+    """
+    s.ejecutar("""
+        INSERT INTO ResumenCartera
+        (idCliente, creditosVigentes, deudaTotal, cuentasAhorro, ahorroTotal, interesesPagados)
+        SELECT PC.idCliente,
+               SUM(P.TipoProducto = 1 AND PC.plazoPendiente > 0),
+               SUM(CASE WHEN P.TipoProducto = 1 THEN PC.saldoCapital ELSE 0 END),
+               SUM(P.TipoProducto = 2),
+               SUM(CASE WHEN P.TipoProducto = 2 THEN PC.saldoCapital ELSE 0 END),
+               SUM(IFNULL(PC.sumatoriaInteresesPagados, 0))
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE PC.idCuentaCredito > ?
+        GROUP BY PC.idCliente
+        ON CONFLICT(idCliente) DO UPDATE SET
+            creditosVigentes = creditosVigentes + excluded.creditosVigentes,
+            deudaTotal = deudaTotal + excluded.deudaTotal,
+            cuentasAhorro = cuentasAhorro + excluded.cuentasAhorro,
+            ahorroTotal = ahorroTotal + excluded.ahorroTotal,
+            interesesPagados = interesesPagados + excluded.interesesPagados
+    """, (ultimo,))
+
+
+# tipo -> (tabla, columnas, carga de un lote, triggers por fila que se difieren,
+#          reconstrucción al final con el último rowid anterior a la carga)
+TABLAS = {
+    "clientes": ("Clientes", COLUMNAS_CLIENTES, _lote_clientes,
+                 ["trgBusquedaClienteInsert"], _reconstruirBusqueda),
+    "contratos": ("ProductosContratados", COLUMNAS_CONTRATOS, _lote_contratos,
+                  ["trgCarteraContrato"], _sumarResumenCartera),
+}
+
+
+# === Carga ===
+
+def _quitarIndices(s, tabla, triggers=()):
+    """
+    Elimina los índices secundarios de 'tabla' y los 'triggers' indicados, y
+    retorna el SQL para recrearlos.
+    """
+    objetos = s.consultar(
+        "SELECT type, name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (tabla,)
+    ) + s.consultar(
+        "SELECT type, name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN (SELECT value FROM json_each(?))",
+        (json.dumps(list(triggers)),)
+    )
+    for tipo, nombre, _ in objetos:
+        s.ejecutar(f'DROP {tipo.upper()} "{nombre}"')
+    return [sql for _, _, sql in objetos]
+
+
+def cargar(bd, tipo, ruta, rutaErrores, tamanoLote=TAMANO_LOTE, diferirIndices=True):
+    """
+    Carga el archivo 'ruta' en la tabla de 'tipo' ('clientes' o 'contratos') y
+    escribe las filas rechazadas en 'rutaErrores'. Retorna un ResumenCarga.
+    """
+    tabla, columnas, cargarLote, triggers, reconstruir = TABLAS[tipo]
+    filas = leerFilas(ruta)
+    lotes = iter(lambda: list(islice(filas, tamanoLote)), [])
+    inicio = time.perf_counter()
+    leidas = cargadas = 0
+
+    with open(rutaErrores, "w", newline="", encoding="utf-8") as archivo:
+        errores = csv.writer(archivo)
+        errores.writerow(["linea"] + columnas + ["motivo"])
+        if diferirIndices:
+            with bd.transaccion() as s:
+                ultimo = s.consultarUno(f"SELECT IFNULL(MAX(rowid), 0) FROM {tabla}")[0]
+                diferidos = _quitarIndices(s, tabla, triggers)
+                for lote in lotes:
+                    leidas += len(lote)
+                    cargadas += cargarLote(s, lote, errores)
+                for sql in diferidos:
+                    s.ejecutar(sql)
+                reconstruir(s, ultimo)
+        else:
+            for lote in lotes:
+                with bd.transaccion() as s:
+                    leidas += len(lote)
+                    cargadas += cargarLote(s, lote, errores)
+
+    segundos = time.perf_counter() - inicio
+    velocidad = leidas / segundos if segundos > 0 else 0.0
+    return ResumenCarga(tabla, leidas, cargadas, leidas - cargadas, segundos, velocidad)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga masiva de clientes y contratos")
+    parser.add_argument("tipo", choices=list(TABLAS), help="Qué se carga")
+    parser.add_argument("archivo", help="Archivo CSV o JSON-lines")
+    parser.add_argument("--errores", help="Archivo de filas rechazadas (por defecto errores_<tipo>.csv)")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por executemany")
+    parser.add_argument("--sin-diferir-indices", action="store_true",
+                        help="Mantener los índices y confirmar cada lote por separado")
+    args = parser.parse_args()
+
+    bd = obtenerBD()
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    r = cargar(bd, args.tipo, args.archivo, args.errores or f"errores_{args.tipo}.csv",
+               args.lote, not args.sin_diferir_indices)
+    print(f"{r.tabla}: leídas {r.leidas}  cargadas {r.cargadas}  rechazadas {r.rechazadas}")
+    print(f"Tiempo: {r.segundos:.2f} s ({r.filasPorSegundo:.0f} filas/s)")
@@ -0,0 +1,82 @@
+"""
+Caché en memoria del catálogo PRODUCTOS.
+
+El catálogo tiene unas pocas filas y casi nunca cambia, pero cada pago,
+cotización y consulta de saldo necesitaba su tipo y su tasa. CatalogoProductos
+lo guarda por NoIdProducto y lo recarga completo solo cuando cambia su número de
+versión, que se incrementa con invalidar() cada vez que se crea un producto
+(ServicioBanco.crearProducto, usado por ProductosGUI.insertar_producto).
+
+Si se pide un producto que no está en memoria (por ejemplo, creado por otro
+proceso) se lee esa fila de la base y se agrega al caché.
+"""
+import threading
+from collections import namedtuple
+
+Producto = namedtuple("Producto", ["noIdProducto", "nombre", "tipo", "remuneracion"])
+
+SQL_PRODUCTOS = "SELECT NoIdProducto, NombreProducto, TipoProducto, Remuneracion FROM PRODUCTOS"
+
+
+class CatalogoProductos:
+    """
+    Productos de una base de datos, por NoIdProducto.
+    'origen' en los métodos puede ser la BaseDatos o una Sesion abierta.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self._cargada = -1
+        self._productos = {}
+        self._candado = threading.Lock()
+
+    def invalidar(self):
+        with self._candado:
+            self.version += 1
+
+    def _vigentes(self, origen):
+        if self._cargada != self.version:
+            with self._candado:
+                version = self.version
+                if self._cargada != version:
+                    self._productos = {fila[0]: Producto._make(fila) for fila in origen.consultar(SQL_PRODUCTOS)}
+                    self._cargada = version
+        return self._productos
+
+    def obtener(self, origen, noIdProducto):
+        """
+        Retorna el Producto o None si no existe.
+        """
+        productos = self._vigentes(origen)
+        producto = productos.get(noIdProducto)
+        if producto is None:
+            fila = origen.consultarUno(SQL_PRODUCTOS + " WHERE NoIdProducto = ?", (noIdProducto,))
+            if fila is None:
+                return None
+            producto = Producto._make(fila)
+            # Con el candado, como al recargar: no se agrega mientras otro hilo
+            # reemplaza el diccionario o lo recorre en listar
+            with self._candado:
+                self._productos.setdefault(producto.noIdProducto, producto)
+        return producto
+
+    def listar(self, origen):
+        self._vigentes(origen)
+        with self._candado:
+            return sorted(self._productos.values())
+
+
+_catalogos = {}
+_candado_catalogos = threading.Lock()
+
+
+def catalogoDe(origen):
+    """
+    Catálogo compartido del proceso para el archivo de 'origen' (BaseDatos o Sesion).
+    """
+    ruta = getattr(origen, "bd", origen).ruta
+    with _candado_catalogos:
+        catalogo = _catalogos.get(ruta)
+        if catalogo is None:
+            catalogo = _catalogos[ruta] = CatalogoProductos()
+        return catalogo
@@ -1,16 +1,21 @@
-import sqlite3
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
     QMessageBox, QHBoxLayout, QGroupBox
 )
 from PyQt5.QtCore import Qt
 
+from basedatos import obtenerBD
+from instrumentacion import medirAccion
+from servicios import OperacionInvalida, ServicioBanco, SolicitudCliente
+from trabajos import obtenerDespachador
+
 class ClientesGUI(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gestión de Clientes – Neobanco Digital")
         self.setGeometry(200, 100, 600, 400)
-        self.conn = sqlite3.connect("basemibanco.db")
+        self.servicio = ServicioBanco(obtenerBD())
+        self.trabajos = obtenerDespachador()
         self.init_ui()
 
     def init_ui(self):
@@ -80,70 +85,80 @@ class ClientesGUI(QWidget):
 
         group_cons.setLayout(cons_layout)
 
+        # Grupo de cartera del cliente consultado
+        group_cartera = QGroupBox("Portafolio del cliente")
+        cartera_layout = QVBoxLayout()
+        self.cartera = QLabel("")
+        self.cartera.setWordWrap(True)
+        cartera_layout.addWidget(self.cartera)
+        group_cartera.setLayout(cartera_layout)
+
         layout.addWidget(group_reg)
         layout.addWidget(group_cons)
+        layout.addWidget(group_cartera)
         self.setLayout(layout)
         
-    def obtener_correo_valido(self):
-        correo = self.input_correo.text().strip()
-        partes = correo.split("@")
-        if len(partes) == 2 and "." in partes[1]:
-            return correo
+    def mostrar_error(self, e):
+        if isinstance(e, OperacionInvalida):
+            QMessageBox.warning(self, "Error", str(e))
         else:
-            QMessageBox.warning(
-                self,
-                "Correo inválido",
-                "Ingrese un correo válido con formato usuario@dominio.com"
-            )
-            return None
+            QMessageBox.critical(self, "Error", str(e))
 
+    @medirAccion
     def registrar_cliente(self):
         try:
-            # Validar el correo antes de crear la tupla
-            correo_valido = self.obtener_correo_valido()
-            if correo_valido is None:
-                return  # No continúa si el correo es inválido
-            
-            cliente = (
-                int(self.input_id.text()),
+            solicitud = SolicitudCliente.desdeTexto(
+                self.input_id.text(),
                 self.input_nombre.text(),
                 self.input_apellido.text(),
                 self.input_direccion.text(),
-                int(self.input_telefono.text()),
-                correo_valido
+                self.input_telefono.text(),
+                self.input_correo.text()
             )
+        except OperacionInvalida as e:
+            self.mostrar_error(e)
+            return
 
-            cursor = self.conn.cursor()
-            cursor.execute("INSERT INTO CLIENTES VALUES (?, ?, ?, ?, ?, ?)", cliente)
-            self.conn.commit()
-            QMessageBox.information(self, "Éxito", "Cliente registrado correctamente.")
-        except sqlite3.IntegrityError:
-            QMessageBox.warning(self, "Error", "Ya existe un cliente con ese ID.")
-        except ValueError:
-            QMessageBox.warning(self, "Error", "Verifica que el ID y Teléfono sean numéricos.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.trabajos.enviar(
+            self.servicio.registrarCliente, solicitud,
+            alTerminar=lambda _: QMessageBox.information(self, "Éxito", "Cliente registrado correctamente."),
+            alFallar=self.mostrar_error
+        )
 
+    @medirAccion
     def consultar_cliente(self):
         id_cliente = self.input_consulta.text()
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM CLIENTES WHERE noIdCliente=?", (id_cliente,))
-        resultado = cursor.fetchone()
-        if resultado:
+        self.trabajos.enviar(self.servicio.consultarCliente, id_cliente,
+                             alTerminar=self.mostrar_cliente, alFallar=self.mostrar_error)
+        self.trabajos.enviar(self.servicio.resumenCartera, id_cliente,
+                             alTerminar=self.mostrar_cartera, alFallar=self.mostrar_error)
+
+    def mostrar_cliente(self, cliente):
+        if cliente:
             self.resultado.setText(
-                f"<b>ID:</b> {resultado[0]}<br><b>Nombre:</b> {resultado[1]} {resultado[2]}<br>"
-                f"<b>Dirección:</b> {resultado[3]}<br><b>Tel:</b> {resultado[4]}<br><b>Correo:</b> {resultado[5]}"
+                f"<b>ID:</b> {cliente.noIdCliente}<br><b>Nombre:</b> {cliente.nombre} {cliente.apellido}<br>"
+                f"<b>Dirección:</b> {cliente.direccion}<br><b>Tel:</b> {cliente.telefono}<br><b>Correo:</b> {cliente.correo}"
             )
         else:
             self.resultado.setText("Cliente no encontrado.")
 
+    def mostrar_cartera(self, resumen):
+        self.cartera.setText(
+            f"<b>Créditos vigentes:</b> {resumen.creditosVigentes}<br>"
+            f"<b>Deuda total:</b> ${resumen.deudaTotal:,.2f}<br>"
+            f"<b>Cuentas de ahorro:</b> {resumen.cuentasAhorro}<br>"
+            f"<b>Ahorro total:</b> ${resumen.ahorroTotal:,.2f}<br>"
+            f"<b>Intereses pagados:</b> ${resumen.interesesPagados:,.2f}<br>"
+            f"<b>Movimientos:</b> {resumen.movimientos}"
+            + (f" (último {resumen.ultimoMovimiento})" if resumen.ultimoMovimiento else "")
+        )
+
+    @medirAccion
     def actualizar_direccion(self):
         id_cliente = self.input_consulta.text()
         nueva_dir = self.input_nueva_direccion.text()
-        cursor = self.conn.cursor()
-        cursor.execute("UPDATE CLIENTES SET direccion=? WHERE noIdCliente=?", (nueva_dir, id_cliente))
-        if cursor.rowcount > 0:
-            self.conn.commit()
-            QMessageBox.information(self, "Éxito", "Dirección actualizada.")
-        else:
-            QMessageBox.warning(self, "Error", "Cliente no encontrado.")
+        self.trabajos.enviar(
+            self.servicio.actualizarDireccion, id_cliente, nueva_dir,
+            alTerminar=lambda _: QMessageBox.information(self, "Éxito", "Dirección actualizada."),
+            alFallar=self.mostrar_error
+        )
@@ -0,0 +1,262 @@
+"""
+Cola de escritura con confirmación agrupada (group commit).
+
+Cada pago o movimiento hecho por separado paga su propio COMMIT; con
+synchronous=FULL eso es un fsync por operación y limita el sistema a unos
+cientos de pagos por segundo. ColaEscritura recibe las operaciones de varios
+hilos, las acumula durante una ventana de unos milisegundos (o hasta juntar
+maxOperaciones) y las aplica todas en una sola transacción del escritor.
+
+Cada operación corre dentro de su propio SAVEPOINT: si una falla (por ejemplo
+OperacionInvalida por fondos insuficientes) solo se revierte esa, y las demás
+del lote se confirman. El Future de cada llamador se resuelve después del
+COMMIT, así que el acuse de recibo (con su idTransaccion) ya es durable.
+
+El servidor HTTP usa su propia cola; las vistas y el menú de consola comparten
+la del proceso (obtenerCola) a través de ServicioBanco.
+
+Benchmark incorporado: python cola_escritura.py [--operaciones 5000] [--hilos 32]
+"""
+import argparse
+import os
+import queue
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+from basedatos import obtenerBD
+from cuentas import aplicarPagoCredito, aplicarMovimientoAhorro
+
+VENTANA_MS = 2
+MAX_OPERACIONES = 256
+
+
+class ColaEscritura:
+    """
+    Hilo escritor que agrupa operaciones en transacciones. Las operaciones son
+    funciones funcion(sesion, *args) como cuentas.aplicarPagoCredito.
+    """
+
+    def __init__(self, bd, ventanaMs=VENTANA_MS, maxOperaciones=MAX_OPERACIONES):
+        self.bd = bd
+        self.ventana = ventanaMs / 1000
+        self.maxOperaciones = maxOperaciones
+        self.lotes = 0
+        self.operaciones = 0
+        self._pendientes = queue.Queue()
+        self._cerrada = False
+        self._hilo = threading.Thread(target=self._bucle, name="cola-escritura", daemon=True)
+        self._hilo.start()
+
+    def enviar(self, funcion, *args):
+        """
+        Encola funcion(sesion, *args) y retorna un Future con su resultado.
+        """
+        if self._cerrada:
+            raise RuntimeError("La cola de escritura está cerrada.")
+        futuro = Future()
+        self._pendientes.put((funcion, args, futuro))
+        return futuro
+
+    def pagarCuota(self, idCuenta, fecha, valor=None):
+        """
+        Future con el PagoCredito (ver cuentas.aplicarPagoCredito).
+        """
+        return self.enviar(aplicarPagoCredito, idCuenta, fecha, valor)
+
+    def movimientoAhorro(self, idCuenta, valor, fecha):
+        """
+        Future con el MovimientoAhorro (ver cuentas.aplicarMovimientoAhorro).
+        """
+        return self.enviar(aplicarMovimientoAhorro, idCuenta, valor, fecha)
+
+    def cerrar(self):
+        """
+        Confirma lo que quede pendiente y detiene el hilo escritor.
+        """
+        if not self._cerrada:
+            self._cerrada = True
+            self._pendientes.put(None)
+            self._hilo.join()
+
+    # === Hilo escritor ===
+
+    def _bucle(self):
+        while True:
+            primera = self._pendientes.get()
+            if primera is None:
+                return
+            lote = [primera]
+            fin = False
+            limite = time.perf_counter() + self.ventana
+            while len(lote) < self.maxOperaciones:
+                restante = limite - time.perf_counter()
+                try:
+                    if restante > 0:
+                        operacion = self._pendientes.get(timeout=restante)
+                    else:
+                        operacion = self._pendientes.get_nowait()
+                except queue.Empty:
+                    break
+                if operacion is None:
+                    fin = True
+                    break
+                lote.append(operacion)
+            self._confirmar(lote)
+            if fin:
+                return
+
+    def _confirmar(self, lote):
+        resultados = []
+        try:
+            with self.bd.transaccion() as s:
+                for funcion, args, futuro in lote:
+                    if not futuro.set_running_or_notify_cancel():
+                        continue
+                    s.ejecutar("SAVEPOINT operacion")
+                    try:
+                        resultado = funcion(s, *args)
+                    except Exception as e:
+                        s.ejecutar("ROLLBACK TO operacion")
+                        s.ejecutar("RELEASE operacion")
+                        resultados.append((futuro, None, e))
+                    else:
+                        s.ejecutar("RELEASE operacion")
+                        resultados.append((futuro, resultado, None))
+        except Exception as e:
+            # Falló el COMMIT (o el BEGIN): nada del lote quedó guardado
+            for _, _, futuro in lote:
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        self.lotes += 1
+        self.operaciones += len(resultados)
+        for futuro, resultado, error in resultados:
+            if error is None:
+                futuro.set_result(resultado)
+            else:
+                futuro.set_exception(error)
+
+
+# === Instancia compartida ===
+
+_cola = None
+_candado_cola = threading.Lock()
+
+
+def obtenerCola():
+    """
+    Retorna la ColaEscritura compartida del proceso sobre la BaseDatos de
+    obtenerBD(), creándola en el primer uso.
+    """
+    global _cola
+    with _candado_cola:
+        if _cola is None:
+            _cola = ColaEscritura(obtenerBD())
+        return _cola
+
+
+def cerrarCola():
+    """
+    Confirma lo pendiente y detiene la cola compartida. Va antes de cerrarBD().
+    """
+    global _cola
+    with _candado_cola:
+        if _cola is not None:
+            _cola.cerrar()
+            _cola = None
+
+
+# === Benchmark ===
+
+def _prepararBase(ruta, cuentas):
+    from basedatos import BaseDatos
+    from tablas import crearTablas
+
+    bd = BaseDatos(ruta)
+    with bd.transaccion() as s:
+        crearTablas(s.con)
+        s.ejecutar("INSERT OR IGNORE INTO PRODUCTOS VALUES (1, 'CuentaAhorro', 2, 3)")
+        s.ejecutar("DELETE FROM Transacciones")
+        s.ejecutar("DELETE FROM ProductosContratados")
+        s.ejecutarVarios("""
+            INSERT INTO ProductosContratados
+            (idCuentaCredito, idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega,
+             saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
+            VALUES (?, 1, 0, 1000000, 0, '2025-01-01', 1000000, 0, 0)
+        """, ((i,) for i in range(1, cuentas + 1)))
+    bd.cerrar()
+
+
+def _correr(ruta, operaciones, hilos, cuentas, sincronizacion, ventanaMs):
+    """
+    Retorna (operaciones/s, latencia p50, latencia p99, operaciones por lote).
+    ventanaMs=None mide la línea base: una transacción por operación.
+    """
+    from basedatos import BaseDatos
+    from cuentas import transaccionAhorro
+
+    bd = BaseDatos(ruta, sincronizacion=sincronizacion)
+    cola = ColaEscritura(bd, ventanaMs) if ventanaMs is not None else None
+    latencias = []
+    candado = threading.Lock()
+    por_hilo = operaciones // hilos
+
+    def cajero(n):
+        propias = []
+        for i in range(por_hilo):
+            cuenta = (n * por_hilo + i) % cuentas + 1
+            inicio = time.perf_counter()
+            if cola is None:
+                transaccionAhorro(bd, cuenta, 1000, "2025-01-15")
+            else:
+                cola.movimientoAhorro(cuenta, 1000, "2025-01-15").result()
+            propias.append(time.perf_counter() - inicio)
+        with candado:
+            latencias.extend(propias)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=cajero, args=(n,)) for n in range(hilos)]
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+
+    por_lote = 1.0
+    if cola is not None:
+        cola.cerrar()
+        por_lote = cola.operaciones / max(cola.lotes, 1)
+    bd.cerrar()
+    latencias.sort()
+    return (len(latencias) / segundos, statistics.median(latencias),
+            latencias[int(0.99 * (len(latencias) - 1))], por_lote)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput de la cola de escritura según la ventana")
+    parser.add_argument("--operaciones", type=int, default=5000)
+    parser.add_argument("--hilos", type=int, default=32)
+    parser.add_argument("--cuentas", type=int, default=1000)
+    parser.add_argument("--sincronizacion", default="FULL", choices=["OFF", "NORMAL", "FULL"])
+    parser.add_argument("--ventanas", default="0,1,2,5,10", help="ventanas en ms, separadas por coma")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="neobanco_cola_")
+    ruta = os.path.join(directorio, "bench.db")
+    try:
+        print(f"{args.operaciones} movimientos, {args.hilos} hilos, synchronous={args.sincronizacion}")
+        print(f"{'ventana':>10}{'ops/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'ops/lote':>10}")
+        casos = [None] + [float(v) for v in args.ventanas.split(",")]
+        for ventana in casos:
+            _prepararBase(ruta, args.cuentas)
+            ops, p50, p99, por_lote = _correr(ruta, args.operaciones, args.hilos,
+                                             args.cuentas, args.sincronizacion, ventana)
+            nombre = "sin cola" if ventana is None else f"{ventana:g} ms"
+            print(f"{nombre:>10}{ops:>12,.0f}{p50 * 1000:>10.2f}{p99 * 1000:>10.2f}{por_lote:>10.1f}")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
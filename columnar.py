@@ -0,0 +1,155 @@
+"""
+Salida tabular por bloques para reportes y procesos por lotes.
+
+Dos formatos con la misma interfaz (escribir fila a fila, memoria acotada):
+
+- CSV: una fila por línea, con encabezado.
+- Columnar: JSON lines por bloques, al estilo de los row groups de Parquet. La
+  primera línea es el encabezado {"formato", "version", "columnas"}; cada línea
+  siguiente es un bloque {"filas": n, "datos": {columna: [valores...]}} con
+  hasta 'tamanoBloque' filas. Se puede leer columna a columna (por ejemplo con
+  numpy) sin cargar el archivo entero, y un archivo truncado por una caída
+  conserva todos los bloques completos anteriores.
+"""
+import csv
+import json
+
+FORMATO_COLUMNAR = "neobanco-columnar"
+VERSION_COLUMNAR = 1
+TAMANO_BLOQUE = 10000
+
+EXTENSIONES = {"csv": ".csv", "columnar": ".col.jsonl"}
+
+
+class EscritorCSV:
+
+    def __init__(self, ruta, columnas):
+        self.columnas = list(columnas)
+        self.filas = 0
+        self._archivo = open(ruta, "w", newline="", encoding="utf-8")
+        self._csv = csv.writer(self._archivo)
+        self._csv.writerow(self.columnas)
+
+    def escribir(self, fila):
+        self._csv.writerow(fila)
+        self.filas += 1
+
+    def escribirVarias(self, filas):
+        for fila in filas:
+            self.escribir(fila)
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class EscritorColumnar:
+
+    def __init__(self, ruta, columnas, tamanoBloque=TAMANO_BLOQUE, agregar=False):
+        """
+        Con agregar=True continúa un archivo existente (sin repetir el encabezado).
+        """
+        self.columnas = list(columnas)
+        self.tamanoBloque = tamanoBloque
+        self.filas = 0
+        self._bloque = [[] for _ in self.columnas]
+        self._archivo = open(ruta, "a" if agregar else "w", encoding="utf-8")
+        if not agregar or self._archivo.tell() == 0:
+            self._linea({"formato": FORMATO_COLUMNAR, "version": VERSION_COLUMNAR, "columnas": self.columnas})
+
+    def _linea(self, objeto):
+        self._archivo.write(_json(objeto) + "\n")
+
+    def escribir(self, fila):
+        for valores, valor in zip(self._bloque, fila):
+            valores.append(valor)
+        self.filas += 1
+        if len(self._bloque[0]) >= self.tamanoBloque:
+            self.vaciar()
+
+    def escribirVarias(self, filas):
+        for fila in filas:
+            self.escribir(fila)
+
+    def agregarBloque(self, linea, filas):
+        """
+        Escribe un bloque ya codificado con codificarBloque (por ejemplo en otro
+        proceso) después del bloque en curso.
+        """
+        self.vaciar()
+        self._archivo.write(linea)
+        self.filas += filas
+
+    def vaciar(self):
+        """
+        Escribe el bloque en curso (si tiene filas) y lo manda al disco.
+        """
+        if self._bloque and self._bloque[0]:
+            self._linea({"filas": len(self._bloque[0]), "datos": dict(zip(self.columnas, self._bloque))})
+            self._bloque = [[] for _ in self.columnas]
+        self._archivo.flush()
+
+    def cerrar(self):
+        self.vaciar()
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _json(objeto):
+    return json.dumps(objeto, ensure_ascii=False, separators=(",", ":"))
+
+
+def codificarBloque(columnas, filas):
+    """
+    Línea de un bloque con 'filas' (tuplas en el orden de 'columnas'), para EscritorColumnar.agregarBloque.
+    """
+    datos = dict(zip(columnas, map(list, zip(*filas)))) if filas else {c: [] for c in columnas}
+    return _json({"filas": len(filas), "datos": datos}) + "\n"
+
+
+def abrirEscritor(formato, ruta, columnas):
+    if formato == "csv":
+        return EscritorCSV(ruta, columnas)
+    if formato == "columnar":
+        return EscritorColumnar(ruta, columnas)
+    raise ValueError(f"Formato desconocido: {formato!r}")
+
+
+def leerBloques(ruta):
+    """
+    Recorre un archivo columnar: retorna (columnas, generador de dicts columna -> lista).
+    Ignora una última línea incompleta.
+    """
+    archivo = open(ruta, encoding="utf-8")
+    encabezado = json.loads(archivo.readline())
+    if encabezado.get("formato") != FORMATO_COLUMNAR:
+        archivo.close()
+        raise ValueError(f"{ruta} no es un archivo {FORMATO_COLUMNAR}.")
+
+    def bloques():
+        with archivo:
+            for linea in archivo:
+                if not linea.endswith("\n"):
+                    return
+                yield json.loads(linea)["datos"]
+
+    return encabezado["columnas"], bloques()
+
+
+def leerFilas(ruta):
+    """
+    Filas (tuplas) de un archivo columnar, bloque por bloque.
+    """
+    columnas, bloques = leerBloques(ruta)
+    for datos in bloques:
+        yield from zip(*(datos[c] for c in columnas))
@@ -1,15 +1,262 @@
-import sqlite3
+from collections import OrderedDict
 from PyQt5.QtWidgets import (
-    QWidget, QVBoxLayout, QTableWidget,QPushButton, QTableWidgetItem, QLabel, QAbstractItemView
+    QWidget, QVBoxLayout, QTableView, QPushButton, QLabel, QAbstractItemView, QHeaderView, QLineEdit
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer, pyqtSignal
+
+from basedatos import obtenerBD
+from instrumentacion import medirAccion
+from servicios import LIMITE_BUSQUEDA, ServicioBanco
+from trabajos import obtenerDespachador
+
+
+class ModeloClientes(QAbstractTableModel):
+    """
+    Modelo de la tabla de clientes que solo trae de la base las páginas que la vista
+    está mostrando. Las páginas se piden con paginación por llave (keyset) sobre
+    columnas indexadas y se guardan en una caché LRU, así la memoria no crece con
+    el número de clientes.
+
+    El conteo y las páginas no se leen en el hilo de la interfaz: se envían al
+    Despachador (ver trabajos.py) y, mientras llegan, las filas muestran RELLENO.
+    Cada recarga o cambio de orden cancela los trabajos pendientes y descarta las
+    respuestas que lleguen de la generación anterior. Sin Despachador (benchmarks)
+    las consultas corren en el hilo que llama.
+
+    Con mostrarResultados el modelo pasa a mostrar solo una lista fija de filas
+    (los resultados de una búsqueda); recargar vuelve al listado completo.
+    """
+
+    COLUMNAS = ["ID Cliente", "Nombre", "Apellido", "Dirección", "Teléfono", "Correo"]
+    CAMPOS = ["noIdCliente", "nombre", "apellido", "direccion", "telefono", "correo"]
+    # Solo se ordena por columnas con índice (ver migración 4 en tablas.py)
+    ORDENABLES = {0, 1, 2}
+    TAMANO_PAGINA = 200
+    PAGINAS_EN_CACHE = 50
+    # Al desplazarse rápido solo interesan las últimas páginas pedidas
+    PAGINAS_PENDIENTES = 8
+    RELLENO = "…"
+
+    fallo = pyqtSignal(str)
+
+    def __init__(self, bd, trabajos=None, parent=None):
+        super().__init__(parent)
+        self.bd = bd
+        self.trabajos = trabajos
+        self.total = 0
+        self.columna_orden = 0
+        self.descendente = False
+        self.paginas = OrderedDict()
+        self.ultimas_llaves = {}     # página -> llave de su última fila, para pedir la siguiente
+        self.resultados = None       # filas de una búsqueda; None = listado completo
+        self.generacion = 0
+        self.pendientes = OrderedDict()     # página -> Trabajo que la está leyendo
+        self.conteo = None                  # Trabajo que está contando los clientes
+
+    # === Carga ===
+
+    def _enviar(self, funcion, *args, alTerminar, alFallar):
+        if self.trabajos is None:
+            try:
+                resultado = funcion(*args)
+            except Exception as e:
+                alFallar(e)
+            else:
+                alTerminar(resultado)
+            return None
+        return self.trabajos.enviar(funcion, *args, alTerminar=alTerminar, alFallar=alFallar)
+
+    def _cancelar(self, trabajo):
+        if trabajo is not None:
+            self.trabajos.cancelar(trabajo)
+
+    def _descartar(self):
+        """
+        Olvida las páginas y cancela los trabajos pendientes. Va entre
+        beginResetModel y endResetModel.
+        """
+        self.generacion += 1
+        for trabajo in self.pendientes.values():
+            self._cancelar(trabajo)
+        self.pendientes.clear()
+        self._cancelar(self.conteo)
+        self.conteo = None
+        self.paginas.clear()
+        self.ultimas_llaves.clear()
+
+    def recargar(self):
+        """
+        Vuelve a contar los clientes y descarta las páginas en caché.
+        """
+        self.beginResetModel()
+        self.resultados = None
+        self.total = 0
+        self._descartar()
+        self.endResetModel()
+        generacion = self.generacion
+        self.conteo = self._enviar(self.contar,
+                                   alTerminar=lambda total: self._conteoListo(generacion, total),
+                                   alFallar=lambda e: self._fallido(generacion, e))
+
+    def contar(self):
+        return self.bd.consultarUno("SELECT COUNT(*) FROM CLIENTES")[0]
+
+    def _conteoListo(self, generacion, total):
+        if generacion != self.generacion:
+            return
+        self.conteo = None
+        if total > 0:
+            self.beginInsertRows(QModelIndex(), 0, total - 1)
+            self.total = total
+            self.endInsertRows()
+
+    def mostrarResultados(self, filas):
+        self.beginResetModel()
+        self._descartar()
+        self.resultados = list(filas)
+        self.total = len(self.resultados)
+        self.endResetModel()
+
+    def _consultaPagina(self, pagina):
+        campo = self.CAMPOS[self.columna_orden]
+        direccion = "DESC" if self.descendente else "ASC"
+        comparador = "<" if self.descendente else ">"
+        columnas = ", ".join(self.CAMPOS)
+        if campo == "noIdCliente":
+            orden = f"noIdCliente {direccion}"
+            filtro = f"noIdCliente {comparador} ?"
+        else:
+            orden = f"{campo} {direccion}, noIdCliente {direccion}"
+            filtro = f"({campo}, noIdCliente) {comparador} (?, ?)"
+
+        llave = self.ultimas_llaves.get(pagina - 1)
+        if pagina == 0:
+            return f"SELECT {columnas} FROM CLIENTES ORDER BY {orden} LIMIT ?", (self.TAMANO_PAGINA,)
+        if llave is not None:
+            return (f"SELECT {columnas} FROM CLIENTES WHERE {filtro} ORDER BY {orden} LIMIT ?",
+                    llave + (self.TAMANO_PAGINA,))
+        # Salto directo (p. ej. arrastrando la barra): se usa OFFSET una sola vez
+        return (f"SELECT {columnas} FROM CLIENTES ORDER BY {orden} LIMIT ? OFFSET ?",
+                (self.TAMANO_PAGINA, pagina * self.TAMANO_PAGINA))
+
+    def leerPagina(self, sql, parametros):
+        return self.bd.consultar(sql, parametros)
+
+    def _pedirPagina(self, pagina):
+        # La consulta se arma aquí, en el hilo de la interfaz, que es el dueño de
+        # ultimas_llaves; el trabajo solo la ejecuta
+        sql, parametros = self._consultaPagina(pagina)
+        generacion = self.generacion
+        trabajo = self._enviar(self.leerPagina, sql, parametros,
+                               alTerminar=lambda filas: self._paginaLista(generacion, pagina, filas),
+                               alFallar=lambda e: self._fallido(generacion, e))
+        if trabajo is None:
+            return
+        self.pendientes[pagina] = trabajo
+        while len(self.pendientes) > self.PAGINAS_PENDIENTES:
+            _, antiguo = self.pendientes.popitem(last=False)
+            self._cancelar(antiguo)
+
+    def _paginaLista(self, generacion, pagina, filas):
+        if generacion != self.generacion:
+            return
+        self.pendientes.pop(pagina, None)
+        if filas:
+            ultima = filas[-1]
+            if self.columna_orden == 0:
+                self.ultimas_llaves[pagina] = (ultima[0],)
+            else:
+                self.ultimas_llaves[pagina] = (ultima[self.columna_orden], ultima[0])
+
+        self.paginas[pagina] = filas
+        if len(self.paginas) > self.PAGINAS_EN_CACHE:
+            self.paginas.popitem(last=False)
+
+        primera = pagina * self.TAMANO_PAGINA
+        ultima_fila = min(primera + self.TAMANO_PAGINA, self.total) - 1
+        if ultima_fila >= primera:
+            self.dataChanged.emit(self.index(primera, 0), self.index(ultima_fila, len(self.COLUMNAS) - 1))
+
+    def _fallido(self, generacion, error):
+        # La página que falló queda en pendientes para no reintentarla en cada repintado
+        if generacion == self.generacion:
+            self.fallo.emit(str(error))
+
+    # === Interfaz de QAbstractTableModel ===
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.total
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        if role != Qt.DisplayRole:
+            return None
+        if self.resultados is not None:
+            valor = self.resultados[index.row()][index.column()]
+        else:
+            pagina, fila = divmod(index.row(), self.TAMANO_PAGINA)
+            filas = self.paginas.get(pagina)
+            if filas is None:
+                pendiente = self.pendientes.get(pagina)
+                if pendiente is None or pendiente.cancelado():
+                    self._pedirPagina(pagina)
+                filas = self.paginas.get(pagina)
+                if filas is None:
+                    return self.RELLENO
+            self.paginas.move_to_end(pagina)
+            if fila >= len(filas):
+                return None
+            valor = filas[fila][index.column()]
+        return "" if valor is None else str(valor)
+
+    def headerData(self, seccion, orientacion, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientacion == Qt.Horizontal:
+            return self.COLUMNAS[seccion]
+        return str(seccion + 1)
+
+    def sort(self, columna, orden=Qt.AscendingOrder):
+        """
+        El orden se resuelve en SQL con ORDER BY; columnas sin índice se ignoran.
+        Los resultados de una búsqueda (pocas filas) se ordenan en memoria.
+        """
+        if self.resultados is not None:
+            self.beginResetModel()
+            # Dirección, teléfono y correo pueden ser NULL: esos van al final en
+            # ambas direcciones, así que solo se invierten las filas con valor
+            con_valor = sorted((f for f in self.resultados if f[columna] is not None),
+                               key=lambda f: f[columna], reverse=orden == Qt.DescendingOrder)
+            self.resultados = con_valor + [f for f in self.resultados if f[columna] is None]
+            self.endResetModel()
+            return
+        if columna not in self.ORDENABLES:
+            return
+        self.beginResetModel()
+        self.columna_orden = columna
+        self.descendente = orden == Qt.DescendingOrder
+        self._descartar()
+        self.endResetModel()
+
 
 class ConsultaClientesGUI(QWidget):
+    # Milisegundos sin teclear antes de lanzar la búsqueda
+    ESPERA_BUSQUEDA_MS = 250
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Consulta Total de Clientes – Neobanco Digital")
         self.setGeometry(200, 100, 800, 500)
-        self.conn = sqlite3.connect("basemibanco.db")
+        self.bd = obtenerBD()
+        self.servicio = ServicioBanco(self.bd)
+        self.trabajos = obtenerDespachador()
+        self.cargado = False
         self.init_ui()
 
     def init_ui(self):
@@ -35,43 +282,69 @@ class ConsultaClientesGUI(QWidget):
         titulo.setAlignment(Qt.AlignCenter)
         titulo.setStyleSheet("font-size: 20px; font-weight: bold; color: #003366;")
         layout.addWidget(titulo)
-        
+
         btn_consultarClientes = QPushButton("Consultar Clientes")
         btn_consultarClientes.clicked.connect(self.cargar_datos)
         layout.addWidget(btn_consultarClientes)
 
+        # Búsqueda mientras se escribe: cada tecla reinicia el temporizador y solo
+        # se consulta cuando el usuario hace una pausa
+        self.buscador = QLineEdit()
+        self.buscador.setPlaceholderText("Buscar por nombre, apellido, correo, teléfono o ID")
+        self.buscador.setClearButtonEnabled(True)
+        layout.addWidget(self.buscador)
+        self.temporizador = QTimer(self)
+        self.temporizador.setSingleShot(True)
+        self.temporizador.setInterval(self.ESPERA_BUSQUEDA_MS)
+        self.temporizador.timeout.connect(self.buscar)
+        self.buscador.textChanged.connect(self.temporizador.start)
+        self.estado_busqueda = QLabel("")
+        layout.addWidget(self.estado_busqueda)
 
-                            
-        self.tabla = QTableWidget()
-        self.cargar_datos()
+        # La tabla no carga nada hasta que la vista se muestra por primera vez
+        self.modelo = ModeloClientes(self.bd, self.trabajos, self)
+        self.modelo.fallo.connect(lambda error: self.estado_busqueda.setText(f"Error al leer clientes: {error}"))
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tabla.setSortingEnabled(True)
+        self.tabla.sortByColumn(0, Qt.AscendingOrder)
+        # Tamaños fijos: ajustar al contenido obligaría a leer todas las filas
+        self.tabla.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.tabla.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabla.verticalHeader().setDefaultSectionSize(24)
         layout.addWidget(self.tabla)
 
         self.setLayout(layout)
 
-    def cargar_datos(self):
-        cursor = self.conn.cursor()
-
-        # Obtener número de filas
-        cursor.execute("SELECT COUNT(*) FROM CLIENTES")
-        total_filas = cursor.fetchone()[0]
-
-        # Obtener los datos de todos los clientes
-        cursor.execute("SELECT * FROM CLIENTES")
-        datos = cursor.fetchall()
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self.cargado:
+            self.cargar_datos()
 
-        # Definir columnas
-        columnas = ["ID Cliente", "Nombre", "Apellido", "Dirección", "Teléfono", "Correo"]
-        self.tabla.setColumnCount(len(columnas))
-        self.tabla.setHorizontalHeaderLabels(columnas)
-        self.tabla.setRowCount(total_filas)
+    @medirAccion
+    def cargar_datos(self):
+        self.cargado = True
+        self.buscador.blockSignals(True)
+        self.buscador.clear()
+        self.buscador.blockSignals(False)
+        self.estado_busqueda.clear()
+        self.modelo.recargar()
 
-        for fila_idx, fila_dato in enumerate(datos):
-            for col_idx, valor in enumerate(fila_dato):
-                item = QTableWidgetItem(str(valor))
-                item.setTextAlignment(Qt.AlignCenter)
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)  # Hacerlo no editable
-                self.tabla.setItem(fila_idx, col_idx, item)
+    @medirAccion
+    def buscar(self):
+        texto = self.buscador.text().strip()
+        if not texto:
+            self.cargar_datos()
+            return
+        self.trabajos.enviar(self.servicio.buscarClientes, texto,
+                             alTerminar=lambda filas: self.mostrar_resultados(texto, filas),
+                             alFallar=lambda e: self.estado_busqueda.setText(f"Error en la búsqueda: {e}"))
 
-        self.tabla.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        self.tabla.setSortingEnabled(True)
-        self.tabla.resizeColumnsToContents()
+    def mostrar_resultados(self, texto, filas):
+        # Una respuesta que llega después de que el usuario siguió escribiendo se descarta
+        if texto != self.buscador.text().strip():
+            return
+        self.modelo.mostrarResultados(filas)
+        limite = f" (se muestran los primeros {LIMITE_BUSQUEDA})" if len(filas) >= LIMITE_BUSQUEDA else ""
+        self.estado_busqueda.setText(f"{len(filas)} resultados{limite}")
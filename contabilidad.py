@@ -0,0 +1,232 @@
+"""
+Libro de asientos por partida doble de las cuentas contratadas.
+
+Cada movimiento de dinero deja en la tabla Asientos una o más partidas: cuenta
+contable debitada, cuenta contable acreditada y valor, así que cada partida
+cuadra por sí sola. Un pago de crédito se divide en interés (CAJA contra
+INGRESOS_INTERESES) y capital (CAJA contra CARTERA_CREDITOS); una consignación
+es un depósito (CAJA contra DEPOSITOS_AHORRO).
+
+Además cada partida guarda cuánto cambió el saldo de la cuenta del cliente
+('variacion') y el saldo que quedó después ('saldo', en orden de registro), y la
+tabla CortesSaldo guarda saldos de corte periódicos (ver tomarCortes). El saldo
+a cualquier fecha es entonces una búsqueda indexada del último corte más la suma
+de las pocas partidas posteriores (ver saldoAl), sin recorrer toda la historia.
+
+Registrar una partida con fecha anterior a un corte borra los cortes afectados
+de esa cuenta (trigger trgAsientosInvalidaCortes), así que saldoAl nunca usa un
+corte viejo: suma desde el corte anterior que quede. Volver a tomar el corte de
+esa fecha lo rehace.
+
+Uso: python contabilidad.py corte 2025-10-31
+     python contabilidad.py saldo <idCuenta> 2025-06-30
+     python contabilidad.py auditar
+"""
+import argparse
+from collections import namedtuple
+
+from basedatos import obtenerBD
+
+CAJA = "CAJA"
+CARTERA = "CARTERA_CREDITOS"
+DEPOSITOS = "DEPOSITOS_AHORRO"
+INGRESOS_INTERESES = "INGRESOS_INTERESES"
+GASTO_INTERESES = "GASTO_INTERESES"
+EXCEDENTES = "EXCEDENTES_POR_APLICAR"
+
+TOLERANCIA = 0.005
+
+Asiento = namedtuple("Asiento", [
+    "idAsiento", "idTransaccion", "fecha", "concepto", "debito", "credito", "valor", "variacion", "saldo",
+])
+Descuadre = namedtuple("Descuadre", ["idCuenta", "saldoCuenta", "saldoLibro", "sumaVariaciones"])
+
+SQL_INSERTAR_ASIENTO = """
+    INSERT INTO Asientos
+    (idTransaccion, idCuentaCredito, fecha, concepto, debito, credito, valor, variacion, saldo)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SALDO_AL = """
+    SELECT IFNULL(K.saldo, 0) + IFNULL((
+        SELECT SUM(A.variacion) FROM Asientos A
+        WHERE A.idCuentaCredito = :cuenta AND A.fecha > IFNULL(K.fecha, '') AND A.fecha <= :fecha
+    ), 0)
+    FROM (SELECT NULL) LEFT JOIN (
+        SELECT fecha, saldo FROM CortesSaldo
+        WHERE idCuentaCredito = :cuenta AND fecha <= :fecha
+        ORDER BY fecha DESC LIMIT 1
+    ) K
+"""
+
+SQL_TOMAR_CORTES = """
+    INSERT OR REPLACE INTO CortesSaldo (idCuentaCredito, fecha, saldo)
+    SELECT C.idCuentaCredito, :fecha, IFNULL(K.saldo, 0) + (
+        SELECT SUM(A.variacion) FROM Asientos A
+        WHERE A.idCuentaCredito = C.idCuentaCredito AND A.fecha > IFNULL(K.fecha, '') AND A.fecha <= :fecha
+    )
+    FROM (
+        SELECT DISTINCT idCuentaCredito FROM Asientos WHERE fecha > :desde AND fecha <= :fecha
+    ) C
+    LEFT JOIN CortesSaldo K ON K.idCuentaCredito = C.idCuentaCredito AND K.fecha = (
+        SELECT MAX(fecha) FROM CortesSaldo
+        WHERE idCuentaCredito = C.idCuentaCredito AND fecha < :fecha
+    )
+"""
+
+
+def _partida(idTransaccion, idCuenta, fecha, concepto, debito, credito, valor, variacion, saldo):
+    # Un valor negativo se registra como la partida inversa
+    if valor < 0:
+        debito, credito, valor = credito, debito, -valor
+    return (idTransaccion, idCuenta, fecha, concepto, debito, credito, valor, variacion, saldo)
+
+
+# === Partidas por tipo de movimiento ===
+
+def asientosPagoCredito(idTransaccion, idCuenta, fecha, saldoAnterior, nuevoSaldo, interes, valor):
+    """
+    Interés, abono a capital y, si el pago supera la deuda, el excedente.
+    """
+    capital = saldoAnterior - nuevoSaldo
+    partidas = [
+        _partida(idTransaccion, idCuenta, fecha, "interes", CAJA, INGRESOS_INTERESES,
+                 interes, 0.0, saldoAnterior),
+        _partida(idTransaccion, idCuenta, fecha, "capital", CAJA, CARTERA,
+                 capital, -capital, nuevoSaldo),
+    ]
+    excedente = valor - capital - interes
+    if excedente > TOLERANCIA:
+        partidas.append(_partida(idTransaccion, idCuenta, fecha, "excedente", CAJA, EXCEDENTES,
+                                 excedente, 0.0, nuevoSaldo))
+    return partidas
+
+
+def asientosMovimientoAhorro(idTransaccion, idCuenta, fecha, valor, nuevoSaldo):
+    concepto = "deposito" if valor >= 0 else "retiro"
+    return [_partida(idTransaccion, idCuenta, fecha, concepto, CAJA, DEPOSITOS, valor, valor, nuevoSaldo)]
+
+
+def asientosInteresAhorro(idTransaccion, idCuenta, fecha, interes, nuevoSaldo):
+    return [_partida(idTransaccion, idCuenta, fecha, "interes", GASTO_INTERESES, DEPOSITOS,
+                     interes, interes, nuevoSaldo)]
+
+
+def registrarAsientos(s, partidas):
+    s.ejecutarVarios(SQL_INSERTAR_ASIENTO, partidas)
+
+
+def registrarAperturas(s, idDesde, idHasta):
+    """
+    Partida de apertura (desembolso del crédito o depósito inicial del ahorro) de
+    los contratos con idCuentaCredito entre idDesde e idHasta, en una sola sentencia.
+    """
+    s.ejecutar(f"""
+        INSERT INTO Asientos
+        (idTransaccion, idCuentaCredito, fecha, concepto, debito, credito, valor, variacion, saldo)
+        SELECT NULL, PC.idCuentaCredito, IFNULL(PC.fechaEntrega, date('now')),
+               CASE WHEN P.TipoProducto = 1 THEN 'desembolso' ELSE 'deposito' END,
+               CASE WHEN P.TipoProducto = 1 THEN '{CARTERA}' ELSE '{CAJA}' END,
+               CASE WHEN P.TipoProducto = 1 THEN '{CAJA}' ELSE '{DEPOSITOS}' END,
+               PC.saldoCapital, PC.saldoCapital, PC.saldoCapital
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE PC.idCuentaCredito BETWEEN ? AND ?
+    """, (idDesde, idHasta))
+
+
+def insertarTransacciones(s, filas):
+    """
+    Inserta [(idCuenta, fecha, valor)] con executemany y retorna sus idTransaccion
+    en el mismo orden. Requiere la transacción de escritura abierta: nadie más
+    puede insertar entre medio, así que los nuevos son los ids mayores al último.
+    """
+    ultimo = s.consultarUno("SELECT IFNULL(MAX(idTransaccion), 0) FROM Transacciones")[0]
+    s.ejecutarVarios("INSERT INTO Transacciones (idCuentaCredito, fechaPago, valorPagado) VALUES (?, ?, ?)", filas)
+    return [fila[0] for fila in s.consultar(
+        "SELECT idTransaccion FROM Transacciones WHERE idTransaccion > ? ORDER BY idTransaccion", (ultimo,)
+    )]
+
+
+# === Consultas ===
+
+def saldoAl(origen, idCuenta, fecha):
+    """
+    Saldo de la cuenta al cierre de 'fecha' (ISO): último corte más la suma de
+    las partidas posteriores, ambas búsquedas sobre índices de (cuenta, fecha).
+    """
+    return origen.consultarUno(SQL_SALDO_AL, {"cuenta": idCuenta, "fecha": fecha})[0]
+
+
+def extracto(origen, idCuenta, desde, hasta):
+    """
+    Partidas de la cuenta entre dos fechas ISO, inclusive, como [Asiento].
+    """
+    return [Asiento._make(f) for f in origen.consultar("""
+        SELECT idAsiento, idTransaccion, fecha, concepto, debito, credito, valor, variacion, saldo
+        FROM Asientos
+        WHERE idCuentaCredito = ? AND fecha BETWEEN ? AND ?
+        ORDER BY fecha, idAsiento
+    """, (idCuenta, desde, hasta))]
+
+
+def tomarCortes(bd, fecha):
+    """
+    Guarda el saldo al cierre de 'fecha' de las cuentas con partidas desde el
+    corte anterior. Retorna cuántos cortes se escribieron.
+    """
+    with bd.transaccion() as s:
+        desde = s.consultarUno(
+            "SELECT IFNULL(MAX(fecha), '') FROM CortesSaldo WHERE fecha < ?", (fecha,)
+        )[0]
+        return s.ejecutar(SQL_TOMAR_CORTES, {"fecha": fecha, "desde": desde}).rowcount
+
+
+def auditarCuentas(origen):
+    """
+    Compara, para cada cuenta, el saldo guardado en ProductosContratados con el
+    saldo de su última partida y con la suma de todas sus variaciones.
+    Retorna la lista de Descuadre (vacía si el libro cuadra).
+    """
+    filas = origen.consultar("""
+        SELECT PC.idCuentaCredito, PC.saldoCapital, L.saldo, L.total
+        FROM ProductosContratados PC
+        LEFT JOIN (
+            -- con MAX(), SQLite toma 'saldo' de la misma fila que el último idAsiento
+            SELECT idCuentaCredito, MAX(idAsiento), saldo, SUM(variacion) AS total
+            FROM Asientos GROUP BY idCuentaCredito
+        ) L ON L.idCuentaCredito = PC.idCuentaCredito
+    """)
+    return [
+        Descuadre(idc, saldo, libro, total)
+        for idc, saldo, libro, total in filas
+        if libro is None or abs(saldo - libro) > TOLERANCIA or abs(saldo - total) > TOLERANCIA
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Libro de asientos y saldos de corte")
+    ordenes = parser.add_subparsers(dest="orden", required=True)
+    corte = ordenes.add_parser("corte", help="Tomar saldos de corte a una fecha")
+    corte.add_argument("fecha", help="YYYY-MM-DD")
+    saldo = ordenes.add_parser("saldo", help="Saldo de una cuenta a una fecha")
+    saldo.add_argument("idCuenta", type=int)
+    saldo.add_argument("fecha", help="YYYY-MM-DD")
+    ordenes.add_parser("auditar", help="Verificar que el libro cuadre con los saldos")
+    args = parser.parse_args()
+
+    from cuentas import normalizarFecha
+    from tablas import crearTablas
+
+    bd = obtenerBD()
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    if args.orden == "corte":
+        print(f"{tomarCortes(bd, normalizarFecha(args.fecha))} cortes guardados")
+    elif args.orden == "saldo":
+        print(f"{saldoAl(bd, args.idCuenta, normalizarFecha(args.fecha)):,.2f}")
+    else:
+        descuadres = auditarCuentas(bd)
+        for d in descuadres:
+            print(f"Cuenta {d.idCuenta}: saldo {d.saldoCuenta} libro {d.saldoLibro} suma {d.sumaVariaciones}")
+        print("El libro cuadra." if not descuadres else f"{len(descuadres)} cuentas descuadradas.")
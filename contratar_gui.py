@@ -1,4 +1,3 @@
-import sqlite3
 from datetime import datetime
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
@@ -6,6 +5,11 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import QDate
 
+from basedatos import obtenerBD
+from instrumentacion import medirAccion
+from servicios import OperacionInvalida, ServicioBanco, SolicitudContrato
+from trabajos import obtenerDespachador
+
 class ContratarGUI(QWidget):
     """
     Ventana gráfica que permite contratar un producto financiero (Crédito o Ahorros)
@@ -14,12 +18,13 @@ class ContratarGUI(QWidget):
 
     def __init__(self):
         """
-        Constructor de la clase. Establece la conexión con la base de datos
+        Constructor de la clase. Crea el servicio sobre la base de datos compartida
         y configura la interfaz gráfica.
         """
         super().__init__()
         self.setWindowTitle("Contratar Producto")
-        self.conn = sqlite3.connect("basemibanco.db")
+        self.servicio = ServicioBanco(obtenerBD())
+        self.trabajos = obtenerDespachador()
         self.setStyleSheet(self.estilos())  # Aplicar estilos a los botones
         self.init_ui()
 
@@ -65,68 +70,64 @@ class ContratarGUI(QWidget):
         # Cargar productos desde base de datos al ComboBox
         self.cargar_productos()
 
+    def showEvent(self, event):
+        """
+        Si se crearon productos desde que se llenó el ComboBox, lo vuelve a cargar.
+        """
+        super().showEvent(event)
+        if self.servicio.versionCatalogo() != self.version_productos:
+            self.cargar_productos()
+
     def cargar_productos(self):
         """
-        Llena el ComboBox con los productos disponibles en la base de datos.
+        Llena el ComboBox con los productos del catálogo (en memoria, ver catalogo.py).
         """
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT NoIdProducto, NombreProducto, TipoProducto FROM PRODUCTOS")
-        productos = cursor.fetchall()
+        self.version_productos = self.servicio.versionCatalogo()
+        self.trabajos.enviar(self.servicio.listarProductos,
+                             alTerminar=self.mostrar_productos, alFallar=self.mostrar_error)
+
+    def mostrar_productos(self, productos):
         self.productos_combo.clear()
-        for idp, nombre, tipo in productos:
-            tipo_str = "Crédito" if tipo == 1 else "Ahorros"
-            self.productos_combo.addItem(f"{idp} - {nombre} ({tipo_str})", (idp, tipo))
+        for producto in productos:
+            tipo_str = "Crédito" if producto.tipo == 1 else "Ahorros"
+            self.productos_combo.addItem(f"{producto.noIdProducto} - {producto.nombre} ({tipo_str})",
+                                         (producto.noIdProducto, producto.tipo))
+
+    def mostrar_error(self, e):
+        if isinstance(e, OperacionInvalida):
+            QMessageBox.warning(self, "Error", str(e))
+        else:
+            QMessageBox.critical(self, "Error", str(e))
 
+    @medirAccion
     def contratar(self):
         """
         Registra un nuevo producto contratado por un cliente, validando los datos según el tipo de producto.
         """
         # Leer ID cliente y producto seleccionado
         id_cliente = self.input_id_cliente.text()
-        idp, tipo = self.productos_combo.currentData()
-
-        # Leer capital y plazo
-        try:
-            capital = float(self.input_capital.text())
-            plazo = int(self.input_plazo.text())
-        except ValueError:
-            QMessageBox.warning(self, "Error", "Capital y plazo deben ser numéricos.")
+        if self.productos_combo.currentData() is None:
+            QMessageBox.warning(self, "Error", "No hay productos para contratar.")
             return
+        idp, tipo = self.productos_combo.currentData()
 
-        # Obtener la fecha en formato "dd/mm/yyyy"
-        fecha = self.fecha_entrega.date().toString("dd/MM/yyyy")
+        # Fecha en ISO "yyyy-MM-dd", el formato con el que se guarda
+        fecha = self.fecha_entrega.date().toString("yyyy-MM-dd")
 
-        # Validar que el cliente exista en la base de datos
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT 1 FROM CLIENTES WHERE noIdCliente=?", (id_cliente,))
-        if not cursor.fetchone():
-            QMessageBox.warning(self, "Error", "El cliente no existe.")
+        # Capital, plazo y reglas por tipo de producto se validan en el servicio
+        try:
+            solicitud = SolicitudContrato.desdeTexto(
+                id_cliente, idp, tipo, self.input_capital.text(), self.input_plazo.text(), fecha
+            )
+        except OperacionInvalida as e:
+            self.mostrar_error(e)
             return
 
-        # Validaciones específicas según tipo de producto
-        if tipo == 1:  # Crédito
-            if capital <= 0 or plazo <= 0:
-                QMessageBox.warning(self, "Error", "Crédito debe tener capital y plazo > 0.")
-                return
-        else:  # Ahorros
-            if capital < 100000:
-                QMessageBox.warning(self, "Error", "Ahorros mínimo de $100.000")
-                return
-            plazo = 0  # Ahorros no tiene plazo
-
-        # Insertar registro en tabla ProductosContratados
-        saldo = capital
-        plazo_pend = plazo
-        try:
-            cursor.execute('''
-                INSERT INTO PRODUCTOSCONTRATADOS
-                (idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega, saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (idp, id_cliente, capital, plazo, fecha, saldo, 0, plazo_pend))
-            self.conn.commit()
-            QMessageBox.information(self, "Éxito", "Producto contratado correctamente.")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        self.trabajos.enviar(
+            self.servicio.contratarProducto, solicitud,
+            alTerminar=lambda _: QMessageBox.information(self, "Éxito", "Producto contratado correctamente."),
+            alFallar=self.mostrar_error
+        )
 
     def estilos(self):
         """
@@ -0,0 +1,264 @@
+"""
+Operaciones sobre cuentas contratadas (créditos y ahorros).
+
+obtenerSnapshot trae en una sola consulta indexada todo lo que un pago necesita:
+saldo, plazo pendiente y nombre del titular; el tipo de producto y la tasa salen
+del catálogo en memoria (ver catalogo.py), sin unir con PRODUCTOS. Los pagos se
+aplican dentro de una única transacción BEGIN IMMEDIATE con un INSERT ... RETURNING
+seguido de un UPDATE, para mantener el candado de escritura el menor tiempo posible.
+"""
+import math
+import re
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+
+from amortizacion import cuotaMes, tablaAmortizacion, tablasAmortizacion
+from archivo_historico import pagoArchivadoEnMes
+from catalogo import catalogoDe
+from contabilidad import asientosMovimientoAhorro, asientosPagoCredito, registrarAsientos
+
+CREDITO = 1
+AHORROS = 2
+
+SnapshotCuenta = namedtuple("SnapshotCuenta", [
+    "idCuenta", "tipo", "saldo", "plazoPendiente", "interes",
+    "interesesPagados", "idCliente", "nombre", "apellido",
+])
+
+PagoCredito = namedtuple("PagoCredito", [
+    "idTransaccion", "cuenta", "fecha", "capital", "interes", "valor", "nuevoSaldo", "nuevoPlazo",
+])
+
+MovimientoAhorro = namedtuple("MovimientoAhorro", [
+    "idTransaccion", "cuenta", "fecha", "valor", "nuevoSaldo",
+])
+
+SQL_SNAPSHOT = """
+    SELECT PC.idCuentaCredito, PC.idProducto, PC.saldoCapital, PC.plazoPendiente,
+           PC.sumatoriaInteresesPagados, PC.idCliente, C.nombre, C.apellido
+    FROM ProductosContratados PC
+    LEFT JOIN Clientes C ON C.noIdCliente = PC.idCliente
+    WHERE PC.idCuentaCredito = ?
+"""
+
+SQL_INSERTAR_TRANSACCION = """
+    INSERT INTO Transacciones (idCuentaCredito, fechaPago, valorPagado)
+    VALUES (?, ?, ?)
+    RETURNING idTransaccion
+"""
+
+SQL_MOVER_SALDO = """
+    UPDATE ProductosContratados
+    SET saldoCapital = saldoCapital + ?
+    WHERE idCuentaCredito = ? AND saldoCapital + ? >= 0
+    RETURNING saldoCapital
+"""
+
+_FECHA_ISO = re.compile(r"\d{4}-\d{2}-\d{2}")
+_FECHA_DIA_MES = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+
+SQL_MOVIMIENTOS_ENTRE = """
+    SELECT idTransaccion, fechaPago, valorPagado
+    FROM {tabla}
+    WHERE idCuentaCredito = ? AND fechaPago BETWEEN ? AND ?
+    ORDER BY fechaPago
+"""
+
+
+class OperacionInvalida(Exception):
+    """
+    La operación no aplica a la cuenta (tipo equivocado, crédito pagado, fondos insuficientes...).
+    El mensaje está listo para mostrarse al usuario.
+    """
+
+
+def normalizarFecha(fecha):
+    """
+    Retorna la fecha como texto ISO 'YYYY-MM-DD', que se ordena y se compara por
+    rangos igual que las fechas. Acepta también 'dd/mm/yyyy' (formato de las vistas).
+    Una fecha mal formada o inexistente (por ejemplo 2025-02-30) es OperacionInvalida.
+    """
+    texto = str(fecha or "").strip()
+    try:
+        if _FECHA_ISO.fullmatch(texto):
+            return date.fromisoformat(texto).isoformat()
+        partes = _FECHA_DIA_MES.fullmatch(texto)
+        if partes:
+            dia, mes, anio = map(int, partes.groups())
+            return date(anio, mes, dia).isoformat()
+    except ValueError:
+        pass
+    raise OperacionInvalida(f"Fecha inválida: {texto!r}. Use el formato AAAA-MM-DD.")
+
+
+def validarValor(valor, positivo=False):
+    """
+    Retorna el valor como float. Texto no numérico, NaN, infinito (y cero o
+    negativos si 'positivo') son OperacionInvalida.
+    """
+    try:
+        valor = float(valor)
+    except (TypeError, ValueError):
+        raise OperacionInvalida("Valor inválido.")
+    if not math.isfinite(valor) or (positivo and valor <= 0):
+        raise OperacionInvalida("Valor inválido.")
+    return valor
+
+
+def repartirPago(saldo, plazo, tasa, valor=None):
+    """
+    Reparte el pago del mes de un crédito con 'saldo', 'plazo' pendiente y 'tasa':
+    retorna (capital, interés del mes, valor, nuevo saldo, nuevo plazo). Sin
+    'valor' se paga la cuota completa; lo que exceda el interés se abona a
+    capital, y un valor mayor que el saldo más el interés es OperacionInvalida.
+    """
+    capital, interes_mes, total = cuotaMes(saldo, plazo, tasa)
+    if valor is None:
+        valor = total
+    elif round(valor, 2) > round(saldo + interes_mes, 2):
+        raise OperacionInvalida("El valor supera el saldo del crédito más el interés del mes.")
+    return capital, interes_mes, valor, max(0, saldo - (valor - interes_mes)), max(0, plazo - 1)
+
+
+def obtenerSnapshot(origen, idCuenta):
+    """
+    Retorna el SnapshotCuenta de la cuenta o None si no existe.
+    'origen' puede ser la BaseDatos o una Sesion abierta (ambas tienen consultarUno).
+    """
+    fila = origen.consultarUno(SQL_SNAPSHOT, (idCuenta,))
+    if fila is None:
+        return None
+    idCuenta, idProducto, saldo, plazo, intereses, idCliente, nombre, apellido = fila
+    producto = catalogoDe(origen).obtener(origen, idProducto)
+    if producto is None:
+        return None
+    return SnapshotCuenta(idCuenta, producto.tipo, saldo, plazo, producto.remuneracion,
+                          intereses, idCliente, nombre, apellido)
+
+
+def tablaDeCuenta(origen, idCuenta):
+    """
+    Tabla de amortización restante de un crédito, o None si la cuenta no es un crédito.
+    """
+    cuenta = obtenerSnapshot(origen, idCuenta)
+    if cuenta is None or cuenta.tipo != CREDITO:
+        return None
+    return tablaAmortizacion(cuenta.saldo, cuenta.plazoPendiente, cuenta.interes)
+
+
+def proyeccionCartera(origen):
+    """
+    Proyecta la cartera de créditos vigentes: retorna (meses, capital, interés)
+    con el total que se espera recibir en cada mes futuro.
+    """
+    filas = origen.consultar("""
+        SELECT PC.saldoCapital, PC.plazoPendiente, P.Remuneracion
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE P.TipoProducto = ? AND PC.plazoPendiente > 0
+    """, (CREDITO,))
+    if not filas:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    datos = np.array(filas, dtype=float)
+    tabla = tablasAmortizacion(datos[:, 0], datos[:, 1], datos[:, 2])
+    return tabla.mes[0], tabla.capital.sum(axis=0), tabla.interes.sum(axis=0)
+
+
+def pagoRegistradoEnMes(origen, idCuenta, mes):
+    """
+    True si la cuenta ya tiene una transacción en el mes 'YYYY-MM', en la base
+    caliente o, si el mes ya se archivó, en el archivo de su año.
+    """
+    if origen.consultarUno(
+        "SELECT 1 FROM Transacciones WHERE idCuentaCredito = ? AND mesPago = ? LIMIT 1",
+        (idCuenta, mes)
+    ) is not None:
+        return True
+    return pagoArchivadoEnMes(idCuenta, mes, getattr(origen, "bd", origen).ruta)
+
+
+def movimientosEntre(origen, idCuenta, desde, hasta, historico=False):
+    """
+    Movimientos de la cuenta con fecha entre 'desde' y 'hasta' (ISO, inclusive):
+    [(idTransaccion, fechaPago, valorPagado)]. Es un recorrido por rango sobre el
+    índice cubriente idxTransaccionesCuentaFecha.
+    Solo lee la base caliente; con 'historico' lee la vista TransaccionesHistoricas,
+    que 'origen' debe tener (ver archivo_historico.lecturaHistorica).
+    """
+    tabla = "TransaccionesHistoricas" if historico else "Transacciones"
+    return origen.consultar(SQL_MOVIMIENTOS_ENTRE.format(tabla=tabla), (idCuenta, desde, hasta))
+
+
+def aplicarPagoCredito(s, idCuenta, fecha, valor=None):
+    """
+    Aplica el pago de la cuota del mes sobre una Sesion con transacción abierta
+    y retorna un PagoCredito. Si no se indica valor se paga la cuota completa;
+    lo que exceda el interés del mes se abona a capital. Solo se admite un pago por mes.
+    """
+    fecha = normalizarFecha(fecha)
+    if valor is not None:
+        valor = validarValor(valor, positivo=True)
+    cuenta = obtenerSnapshot(s, idCuenta)
+    if cuenta is None or cuenta.tipo != CREDITO:
+        raise OperacionInvalida("No es un crédito.")
+    if cuenta.plazoPendiente <= 0:
+        raise OperacionInvalida("Crédito ya pagado.")
+    if pagoRegistradoEnMes(s, idCuenta, fecha[:7]):
+        raise OperacionInvalida("Ya existe un pago para este mes.")
+
+    capital, interes_mes, valor, nuevo_saldo, nuevo_plazo = repartirPago(
+        cuenta.saldo, cuenta.plazoPendiente, cuenta.interes, valor
+    )
+
+    id_transaccion = s.consultar(SQL_INSERTAR_TRANSACCION, (idCuenta, fecha, valor))[0][0]
+    s.ejecutar("""
+        UPDATE ProductosContratados
+        SET saldoCapital=?, plazoPendiente=?, sumatoriaInteresesPagados=sumatoriaInteresesPagados+?
+        WHERE idCuentaCredito=?
+    """, (nuevo_saldo, nuevo_plazo, interes_mes, idCuenta))
+    registrarAsientos(s, asientosPagoCredito(
+        id_transaccion, idCuenta, fecha, cuenta.saldo, nuevo_saldo, interes_mes, valor
+    ))
+
+    return PagoCredito(id_transaccion, cuenta, fecha, capital, interes_mes, valor, nuevo_saldo, nuevo_plazo)
+
+
+def pagarCuotaCredito(bd, idCuenta, fecha, valor=None):
+    """
+    Paga la cuota en su propia transacción (ver aplicarPagoCredito).
+    """
+    with bd.transaccion() as s:
+        return aplicarPagoCredito(s, idCuenta, fecha, valor)
+
+
+def aplicarMovimientoAhorro(s, idCuenta, valor, fecha):
+    """
+    Consigna (valor > 0) o retira (valor < 0) de una cuenta de ahorros sobre una
+    Sesion con transacción abierta y retorna un MovimientoAhorro.
+    El saldo se ajusta con un UPDATE condicional relativo al valor guardado, no
+    con uno calculado en Python, así que dos cajeros concurrentes nunca pisan
+    el movimiento del otro ni pueden dejar la cuenta en negativo.
+    """
+    fecha = normalizarFecha(fecha)
+    valor = validarValor(valor)
+    cuenta = obtenerSnapshot(s, idCuenta)
+    if cuenta is None or cuenta.tipo != AHORROS:
+        raise OperacionInvalida("No es una cuenta de ahorros.")
+
+    filas = s.consultar(SQL_MOVER_SALDO, (valor, idCuenta, valor))
+    if not filas:
+        raise OperacionInvalida("Fondos insuficientes.")
+    id_transaccion = s.consultar(SQL_INSERTAR_TRANSACCION, (idCuenta, fecha, valor))[0][0]
+    registrarAsientos(s, asientosMovimientoAhorro(id_transaccion, idCuenta, fecha, valor, filas[0][0]))
+
+    return MovimientoAhorro(id_transaccion, cuenta, fecha, valor, filas[0][0])
+
+
+def transaccionAhorro(bd, idCuenta, valor, fecha):
+    """
+    Aplica el movimiento en su propia transacción (ver aplicarMovimientoAhorro).
+    """
+    with bd.transaccion() as s:
+        return aplicarMovimientoAhorro(s, idCuenta, valor, fecha)
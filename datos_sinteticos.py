@@ -0,0 +1,226 @@
+"""
+Generador determinista de datos sintéticos para pruebas de carga y benchmarks.
+
+Llena Clientes, PRODUCTOS, ProductosContratados y Transacciones de una base nueva
+hasta un total de filas configurable (de 10 mil a 10 millones). La misma semilla
+produce siempre la misma base, así que dos corridas de benchmark sobre la misma
+escala comparan exactamente los mismos datos.
+
+La historia sigue las reglas del banco: cada crédito tiene un pago mensual de la
+cuota completa (cuotaMes) desde su entrega hasta el mes anterior a FECHA_CORTE
+o hasta saldarse, así que su saldo, plazo pendiente e intereses pagados cuadran
+con sus transacciones; las cuentas de ahorro tienen consignaciones y retiros que
+nunca dejan el saldo en negativo. Ningún movimiento cae en el mes de FECHA_CORTE:
+se le puede pagar la cuota de ese mes a cualquier crédito vigente.
+
+Las filas se insertan en las tablas base sin índices ni triggers (migración 1) y
+después se aplican las demás migraciones, que crean los índices y llenan
+ResumenCartera, el libro de asientos y el índice de búsqueda de una sola vez.
+
+Uso: python datos_sinteticos.py --filas 1m [--ruta sintetico.db] [--semilla 42]
+"""
+import argparse
+import os
+import random
+import time
+from collections import namedtuple
+from datetime import date
+
+from amortizacion import cuotaMes
+from basedatos import BaseDatos
+from cuentas import AHORROS, CREDITO
+from servicios import AHORRO_MINIMO
+from tablas import crearTablas
+
+SEMILLA = 42
+FECHA_CORTE = date(2025, 12, 1)
+HISTORIA_MESES = 36
+TAMANO_LOTE = 50000
+
+NOMBRES = ["Ana", "Andrés", "Camila", "Carlos", "Daniela", "David", "Diana", "Felipe", "Gabriela",
+           "Jorge", "José", "Juan", "Laura", "Luis", "María", "Mateo", "Natalia", "Paula", "Santiago",
+           "Sofía", "Valentina", "Valeria", "Sebastián", "Julián", "Manuela", "Nicolás", "Isabella"]
+APELLIDOS = ["Gómez", "Rodríguez", "Martínez", "García", "López", "González", "Hernández", "Pérez",
+             "Sánchez", "Ramírez", "Torres", "Díaz", "Vargas", "Moreno", "Rojas", "Castro", "Ortiz",
+             "Jiménez", "Suárez", "Restrepo", "Cardona", "Ospina", "Zuluaga", "Montoya", "Arango",
+             "Quintero", "Mejía", "Salazar", "Giraldo", "Henao", "Valencia", "Bedoya", "Echeverri"]
+DOMINIOS = ["gmail.com", "hotmail.com", "outlook.com", "yahoo.es", "une.net.co"]
+
+# (NoIdProducto, NombreProducto, TipoProducto, Remuneracion: tasa mensual en %)
+PRODUCTOS = [
+    (1, "Crédito Libre Inversión", CREDITO, 2),
+    (2, "Crédito Vehículo", CREDITO, 1),
+    (3, "Crédito Rotativo", CREDITO, 3),
+    (4, "Cuenta de Ahorros", AHORROS, 1),
+    (5, "Ahorro Programado", AHORROS, 2),
+]
+PLAZOS = (6, 12, 24, 36, 48, 60)
+
+ResumenGeneracion = namedtuple("ResumenGeneracion", [
+    "clientes", "productos", "contratos", "transacciones", "segundos", "filasPorSegundo",
+])
+
+
+def cantidad(texto):
+    """
+    Interpreta '10k', '2.5m' o '1000000' como número de filas.
+    """
+    valor = str(texto).strip().lower().replace("_", "")
+    multiplicador = {"k": 1000, "m": 1000000}.get(valor[-1:], 1)
+    if multiplicador > 1:
+        valor = valor[:-1]
+    try:
+        filas = int(float(valor) * multiplicador)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Cantidad inválida: {texto!r}")
+    if filas <= 0:
+        raise argparse.ArgumentTypeError(f"Cantidad inválida: {texto!r}")
+    return filas
+
+
+def clienteSintetico(azar, noId):
+    nombre, apellido = azar.choice(NOMBRES), azar.choice(APELLIDOS)
+    usuario = f"{nombre}.{apellido}{noId}".lower()
+    return (noId, nombre, apellido, f"Calle {azar.randint(1, 200)} # {azar.randint(1, 99)}",
+            str(azar.randint(3000000000, 3509999999)), f"{usuario}@{azar.choice(DOMINIOS)}")
+
+
+def mesRelativo(meses):
+    """
+    Primer día del mes que está 'meses' después (o antes, si es negativo) de FECHA_CORTE.
+    """
+    indice = FECHA_CORTE.year * 12 + FECHA_CORTE.month - 1 + meses
+    return date(indice // 12, indice % 12 + 1, 1)
+
+
+def _credito(azar, idCuenta, idCliente, producto, transacciones):
+    """
+    Fila de ProductosContratados de un crédito con sus pagos mensuales ya aplicados.
+    """
+    atras = azar.randint(1, HISTORIA_MESES)
+    dia = azar.randint(1, 28)
+    entrega = mesRelativo(-atras).replace(day=dia)
+    plazo = azar.choice(PLAZOS)
+    capital = azar.randint(20, 1000) * 50000.0
+    saldo, pendiente, intereses = capital, plazo, 0.0
+    for meses in range(1 - atras, 0):
+        if pendiente == 0:
+            break
+        capital_mes, interes_mes, total = cuotaMes(saldo, pendiente, producto[3])
+        saldo = max(0, saldo - capital_mes)
+        pendiente -= 1
+        intereses += interes_mes
+        transacciones.append((idCuenta, mesRelativo(meses).replace(day=dia).isoformat(), total))
+    return (idCuenta, producto[0], idCliente, capital, plazo, entrega.isoformat(),
+            saldo, intereses, pendiente)
+
+
+def _ahorro(azar, idCuenta, idCliente, producto, transacciones):
+    """
+    Fila de ProductosContratados de una cuenta de ahorros con sus consignaciones y retiros.
+    """
+    atras = azar.randint(1, HISTORIA_MESES)
+    entrega = mesRelativo(-atras).replace(day=azar.randint(1, 28))
+    capital = azar.randint(AHORRO_MINIMO // 10000, 500) * 10000.0
+    fechas = sorted(
+        mesRelativo(meses).replace(day=azar.randint(entrega.day if meses == -atras else 1, 28)).isoformat()
+        for meses in range(-atras, 0)
+        for _ in range(azar.randint(0, 2))
+    )
+    saldo = capital
+    for fecha in fechas:
+        if azar.random() < 0.6:
+            valor = azar.randint(1, 100) * 10000.0
+        else:
+            valor = -round(saldo * azar.uniform(0, 0.5), -3)
+        saldo += valor
+        transacciones.append((idCuenta, fecha, valor))
+    return (idCuenta, producto[0], idCliente, capital, 0, entrega.isoformat(), saldo, 0.0, 0)
+
+
+def poblar(bd, filas, semilla=SEMILLA):
+    """
+    Agrega clientes con sus contratos e historia a una base vacía hasta sumar
+    al menos 'filas' filas entre las cuatro tablas. Retorna un ResumenGeneracion.
+    """
+    inicio = time.perf_counter()
+    azar = random.Random(semilla)
+    creditos = [p for p in PRODUCTOS if p[2] == CREDITO]
+    ahorros = [p for p in PRODUCTOS if p[2] == AHORROS]
+
+    with bd.transaccion() as s:
+        crearTablas(s.con, hasta=1)
+    with bd.transaccion() as s:
+        s.ejecutarVarios("INSERT INTO PRODUCTOS VALUES (?, ?, ?, ?)", PRODUCTOS)
+
+    clientes, contratos, transacciones = [], [], []
+    totales = [0, len(PRODUCTOS), 0, 0]
+
+    def volcar():
+        with bd.transaccion() as s:
+            s.ejecutarVarios("INSERT INTO Clientes VALUES (?, ?, ?, ?, ?, ?)", clientes)
+            s.ejecutarVarios("""
+                INSERT INTO ProductosContratados
+                (idCuentaCredito, idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega,
+                 saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, contratos)
+            s.ejecutarVarios(
+                "INSERT INTO Transacciones (idCuentaCredito, fechaPago, valorPagado) VALUES (?, ?, ?)",
+                transacciones
+            )
+        totales[0] += len(clientes)
+        totales[2] += len(contratos)
+        totales[3] += len(transacciones)
+        clientes.clear()
+        contratos.clear()
+        transacciones.clear()
+
+    noId = idCuenta = 0
+    while sum(totales) + len(clientes) + len(contratos) + len(transacciones) < filas:
+        noId += 1
+        clientes.append(clienteSintetico(azar, noId))
+        for _ in range(azar.randint(1, 3)):
+            idCuenta += 1
+            if azar.random() < 0.6:
+                contratos.append(_credito(azar, idCuenta, noId, azar.choice(creditos), transacciones))
+            else:
+                contratos.append(_ahorro(azar, idCuenta, noId, azar.choice(ahorros), transacciones))
+        if len(transacciones) >= TAMANO_LOTE:
+            volcar()
+    volcar()
+
+    # Índices, triggers, ResumenCartera, libro de asientos y búsqueda, sobre todo lo cargado
+    with bd.transaccion() as s:
+        crearTablas(s.con)
+
+    segundos = time.perf_counter() - inicio
+    total = sum(totales)
+    return ResumenGeneracion(*totales, segundos, total / segundos if segundos > 0 else 0.0)
+
+
+def generarBase(ruta, filas, semilla=SEMILLA):
+    """
+    Crea 'ruta' desde cero (reemplazándola si existe) con poblar.
+    """
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+    bd = BaseDatos(ruta, lectores=1, sincronizacion="OFF")
+    try:
+        return poblar(bd, filas, semilla)
+    finally:
+        bd.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--filas", type=cantidad, default="100k", help="total de filas: 10k, 1m, 10m...")
+    parser.add_argument("--ruta", default="sintetico.db")
+    parser.add_argument("--semilla", type=int, default=SEMILLA)
+    args = parser.parse_args()
+
+    r = generarBase(args.ruta, args.filas, args.semilla)
+    print(f"Clientes: {r.clientes}  Productos: {r.productos}  Contratos: {r.contratos}  "
+          f"Transacciones: {r.transacciones}")
+    print(f"Tiempo: {r.segundos:.1f} s ({r.filasPorSegundo:,.0f} filas/s)")
@@ -0,0 +1,109 @@
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+    QMessageBox, QTableWidget, QTableWidgetItem, QHeaderView, QFileDialog
+)
+from PyQt5.QtCore import Qt, QTimer
+
+from basedatos import obtenerBD
+from instrumentacion import (
+    METRICAS, RUTA_PERFILES, guardarPerfiles, perfilesLentos, resumen, series, volcar
+)
+
+
+class DiagnosticoGUI(QWidget):
+    """
+    Panel de diagnóstico: latencia (p50, p99, máximo) y filas de cada sentencia
+    SQL, espera por conexiones, acciones de la interfaz y trabajos en segundo
+    plano. Se refresca solo mientras está visible.
+    """
+    REFRESCO_MS = 1000
+    COLUMNAS = ["Familia", "Clave", "Llamadas", "Total ms", "p50 ms", "p99 ms", "Máx ms", "Filas"]
+
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("Diagnóstico")
+        self.bd = obtenerBD()
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("<h2>Diagnóstico de rendimiento</h2>"))
+
+        botones = QHBoxLayout()
+        for texto, manejador in (("Reiniciar", self.reiniciar),
+                                 ("Exportar JSON / Prometheus", self.exportar),
+                                 ("Guardar perfiles", self.guardar_perfiles)):
+            boton = QPushButton(texto)
+            boton.clicked.connect(manejador)
+            botones.addWidget(boton)
+        layout.addLayout(botones)
+
+        perfil = (f"Perfilado activo: se guardan en {RUTA_PERFILES}" if RUTA_PERFILES
+                  else "Perfilado inactivo (defina NEOBANCO_PERFIL=<carpeta> para activarlo)")
+        self.estado = QLabel(perfil)
+        layout.addWidget(self.estado)
+
+        self.tabla = QTableWidget(0, len(self.COLUMNAS))
+        self.tabla.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.tabla.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tabla.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        layout.addWidget(self.tabla)
+        self.setLayout(layout)
+
+        self.temporizador = QTimer(self)
+        self.temporizador.setInterval(self.REFRESCO_MS)
+        self.temporizador.timeout.connect(self.refrescar)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refrescar()
+        self.temporizador.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.temporizador.stop()
+
+    def refrescar(self):
+        filas = resumen(series(METRICAS, self.bd.metricas))
+        self.tabla.setRowCount(len(filas))
+        for i, fila in enumerate(filas):
+            valores = [fila["familia"], fila["clave"], f"{fila['llamadas']}", f"{fila['total_ms']:.1f}",
+                       f"{fila['p50_ms']:.2f}", f"{fila['p99_ms']:.2f}", f"{fila['maximo_ms']:.2f}",
+                       f"{fila['filas']}"]
+            for j, valor in enumerate(valores):
+                item = QTableWidgetItem(valor)
+                item.setToolTip(valor)
+                if j >= 2:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.tabla.setItem(i, j, item)
+
+    def reiniciar(self):
+        METRICAS.reiniciar()
+        self.bd.reiniciarEstadisticas()
+        self.refrescar()
+
+    def exportar(self):
+        """
+        Escribe metricas.json y metricas.prom (formato de texto de Prometheus) en la carpeta elegida.
+        """
+        carpeta = QFileDialog.getExistingDirectory(self, "Carpeta para las métricas", RUTA_PERFILES or "")
+        if not carpeta:
+            return
+        try:
+            rutas = volcar(carpeta, METRICAS, self.bd.metricas)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        QMessageBox.information(self, "Éxito", "Métricas guardadas en:\n" + "\n".join(rutas))
+
+    def guardar_perfiles(self):
+        if not perfilesLentos():
+            QMessageBox.warning(self, "Sin perfiles",
+                                "No hay perfiles. Inicie la aplicación con NEOBANCO_PERFIL=<carpeta>.")
+            return
+        try:
+            rutas = guardarPerfiles()
+        except OSError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+        QMessageBox.information(self, "Éxito", f"{len(rutas)} perfiles guardados en {RUTA_PERFILES}")
@@ -0,0 +1,147 @@
+"""
+Prueba de estrés multiproceso para consignaciones y retiros de ahorros.
+
+Varios procesos, cada uno con su propia BaseDatos (y por tanto sus propias
+conexiones a SQLite), hacen consignaciones y retiros aleatorios sobre pocas
+cuentas para forzar la contención. Al terminar se verifica, cuenta por cuenta:
+
+- saldo final == saldo inicial + suma de los movimientos que cada proceso vio aceptados;
+- saldo final == saldo inicial + suma de los movimientos en Transacciones;
+- ningún saldo quedó en negativo.
+
+Con --ingenuo se usa en cambio el patrón anterior (leer el saldo, calcular en
+Python y escribir SET saldoCapital=?) en transacciones separadas, para ver las
+actualizaciones perdidas que la verificación detecta.
+
+Uso: python estres_ahorros.py [--procesos 8] [--movimientos 2000] [--cuentas 4] [--ingenuo]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+SALDO_INICIAL = 100000
+
+
+def prepararBase(ruta, cuentas):
+    from basedatos import BaseDatos
+    from tablas import crearTablas
+
+    bd = BaseDatos(ruta)
+    with bd.transaccion() as s:
+        crearTablas(s.con)
+        s.ejecutar("INSERT OR IGNORE INTO PRODUCTOS VALUES (1, 'CuentaAhorro', 2, 3)")
+        s.ejecutarVarios("""
+            INSERT INTO ProductosContratados
+            (idCuentaCredito, idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega,
+             saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
+            VALUES (?, 1, 0, ?, 0, '2025-01-01', ?, 0, 0)
+        """, ((i, SALDO_INICIAL, SALDO_INICIAL) for i in range(1, cuentas + 1)))
+    bd.cerrar()
+
+
+def movimientoIngenuo(bd, idCuenta, valor, fecha):
+    """
+    Patrón previo: lee el saldo, calcula en Python y lo escribe en otra transacción.
+    """
+    from cuentas import OperacionInvalida
+
+    saldo = bd.consultarUno("SELECT saldoCapital FROM ProductosContratados WHERE idCuentaCredito=?", (idCuenta,))[0]
+    if saldo + valor < 0:
+        raise OperacionInvalida("Fondos insuficientes.")
+    with bd.transaccion() as s:
+        s.ejecutar("INSERT INTO Transacciones (idCuentaCredito, fechaPago, valorPagado) VALUES (?, ?, ?)",
+                   (idCuenta, fecha, valor))
+        s.ejecutar("UPDATE ProductosContratados SET saldoCapital=? WHERE idCuentaCredito=?",
+                   (saldo + valor, idCuenta))
+
+
+def trabajador(ruta, semilla, movimientos, cuentas, ingenuo):
+    """
+    Retorna ({cuenta: suma aceptada}, aceptados, rechazados).
+    """
+    from basedatos import BaseDatos
+    from cuentas import OperacionInvalida, transaccionAhorro
+
+    bd = BaseDatos(ruta, lectores=1)
+    azar = random.Random(semilla)
+    aplicar = movimientoIngenuo if ingenuo else transaccionAhorro
+    sumas = defaultdict(float)
+    aceptados = rechazados = 0
+    for _ in range(movimientos):
+        cuenta = azar.randint(1, cuentas)
+        valor = float(azar.choice([5000, 20000, -10000, -30000]))
+        try:
+            aplicar(bd, cuenta, valor, "2025-01-15")
+        except OperacionInvalida:
+            rechazados += 1
+        else:
+            sumas[cuenta] += valor
+            aceptados += 1
+    bd.cerrar()
+    return dict(sumas), aceptados, rechazados
+
+
+def verificar(ruta, cuentas, resultados):
+    from basedatos import BaseDatos
+
+    esperado = defaultdict(float)
+    for sumas, _, _ in resultados:
+        for cuenta, valor in sumas.items():
+            esperado[cuenta] += valor
+
+    bd = BaseDatos(ruta, lectores=1)
+    saldos = dict(bd.consultar("SELECT idCuentaCredito, saldoCapital FROM ProductosContratados"))
+    libro = dict(bd.consultar("SELECT idCuentaCredito, SUM(valorPagado) FROM Transacciones GROUP BY idCuentaCredito"))
+    bd.cerrar()
+
+    errores = 0
+    print(f"{'cuenta':>8}{'saldo':>14}{'esperado':>14}{'según libro':>14}")
+    for cuenta in range(1, cuentas + 1):
+        saldo = saldos[cuenta]
+        por_procesos = SALDO_INICIAL + esperado[cuenta]
+        por_libro = SALDO_INICIAL + libro.get(cuenta, 0)
+        bien = abs(saldo - por_procesos) < 0.005 and abs(saldo - por_libro) < 0.005 and saldo >= 0
+        errores += not bien
+        print(f"{cuenta:>8}{saldo:>14,.0f}{por_procesos:>14,.0f}{por_libro:>14,.0f}  {'ok' if bien else 'DIFERENCIA'}")
+    return errores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estrés multiproceso de movimientos de ahorros")
+    parser.add_argument("--procesos", type=int, default=8)
+    parser.add_argument("--movimientos", type=int, default=2000, help="movimientos por proceso")
+    parser.add_argument("--cuentas", type=int, default=4)
+    parser.add_argument("--ingenuo", action="store_true", help="usar el patrón leer-calcular-escribir")
+    args = parser.parse_args()
+
+    directorio = tempfile.mkdtemp(prefix="neobanco_estres_")
+    ruta = os.path.join(directorio, "estres.db")
+    try:
+        prepararBase(ruta, args.cuentas)
+        inicio = time.perf_counter()
+        with multiprocessing.Pool(args.procesos) as pool:
+            resultados = pool.starmap(trabajador, [
+                (ruta, semilla, args.movimientos, args.cuentas, args.ingenuo)
+                for semilla in range(args.procesos)
+            ])
+        segundos = time.perf_counter() - inicio
+
+        aceptados = sum(r[1] for r in resultados)
+        rechazados = sum(r[2] for r in resultados)
+        total = aceptados + rechazados
+        print(f"{total} movimientos en {segundos:.2f} s ({total / segundos:,.0f} mov/s) con "
+              f"{args.procesos} procesos: {aceptados} aceptados, {rechazados} rechazados por fondos")
+        errores = verificar(ruta, args.cuentas, resultados)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    if errores:
+        print(f"FALLA: {errores} cuenta(s) con actualizaciones perdidas o saldo inconsistente.")
+        sys.exit(1)
+    print("OK: ninguna actualización perdida.")
@@ -0,0 +1,210 @@
+"""
+Facturación de fin de mes: próxima cuota y aviso de cobro de cada crédito vigente.
+
+ProductosContratados se reparte en rangos de idCuentaCredito entre los procesos de
+un multiprocessing.Pool. Cada trabajador abre su propia conexión de solo lectura
+(basedatos.conexionLectura), recorre su rango por la llave primaria y calcula la
+cuota con la misma regla de TransaccionesGUI.consultar_cuota (amortizacion.cuotaMes).
+Cada rango vuelve ya codificado como un bloque del formato columnar (ver
+columnar.py), así que el proceso principal solo lo agrega al archivo
+avisos_<mes>.col.jsonl a medida que los rangos terminan.
+
+Punto de control: después de escribir cada rango se agrega una línea a
+avisos_<mes>.progreso.jsonl con el rango y el tamaño del archivo de avisos en ese
+momento. Si el proceso se cae, la siguiente corrida del mismo mes recorta el
+archivo al último punto de control, salta los rangos ya escritos y sigue con el
+resto, así que ningún aviso queda repetido ni falta. Si tras una caída del
+sistema el archivo de avisos quedó más corto de lo anotado, esos rangos se
+vuelven a generar. Los rangos se fijan en la primera corrida (primera línea del
+progreso): las cuentas creadas después no entran en la facturación de ese mes.
+
+Uso: python facturacion.py 2025-10 [--salida facturacion] [--procesos 4] [--tamano 2000] [--reiniciar]
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+
+from amortizacion import cuotaMes
+from basedatos import RUTA_BD, conexionLectura
+from columnar import EXTENSIONES, EscritorColumnar, codificarBloque
+from cuentas import CREDITO
+from liquidacion_ahorros import fechaCierre
+
+CUENTAS_POR_RANGO = 2000
+
+COLUMNAS = [
+    "idCuenta", "idCliente", "nombre", "apellido", "correo", "producto", "mes", "fechaLimite",
+    "saldo", "plazoPendiente", "capital", "interes", "total",
+]
+
+ResultadoFacturacion = namedtuple("ResultadoFacturacion", [
+    "mes", "rangos", "rangosPrevios", "avisos", "segundos", "avisosPorSegundo", "procesos", "ruta",
+])
+TrabajoProceso = namedtuple("TrabajoProceso", ["rangos", "avisos", "segundos", "avisosPorSegundo"])
+
+SQL_CREDITOS = """
+    SELECT PC.idCuentaCredito, PC.idCliente, C.nombre, C.apellido, C.correo, P.NombreProducto,
+           PC.saldoCapital, PC.plazoPendiente, P.Remuneracion
+    FROM ProductosContratados PC
+    JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+    LEFT JOIN Clientes C ON C.noIdCliente = PC.idCliente
+    WHERE PC.idCuentaCredito BETWEEN :desde AND :hasta
+      AND P.TipoProducto = :credito AND PC.plazoPendiente > 0
+    ORDER BY PC.idCuentaCredito
+"""
+
+
+# === Trabajadores ===
+
+_con = None
+
+
+def _iniciarTrabajador(ruta):
+    global _con
+    _con = conexionLectura(ruta)
+
+
+def _facturarRango(tarea):
+    """
+    Avisos de los créditos vigentes del rango, codificados como un bloque
+    columnar. Retorna (pid, rango, avisos, bloque, segundos).
+    """
+    desde, hasta, mes, limite = tarea
+    inicio = time.perf_counter()
+    filas = []
+    for idc, cliente, nombre, apellido, correo, producto, saldo, plazo, tasa in _con.execute(
+        SQL_CREDITOS, {"desde": desde, "hasta": hasta, "credito": CREDITO}
+    ):
+        capital, interes, total = cuotaMes(saldo, plazo, tasa)
+        filas.append((idc, cliente, nombre, apellido, correo, producto, mes, limite,
+                      round(saldo, 2), plazo, round(capital, 2), round(interes, 2), round(total, 2)))
+    bloque = codificarBloque(COLUMNAS, filas)
+    return os.getpid(), (desde, hasta), len(filas), bloque, time.perf_counter() - inicio
+
+
+# === Punto de control ===
+
+def _leerProgreso(ruta):
+    """
+    (encabezado, [rangos escritos]) del archivo de progreso, o (None, []) si no existe.
+    Una última línea cortada por una caída se ignora y se recorta del archivo,
+    para que la siguiente anotación empiece en una línea nueva.
+    """
+    if not os.path.exists(ruta):
+        return None, []
+    with open(ruta, "r+b") as archivo:
+        contenido = archivo.read()
+        completo = contenido.rfind(b"\n") + 1
+        if completo < len(contenido):
+            archivo.truncate(completo)
+    lineas = [json.loads(l) for l in contenido[:completo].decode("utf-8").splitlines()]
+    if not lineas:
+        return None, []
+    return lineas[0], lineas[1:]
+
+
+def _anotar(archivo, registro):
+    archivo.write(json.dumps(registro, separators=(",", ":")) + "\n")
+    archivo.flush()
+
+
+def rangosCreditos(minimo, maximo, tamano=CUENTAS_POR_RANGO):
+    return [(inicio, min(inicio + tamano - 1, maximo)) for inicio in range(minimo, maximo + 1, tamano)]
+
+
+def facturarMes(mes, carpeta="facturacion", procesos=None, ruta=RUTA_BD,
+                tamano=CUENTAS_POR_RANGO, reiniciar=False):
+    """
+    Genera (o continúa) los avisos de cobro del mes 'YYYY-MM' en 'carpeta'.
+    Retorna un ResultadoFacturacion; 'procesos' trae un TrabajoProceso por pid
+    con lo que hizo cada trabajador en esta corrida.
+    """
+    limite = fechaCierre(mes)
+    procesos = procesos or os.cpu_count() or 1
+    os.makedirs(carpeta, exist_ok=True)
+    ruta_avisos = os.path.join(carpeta, f"avisos_{mes}{EXTENSIONES['columnar']}")
+    ruta_progreso = os.path.join(carpeta, f"avisos_{mes}.progreso.jsonl")
+    if reiniciar:
+        for r in (ruta_avisos, ruta_progreso):
+            if os.path.exists(r):
+                os.remove(r)
+
+    encabezado, escritos = _leerProgreso(ruta_progreso)
+    if encabezado is None:
+        con = conexionLectura(ruta)
+        try:
+            minimo, maximo = con.execute(
+                "SELECT MIN(idCuentaCredito), MAX(idCuentaCredito) FROM ProductosContratados"
+            ).fetchone()
+        finally:
+            con.close()
+        encabezado = {"mes": mes, "desde": minimo or 0, "hasta": maximo or -1, "tamano": tamano}
+        escritos = []
+        with open(ruta_progreso, "w", encoding="utf-8") as archivo:
+            _anotar(archivo, encabezado)
+        if os.path.exists(ruta_avisos):
+            os.remove(ruta_avisos)
+    elif encabezado["mes"] != mes:
+        raise ValueError(f"{ruta_progreso} es de {encabezado['mes']}, no de {mes}.")
+
+    # Solo valen los rangos cuyo contenido está completo en el archivo de avisos
+    tamano_avisos = os.path.getsize(ruta_avisos) if os.path.exists(ruta_avisos) else 0
+    escritos = [e for e in escritos if e["bytes"] <= tamano_avisos]
+    corte = max((e["bytes"] for e in escritos), default=0)
+    if os.path.exists(ruta_avisos):
+        with open(ruta_avisos, "r+b") as archivo:
+            archivo.truncate(corte)
+
+    hechos = {(e["desde"], e["hasta"]) for e in escritos}
+    rangos = rangosCreditos(encabezado["desde"], encabezado["hasta"], encabezado["tamano"])
+    pendientes = [(d, h, mes, limite) for d, h in rangos if (d, h) not in hechos]
+
+    inicio = time.perf_counter()
+    avisos = 0
+    por_proceso = {}
+    if pendientes:
+        with EscritorColumnar(ruta_avisos, COLUMNAS, agregar=True) as salida, \
+                open(ruta_progreso, "a", encoding="utf-8") as progreso, \
+                multiprocessing.Pool(procesos, initializer=_iniciarTrabajador, initargs=(ruta,)) as pool:
+            for pid, (desde, hasta), n, bloque, segundos in pool.imap_unordered(_facturarRango, pendientes):
+                if n:
+                    salida.agregarBloque(bloque, n)
+                    salida.vaciar()
+                _anotar(progreso, {"desde": desde, "hasta": hasta, "avisos": n, "pid": pid,
+                                   "segundos": round(segundos, 4), "bytes": os.path.getsize(ruta_avisos)})
+                avisos += n
+                rangos_pid, avisos_pid, segundos_pid = por_proceso.get(pid, (0, 0, 0.0))
+                por_proceso[pid] = (rangos_pid + 1, avisos_pid + n, segundos_pid + segundos)
+
+    segundos = time.perf_counter() - inicio
+    trabajo = {
+        pid: TrabajoProceso(r, a, s, a / s if s > 0 else 0.0)
+        for pid, (r, a, s) in por_proceso.items()
+    }
+    velocidad = avisos / segundos if segundos > 0 else 0.0
+    return ResultadoFacturacion(mes, len(rangos), len(hechos), avisos, segundos, velocidad, trabajo, ruta_avisos)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Facturación de cuotas de fin de mes")
+    parser.add_argument("mes", help="Mes a facturar, YYYY-MM")
+    parser.add_argument("--salida", default="facturacion", help="Carpeta de los avisos y del progreso")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--tamano", type=int, default=CUENTAS_POR_RANGO,
+                        help="Cuentas por rango (solo al empezar un mes; al continuar se usan los del progreso)")
+    parser.add_argument("--reiniciar", action="store_true", help="Descartar el progreso y empezar de cero")
+    args = parser.parse_args()
+
+    try:
+        r = facturarMes(args.mes, args.salida, args.procesos, tamano=args.tamano, reiniciar=args.reiniciar)
+    except ValueError as e:
+        parser.error(str(e))
+    if r.rangosPrevios:
+        print(f"Continuando: {r.rangosPrevios} de {r.rangos} rangos ya estaban escritos.")
+    print(f"{r.avisos} avisos en {r.segundos:.2f} s ({r.avisosPorSegundo:,.0f} avisos/s) -> {r.ruta}")
+    for pid, t in sorted(r.procesos.items()):
+        print(f"  proceso {pid}: {t.rangos} rangos, {t.avisos} avisos, "
+              f"{t.segundos:.2f} s ocupado ({t.avisosPorSegundo:,.0f} avisos/s)")
@@ -0,0 +1,179 @@
+"""
+Importación masiva de pagos de cuotas de crédito desde archivos CSV o JSON-lines.
+
+El archivo se lee como un flujo (generador) y se aplica en lotes: cada lote es una
+transacción en la que las filas se validan con las mismas reglas de pagarCuota
+(solo créditos, un pago por mes, un valor que no supere el saldo más el interés;
+ver cuentas.repartirPago) y luego se escriben con executemany. Las filas
+rechazadas van a un archivo CSV aparte con el motivo, así que la memoria usada no
+depende del tamaño del archivo de entrada.
+
+Columnas esperadas: idCuentaCredito, fechaPago (YYYY-MM-DD) y, opcionalmente,
+valorPagado. Si no viene valorPagado se paga la cuota completa del mes.
+
+Uso: python importar_pagos.py pagos.csv [--rechazos rechazos.csv] [--lote 2000]
+"""
+import argparse
+import csv
+import json
+import time
+from collections import namedtuple
+
+from basedatos import obtenerBD
+from contabilidad import asientosPagoCredito, insertarTransacciones, registrarAsientos
+from cuentas import (
+    CREDITO, OperacionInvalida, normalizarFecha, obtenerSnapshot, pagoRegistradoEnMes, repartirPago,
+    validarValor
+)
+from tablas import crearTablas
+
+TAMANO_LOTE = 2000
+COLUMNAS = ["idCuentaCredito", "fechaPago", "valorPagado"]
+
+ResumenImportacion = namedtuple("ResumenImportacion", [
+    "leidas", "aplicadas", "rechazadas", "segundos", "filasPorSegundo",
+])
+
+
+class FilaRechazada(Exception):
+    pass
+
+
+def leerFilas(ruta):
+    """
+    Genera (número de línea, dict) por cada registro del archivo, sin cargarlo completo.
+    """
+    with open(ruta, newline="", encoding="utf-8") as archivo:
+        if ruta.lower().endswith((".jsonl", ".json", ".ndjson")):
+            for numero, linea in enumerate(archivo, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    registro = None
+                if not isinstance(registro, dict):
+                    registro = {"error": linea.strip()}
+                yield numero, registro
+        else:
+            for numero, fila in enumerate(csv.DictReader(archivo), start=2):
+                yield numero, fila
+
+
+def _lotes(filas, tamano):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) >= tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _interpretar(fila):
+    """
+    Convierte un registro del archivo a (idCuenta, fecha, valor o None).
+    """
+    if "error" in fila:
+        raise FilaRechazada("Registro JSON mal formado.")
+    try:
+        id_cuenta = int(str(fila.get("idCuentaCredito", "")).strip())
+    except ValueError:
+        raise FilaRechazada("idCuentaCredito debe ser numérico.")
+    try:
+        fecha = normalizarFecha(fila.get("fechaPago"))
+    except OperacionInvalida:
+        raise FilaRechazada("fechaPago debe tener formato YYYY-MM-DD.")
+    valor = fila.get("valorPagado")
+    if valor is None or str(valor).strip() == "":
+        return id_cuenta, fecha, None
+    try:
+        return id_cuenta, fecha, validarValor(valor, positivo=True)
+    except OperacionInvalida as e:
+        raise FilaRechazada(str(e))
+
+
+def _aplicarLote(bd, lote, rechazos):
+    """
+    Valida y aplica un lote en una sola transacción. Retorna cuántas filas se aplicaron.
+    """
+    inserciones = []
+    partidas = []       # datos de asientosPagoCredito por cada inserción
+    estados = {}        # idCuenta -> [saldo, plazo, tasa, intereses acumulados]
+    meses = set()       # (idCuenta, mes) ya pagados dentro del lote
+
+    with bd.transaccion() as s:
+        for numero, fila in lote:
+            try:
+                id_cuenta, fecha, valor = _interpretar(fila)
+
+                estado = estados.get(id_cuenta)
+                if estado is None:
+                    cuenta = obtenerSnapshot(s, id_cuenta)
+                    if cuenta is None or cuenta.tipo != CREDITO:
+                        raise FilaRechazada("Solo válido para créditos.")
+                    estado = [cuenta.saldo, cuenta.plazoPendiente, cuenta.interes, cuenta.interesesPagados or 0]
+                saldo, plazo, tasa, intereses = estado
+                if plazo <= 0:
+                    raise FilaRechazada("El crédito ya está pagado.")
+
+                mes = fecha[:7]
+                if (id_cuenta, mes) in meses or pagoRegistradoEnMes(s, id_cuenta, mes):
+                    raise FilaRechazada("Ya existe un pago para este mes.")
+                _, cuota_interes, valor, nuevo_saldo, nuevo_plazo = repartirPago(saldo, plazo, tasa, valor)
+            except (FilaRechazada, OperacionInvalida) as e:
+                rechazos.writerow([numero] + [fila.get(c, "") for c in COLUMNAS] + [str(e)])
+                continue
+
+            estados[id_cuenta] = [nuevo_saldo, nuevo_plazo, tasa, intereses + cuota_interes]
+            meses.add((id_cuenta, mes))
+            inserciones.append((id_cuenta, fecha, valor))
+            partidas.append((id_cuenta, fecha, saldo, nuevo_saldo, cuota_interes, valor))
+
+        ids = insertarTransacciones(s, inserciones)
+        registrarAsientos(s, [
+            partida
+            for id_transaccion, datos in zip(ids, partidas)
+            for partida in asientosPagoCredito(id_transaccion, *datos)
+        ])
+        s.ejecutarVarios("""
+            UPDATE ProductosContratados
+            SET saldoCapital = ?, plazoPendiente = ?, sumatoriaInteresesPagados = ?
+            WHERE idCuentaCredito = ?
+        """, [(saldo, plazo, intereses, idc) for idc, (saldo, plazo, _, intereses) in estados.items()])
+
+    return len(inserciones)
+
+
+def importarPagos(bd, ruta, rutaRechazos, tamanoLote=TAMANO_LOTE):
+    """
+    Importa el archivo de pagos 'ruta' y escribe las filas rechazadas en 'rutaRechazos'.
+    """
+    inicio = time.perf_counter()
+    leidas = aplicadas = 0
+    with open(rutaRechazos, "w", newline="", encoding="utf-8") as archivo:
+        rechazos = csv.writer(archivo)
+        rechazos.writerow(["linea"] + COLUMNAS + ["motivo"])
+        for lote in _lotes(leerFilas(ruta), tamanoLote):
+            leidas += len(lote)
+            aplicadas += _aplicarLote(bd, lote, rechazos)
+
+    segundos = time.perf_counter() - inicio
+    velocidad = leidas / segundos if segundos > 0 else 0.0
+    return ResumenImportacion(leidas, aplicadas, leidas - aplicadas, segundos, velocidad)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importación masiva de pagos de cuotas")
+    parser.add_argument("archivo", help="Archivo CSV o JSON-lines con los pagos")
+    parser.add_argument("--rechazos", default="rechazos_pagos.csv", help="Archivo de filas rechazadas")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Filas por transacción")
+    args = parser.parse_args()
+
+    bd = obtenerBD()
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    r = importarPagos(bd, args.archivo, args.rechazos, args.lote)
+    print(f"Leídas: {r.leidas}  Aplicadas: {r.aplicadas}  Rechazadas: {r.rechazadas}")
+    print(f"Tiempo: {r.segundos:.2f} s ({r.filasPorSegundo:.0f} filas/s)")
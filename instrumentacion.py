@@ -0,0 +1,320 @@
+"""
+Instrumentación del Neobanco: histogramas de latencia, filas y esperas por candado.
+
+Cada serie se identifica por (familia, clave) y guarda un histograma de cubetas
+fijas, el total, el máximo y las filas acumuladas. Las familias que se registran:
+
+    sql       cada sentencia que pasa por una Sesion (clave: el SQL normalizado)
+    espera    tiempo esperando el escritor o un lector del pool de BaseDatos
+    accion    manejadores de botones de las vistas y acciones de la consola
+    trabajo   funciones que el Despachador corre en segundo plano
+
+Las sentencias SQL quedan en las Metricas de su BaseDatos; las acciones y los
+trabajos en METRICAS, la del proceso. exportarJSON y exportarPrometheus vuelcan
+ambas (ver volcar).
+
+Perfilado: si la variable de entorno NEOBANCO_PERFIL tiene una carpeta, cada
+acción y cada trabajo corren bajo cProfile y se conservan los perfiles de las
+PERFILES_GUARDADOS más lentas, que guardarPerfiles escribe en esa carpeta (la
+aplicación lo hace al salir).
+"""
+import cProfile
+import functools
+import heapq
+import inspect
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+# Límites superiores de las cubetas, en segundos (la última cubeta es +Inf)
+LIMITES = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+RUTA_PERFILES = os.environ.get("NEOBANCO_PERFIL")
+PERFILES_GUARDADOS = 10
+LINEAS_PERFIL = 30
+
+DESCRIPCIONES = {
+    "sql": "Latencia de las sentencias SQL",
+    "espera": "Espera por el escritor o un lector del pool",
+    "accion": "Duración de las acciones de la interfaz y la consola",
+    "trabajo": "Duración de los trabajos en segundo plano",
+}
+ETIQUETAS = {"sql": "sql", "espera": "conexion", "accion": "accion", "trabajo": "trabajo"}
+
+
+class Histograma:
+    __slots__ = ("cubetas", "llamadas", "total", "maximo", "filas")
+
+    def __init__(self):
+        self.cubetas = [0] * (len(LIMITES) + 1)
+        self.llamadas = 0
+        self.total = 0.0
+        self.maximo = 0.0
+        self.filas = 0
+
+    def observar(self, segundos, filas=0):
+        self.cubetas[bisect_left(LIMITES, segundos)] += 1
+        self.llamadas += 1
+        self.total += segundos
+        self.filas += filas
+        if segundos > self.maximo:
+            self.maximo = segundos
+
+    def percentil(self, p):
+        """
+        Límite superior de la cubeta donde cae el percentil p (0-100), sin pasar del máximo visto.
+        """
+        if not self.llamadas:
+            return 0.0
+        objetivo = self.llamadas * p / 100
+        acumulado = 0
+        for limite, cantidad in zip(LIMITES, self.cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def copia(self):
+        otro = Histograma()
+        otro.cubetas = list(self.cubetas)
+        otro.llamadas, otro.total, otro.maximo, otro.filas = self.llamadas, self.total, self.maximo, self.filas
+        return otro
+
+
+class Metricas:
+    """
+    Registro de histogramas por (familia, clave), seguro entre hilos.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._candado = threading.Lock()
+
+    def observar(self, familia, clave, segundos, filas=0):
+        with self._candado:
+            serie = self._series.get((familia, clave))
+            if serie is None:
+                serie = self._series[(familia, clave)] = Histograma()
+            serie.observar(segundos, filas)
+
+    @contextmanager
+    def medir(self, familia, clave):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(familia, clave, time.perf_counter() - inicio)
+
+    def instantanea(self):
+        """
+        Copia de todas las series: {(familia, clave): Histograma}.
+        """
+        with self._candado:
+            return {llave: serie.copia() for llave, serie in self._series.items()}
+
+    def reiniciar(self):
+        with self._candado:
+            self._series.clear()
+
+
+# Acciones y trabajos de todo el proceso
+METRICAS = Metricas()
+
+
+# === Acciones y perfilado ===
+
+_perfiles = []              # montículo de (segundos, orden, nombre, texto)
+_candado_perfiles = threading.Lock()
+_perfilando = threading.local()
+_orden = iter(range(1 << 62))
+
+
+def _guardarPerfil(nombre, segundos, perfil):
+    salida = io.StringIO()
+    pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(LINEAS_PERFIL)
+    with _candado_perfiles:
+        entrada = (segundos, next(_orden), nombre, salida.getvalue())
+        if len(_perfiles) < PERFILES_GUARDADOS:
+            heapq.heappush(_perfiles, entrada)
+        elif segundos > _perfiles[0][0]:
+            heapq.heapreplace(_perfiles, entrada)
+
+
+@contextmanager
+def accion(nombre, familia="accion"):
+    """
+    Mide el bloque como una acción y, con NEOBANCO_PERFIL, lo perfila. Las
+    acciones anidadas en el mismo hilo solo se perfilan una vez, en la externa.
+    """
+    perfil = None
+    if RUTA_PERFILES and not getattr(_perfilando, "activo", False):
+        perfil = cProfile.Profile()
+        try:
+            perfil.enable()
+            _perfilando.activo = True
+        except ValueError:
+            # Desde Python 3.12 hay un solo perfilador por proceso: si otro hilo
+            # ya está perfilando, esta acción solo se mide
+            perfil = None
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        if perfil is not None:
+            perfil.disable()
+            _perfilando.activo = False
+            _guardarPerfil(nombre, segundos, perfil)
+        METRICAS.observar(familia, nombre, segundos)
+
+
+def medirAccion(funcion):
+    """
+    Decorador para manejadores de botones. Las señales de Qt pasan argumentos
+    extra (clicked pasa 'checked'), así que se descartan los que el manejador
+    no recibe, igual que hace PyQt con un método sin decorar.
+    """
+    firma = inspect.signature(funcion)
+    variable = any(p.kind == p.VAR_POSITIONAL for p in firma.parameters.values())
+    posicionales = len([p for p in firma.parameters.values()
+                        if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)])
+    nombre = f"{funcion.__module__}.{funcion.__qualname__}"
+
+    @functools.wraps(funcion)
+    def envoltura(*args):
+        with accion(nombre):
+            return funcion(*(args if variable else args[:posicionales]))
+    return envoltura
+
+
+def perfilesLentos():
+    """
+    [(segundos, nombre, texto de pstats)] de las acciones más lentas, de mayor a menor.
+    """
+    with _candado_perfiles:
+        return [(s, nombre, texto) for s, _, nombre, texto in sorted(_perfiles, reverse=True)]
+
+
+def guardarPerfiles(carpeta=RUTA_PERFILES):
+    """
+    Escribe un archivo de texto por cada perfil conservado. Retorna las rutas.
+    """
+    if not carpeta:
+        return []
+    os.makedirs(carpeta, exist_ok=True)
+    for viejo in os.listdir(carpeta):
+        if viejo.startswith("perfil_") and viejo.endswith(".txt"):
+            os.remove(os.path.join(carpeta, viejo))
+    rutas = []
+    for posicion, (segundos, nombre, texto) in enumerate(perfilesLentos(), start=1):
+        ruta = os.path.join(carpeta, f"perfil_{posicion:02d}_{nombre.replace('.', '_')}.txt")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(f"{nombre}: {segundos * 1000:.1f} ms\n\n{texto}")
+        rutas.append(ruta)
+    return rutas
+
+
+def guardarDiagnostico(bd):
+    """
+    Al salir de la aplicación: con NEOBANCO_PERFIL, vuelca las métricas (del
+    proceso y de 'bd') y los perfiles en esa carpeta. Sin ella no hace nada.
+    """
+    if not RUTA_PERFILES:
+        return []
+    return list(volcar(RUTA_PERFILES, METRICAS, bd.metricas)) + guardarPerfiles()
+
+
+# === Exportación ===
+
+def series(*registros):
+    """
+    Une las series de varias Metricas (p. ej. METRICAS y bd.metricas).
+    """
+    todas = {}
+    for registro in registros:
+        todas.update(registro.instantanea())
+    return todas
+
+
+def resumen(todas):
+    """
+    Una fila por serie, ordenadas por tiempo total: dicts con familia, clave,
+    llamadas, total_ms, promedio_ms, p50_ms, p99_ms, maximo_ms y filas.
+    """
+    filas = [
+        {
+            "familia": familia,
+            "clave": clave,
+            "llamadas": h.llamadas,
+            "total_ms": h.total * 1000,
+            "promedio_ms": h.total * 1000 / h.llamadas,
+            "p50_ms": h.percentil(50) * 1000,
+            "p99_ms": h.percentil(99) * 1000,
+            "maximo_ms": h.maximo * 1000,
+            "filas": h.filas,
+        }
+        for (familia, clave), h in todas.items() if h.llamadas
+    ]
+    filas.sort(key=lambda f: f["total_ms"], reverse=True)
+    return filas
+
+
+def exportarJSON(todas):
+    return json.dumps({
+        "limites_s": list(LIMITES),
+        "series": [
+            dict(fila, cubetas=todas[(fila["familia"], fila["clave"])].cubetas)
+            for fila in resumen(todas)
+        ],
+    }, ensure_ascii=False, indent=1)
+
+
+def _etiqueta(valor):
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def exportarPrometheus(todas):
+    """
+    Formato de exposición de texto de Prometheus: un histograma por familia y un
+    contador de filas para las sentencias SQL.
+    """
+    lineas = []
+    for familia, descripcion in DESCRIPCIONES.items():
+        metrica = f"neobanco_{familia}_segundos"
+        lineas += [f"# HELP {metrica} {descripcion}", f"# TYPE {metrica} histogram"]
+        for (fam, clave), h in sorted(todas.items()):
+            if fam != familia:
+                continue
+            etiqueta = f'{ETIQUETAS[familia]}="{_etiqueta(clave)}"'
+            acumulado = 0
+            for limite, cantidad in zip(LIMITES, h.cubetas):
+                acumulado += cantidad
+                lineas.append(f'{metrica}_bucket{{{etiqueta},le="{limite}"}} {acumulado}')
+            lineas.append(f'{metrica}_bucket{{{etiqueta},le="+Inf"}} {h.llamadas}')
+            lineas.append(f"{metrica}_sum{{{etiqueta}}} {h.total:.9f}")
+            lineas.append(f"{metrica}_count{{{etiqueta}}} {h.llamadas}")
+    lineas += ["# HELP neobanco_sql_filas_total Filas leídas o modificadas por sentencia",
+               "# TYPE neobanco_sql_filas_total counter"]
+    for (familia, clave), h in sorted(todas.items()):
+        if familia == "sql":
+            lineas.append(f'neobanco_sql_filas_total{{sql="{_etiqueta(clave)}"}} {h.filas}')
+    return "\n".join(lineas) + "\n"
+
+
+def volcar(carpeta, *registros):
+    """
+    Escribe metricas.json y metricas.prom en 'carpeta'. Retorna las dos rutas.
+    """
+    todas = series(*registros)
+    os.makedirs(carpeta, exist_ok=True)
+    rutas = (os.path.join(carpeta, "metricas.json"), os.path.join(carpeta, "metricas.prom"))
+    for ruta, contenido in zip(rutas, (exportarJSON(todas), exportarPrometheus(todas))):
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(contenido)
+    return rutas
@@ -0,0 +1,109 @@
+"""
+Liquidación de intereses de fin de mes para todas las cuentas de ahorro.
+
+El interés de cada cuenta (saldo * Remuneracion / 100) se calcula en SQL para un
+lote completo de cuentas, y el lote se escribe con executemany en una sola
+transacción: nuevo saldo, fila en Transacciones, partida en el libro de asientos
+(ver contabilidad.py) y marca en LiquidacionesAhorro con el idTransaccion del abono,
+que es como los reportes distinguen el interés de una consignación.
+Las cuentas ya marcadas para el mes se saltan, así que volver a correr el mismo
+mes (por ejemplo después de una caída) no abona dos veces.
+
+Uso: python liquidacion_ahorros.py 2025-10
+"""
+import argparse
+import calendar
+import re
+import time
+from collections import namedtuple
+
+from basedatos import obtenerBD
+from contabilidad import asientosInteresAhorro, insertarTransacciones, registrarAsientos
+from cuentas import AHORROS
+from tablas import crearTablas
+
+TAMANO_LOTE = 5000
+
+ResultadoLiquidacion = namedtuple("ResultadoLiquidacion", [
+    "mes", "cuentas", "interesTotal", "segundos", "cuentasPorSegundo",
+])
+
+SQL_LOTE = """
+    SELECT PC.idCuentaCredito, ROUND(PC.saldoCapital * P.Remuneracion / 100.0, 2), PC.saldoCapital
+    FROM ProductosContratados PC
+    JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+    WHERE P.TipoProducto = ?
+      AND PC.idCuentaCredito > ?
+      AND PC.saldoCapital > 0
+      AND NOT EXISTS (
+          SELECT 1 FROM LiquidacionesAhorro L
+          WHERE L.idCuentaCredito = PC.idCuentaCredito AND L.mes = ?
+      )
+    ORDER BY PC.idCuentaCredito
+    LIMIT ?
+"""
+
+
+def fechaCierre(mes):
+    """
+    Último día del mes 'YYYY-MM' en formato YYYY-MM-DD.
+    """
+    if not re.fullmatch(r"\d{4}-\d{2}", mes):
+        raise ValueError(f"Mes inválido: {mes!r}. Use el formato YYYY-MM.")
+    anio, numero = int(mes[:4]), int(mes[5:])
+    if not 1 <= numero <= 12:
+        raise ValueError(f"Mes inválido: {mes!r}.")
+    return f"{mes}-{calendar.monthrange(anio, numero)[1]:02d}"
+
+
+def liquidarInteresesAhorros(bd, mes, tamanoLote=TAMANO_LOTE):
+    """
+    Abona el interés del mes a todas las cuentas de ahorro pendientes y retorna
+    un ResultadoLiquidacion con el número de cuentas y la velocidad alcanzada.
+    """
+    fecha = fechaCierre(mes)
+    inicio = time.perf_counter()
+    cuentas = 0
+    interes_total = 0.0
+    ultimo = 0
+
+    while True:
+        with bd.transaccion() as s:
+            lote = s.consultar(SQL_LOTE, (AHORROS, ultimo, mes, tamanoLote))
+            if not lote:
+                break
+            s.ejecutarVarios(
+                "UPDATE ProductosContratados SET saldoCapital = saldoCapital + ? WHERE idCuentaCredito = ?",
+                [(interes, idc) for idc, interes, _ in lote]
+            )
+            ids = insertarTransacciones(s, [(idc, fecha, interes) for idc, interes, _ in lote])
+            registrarAsientos(s, [
+                partida
+                for id_transaccion, (idc, interes, saldo) in zip(ids, lote)
+                for partida in asientosInteresAhorro(id_transaccion, idc, fecha, interes, saldo + interes)
+            ])
+            s.ejecutarVarios(
+                "INSERT INTO LiquidacionesAhorro (idCuentaCredito, mes, interes, idTransaccion) VALUES (?, ?, ?, ?)",
+                [(idc, mes, interes, id_transaccion) for id_transaccion, (idc, interes, _) in zip(ids, lote)]
+            )
+        cuentas += len(lote)
+        interes_total += sum(interes for _, interes, _ in lote)
+        ultimo = lote[-1][0]
+
+    segundos = time.perf_counter() - inicio
+    velocidad = cuentas / segundos if segundos > 0 else 0.0
+    return ResultadoLiquidacion(mes, cuentas, interes_total, segundos, velocidad)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Liquidación mensual de intereses de ahorro")
+    parser.add_argument("mes", help="Mes a liquidar en formato YYYY-MM")
+    parser.add_argument("--lote", type=int, default=TAMANO_LOTE, help="Cuentas por transacción")
+    args = parser.parse_args()
+
+    bd = obtenerBD()
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    r = liquidarInteresesAhorros(bd, args.mes, args.lote)
+    print(f"Mes {r.mes}: {r.cuentas} cuentas liquidadas, interés total {r.interesTotal:.2f}")
+    print(f"Tiempo: {r.segundos:.2f} s ({r.cuentasPorSegundo:.0f} cuentas/s)")
@@ -1,35 +1,35 @@
 import sys
-import sqlite3
+from importlib import import_module
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget,
-    QListWidget, QListWidgetItem, QLabel
+    QListWidget, QListWidgetItem, QLabel, QProgressBar, QPushButton
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 
+from basedatos import obtenerBD, cerrarBD
+from cola_escritura import cerrarCola
+from instrumentacion import guardarDiagnostico, medirAccion
 from tablas import crearTablas
+from trabajos import obtenerDespachador
 
-from clientes_gui import ClientesGUI
-from productos_gui import ProductosGUI
-from contratar_gui import ContratarGUI
-from transacciones_gui import TransaccionesGUI
-from consulta_clientes_gui import ConsultaClientesGUI
+# Fábricas de las vistas del menú (índice -> módulo, clase). El módulo se importa
+# y la vista se construye la primera vez que se selecciona en el menú. Como se
+# importan por nombre, cada módulo debe estar también en hiddenimports de main.spec.
+VISTAS = {
+    1: ("clientes_gui", "ClientesGUI"),
+    2: ("consulta_clientes_gui", "ConsultaClientesGUI"),
+    3: ("productos_gui", "ProductosGUI"),
+    4: ("contratar_gui", "ContratarGUI"),
+    5: ("transacciones_gui", "TransaccionesGUI"),
+    6: ("diagnostico_gui", "DiagnosticoGUI"),
+}
+SALIR = len(VISTAS) + 1
 
 
-
-#creacion y conexion con la bas ede datos
-def conexionBD():
-    try:
-        # se crea repositorio fisico-objeto de conexcion a la base de datos 
-        con=sqlite3.connect('basemibanco.db')
-        print('la conexion fue exitosa')
-        return con
-    except Error:
-        print(Error)
-#cierre conexion
-
-def cerrarBD(con):
-    con.close()
+def crearVista(indice):
+    modulo, clase = VISTAS[indice]
+    return getattr(import_module(modulo), clase)()
 
 
 class NeobancoApp(QWidget):
@@ -53,6 +53,7 @@ class NeobancoApp(QWidget):
         self.menu.addItem(QListWidgetItem("Productos"))
         self.menu.addItem(QListWidgetItem("Contratar Producto"))
         self.menu.addItem(QListWidgetItem("Transacciones"))
+        self.menu.addItem(QListWidgetItem("Diagnóstico"))
         self.menu.addItem(QListWidgetItem("Salir"))
         self.menu.setCurrentRow(0)
         self.menu.currentRowChanged.connect(self.change_view)
@@ -88,23 +89,61 @@ jeamayac@unal.edu.co
         bienvenida_layout.addWidget(grupo)
         bienvenida.setLayout(bienvenida_layout)
 
-        # Agregar vistas al stack (en el mismo orden del menú)
+        # Agregar vistas al stack (en el mismo orden del menú). Las vistas 1 a 6
+        # empiezan como marcadores vacíos y se construyen en change_view.
         self.stack.addWidget(bienvenida)                  # Índice 0
-        self.stack.addWidget(ClientesGUI())               # Índice 1
-        self.stack.addWidget(ConsultaClientesGUI())       # Índice 2
-        self.stack.addWidget(ProductosGUI())              # Índice 3
-        self.stack.addWidget(ContratarGUI())              # Índice 4
-        self.stack.addWidget(TransaccionesGUI())          # Índice 5
-        self.stack.addWidget(QWidget())                   # Índice 6: Salir
+        for _ in VISTAS:                                  # Índices 1 a 6
+            self.stack.addWidget(QWidget())
+        self.stack.addWidget(QWidget())                   # Índice 7: Salir
+        self.vistas = {}
+
+        # ======= Indicador de trabajos en segundo plano =======
+        self.progreso = QProgressBar()
+        self.progreso.setRange(0, 0)        # Modo indeterminado
+        self.progreso.setMaximumHeight(12)
+        self.progreso.setTextVisible(False)
+        self.btn_cancelar = QPushButton("Cancelar")
+        trabajos = obtenerDespachador()
+        self.btn_cancelar.clicked.connect(trabajos.cancelarTodo)
+        trabajos.ocupado.connect(self.mostrar_ocupado)
+
+        barra = QHBoxLayout()
+        barra.addWidget(self.progreso)
+        barra.addWidget(self.btn_cancelar)
+        self.mostrar_ocupado(False)
+
+        derecha = QVBoxLayout()
+        derecha.addWidget(self.stack)
+        derecha.addLayout(barra)
 
         # Organizar Layout Principal
         layout.addWidget(self.menu)
-        layout.addWidget(self.stack)
+        layout.addLayout(derecha)
         self.setLayout(layout)
 
+    def mostrar_ocupado(self, ocupado):
+        self.progreso.setVisible(ocupado)
+        self.btn_cancelar.setVisible(ocupado)
+
+    def vista(self, index):
+        """
+        Retorna la vista del índice, construyéndola con su fábrica la primera vez.
+        """
+        if index in VISTAS and index not in self.vistas:
+            marcador = self.stack.widget(index)
+            self.vistas[index] = crearVista(index)
+            self.stack.insertWidget(index, self.vistas[index])
+            self.stack.removeWidget(marcador)
+            marcador.deleteLater()
+        return self.stack.widget(index)
+
+    @medirAccion
     def change_view(self, index):
-        if index == 6:  # Salir
-            sys.exit()
+        if index == SALIR:
+            # Sale de app.exec_() para que __main__ cierre la base y guarde el diagnóstico
+            QApplication.quit()
+            return
+        self.vista(index)
         self.stack.setCurrentIndex(index)
 
     def estilos(self):
@@ -131,10 +170,15 @@ jeamayac@unal.edu.co
         """
 
 if __name__ == "__main__":
-    Micon = conexionBD()
-    crearTablas(Micon)
+    # La creación de tablas usa el escritor de la base de datos compartida
+    with obtenerBD().transaccion() as sesion:
+        crearTablas(sesion.con)
     app = QApplication(sys.argv)
     win = NeobancoApp()
     win.show()
-    sys.exit(app.exec_())
-    cerrarBD(Micon)
+    codigo = app.exec_()
+    obtenerDespachador().esperar()
+    cerrarCola()
+    guardarDiagnostico(obtenerBD())
+    cerrarBD()
+    sys.exit(codigo)
@@ -6,7 +6,11 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # main.py importa las vistas por nombre (VISTAS), así que el análisis no las encuentra solo
+    hiddenimports=[
+        'clientes_gui', 'consulta_clientes_gui', 'productos_gui',
+        'contratar_gui', 'transacciones_gui', 'diagnostico_gui',
+    ],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
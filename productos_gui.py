@@ -1,9 +1,13 @@
-import sqlite3
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
     QMessageBox, QHBoxLayout, QTableWidget, QTableWidgetItem, QGroupBox
 )
 
+from basedatos import obtenerBD
+from instrumentacion import medirAccion
+from servicios import OperacionInvalida, ServicioBanco, SolicitudProducto
+from trabajos import obtenerDespachador
+
 class ProductosGUI(QWidget):
     """
     Clase que representa la interfaz gráfica para la gestión de productos en el sistema Neobanco.
@@ -12,11 +16,13 @@ class ProductosGUI(QWidget):
 
     def __init__(self):
         """
-        Constructor de la ventana. Inicializa la conexión con la base de datos y configura la UI.
+        Constructor de la ventana. Crea el servicio sobre la base de datos compartida y configura la UI.
         """
         super().__init__()
         self.setWindowTitle("Gestión de Productos")
-        self.conn = sqlite3.connect("basemibanco.db")
+        self.servicio = ServicioBanco(obtenerBD())
+        self.trabajos = obtenerDespachador()
+        self.listado = None
         self.setStyleSheet(self.estilos())  # Aplicar estilos a botones
         self.init_ui()
 
@@ -79,65 +85,78 @@ class ProductosGUI(QWidget):
 
         self.setLayout(layout)
 
+    @medirAccion
     def insertar_producto(self):
         """
         Inserta un nuevo producto en la base de datos si la información es válida.
         Realiza validaciones del tipo y evita IDs repetidos.
         """
         try:
-            datos = (
-                int(self.input_id.text()),
+            solicitud = SolicitudProducto.desdeTexto(
+                self.input_id.text(),
                 self.input_nombre.text(),
-                int(self.input_tipo.text()),
-                float(self.input_remun.text())
+                self.input_tipo.text(),
+                self.input_remun.text()
             )
+        except OperacionInvalida as e:
+            self.mostrar_error(e)
+            return
+
+        self.trabajos.enviar(
+            self.servicio.crearProducto, solicitud,
+            alTerminar=lambda _: QMessageBox.information(self, "Éxito", "Producto creado correctamente."),
+            alFallar=self.mostrar_error
+        )
 
-            # Validación: tipo debe ser 1 o 2
-            if datos[2] not in (1, 2):
-                QMessageBox.warning(self, "Error", "El tipo debe ser 1 (Crédito) o 2 (Ahorros).")
-                return
-
-            c = self.conn.cursor()
-            c.execute("INSERT INTO PRODUCTOS VALUES (?, ?, ?, ?)", datos)
-            self.conn.commit()
-            QMessageBox.information(self, "Éxito", "Producto creado correctamente.")
-        except sqlite3.IntegrityError:
-            QMessageBox.warning(self, "Error", "El ID ya existe o el nombre está duplicado.")
-        except Exception as e:
+    def mostrar_error(self, e):
+        """
+        Las reglas de negocio incumplidas se muestran como advertencia; el resto como error.
+        """
+        if isinstance(e, OperacionInvalida):
+            QMessageBox.warning(self, "Error", str(e))
+        else:
             QMessageBox.critical(self, "Error", str(e))
 
+    @medirAccion
     def consultar_producto(self):
         """
         Consulta un producto en la base de datos por su ID e imprime la información en pantalla.
         """
         idp = self.input_consulta.text()
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM PRODUCTOS WHERE NoIdProducto=?", (idp,))
-        fila = c.fetchone()
+        self.trabajos.enviar(self.servicio.consultarProducto, idp,
+                             alTerminar=self.mostrar_producto, alFallar=self.mostrar_error)
 
-        if fila:
-            tipo = "Crédito" if fila[2] == 1 else "Ahorros"
+    def mostrar_producto(self, producto):
+        if producto:
+            tipo = "Crédito" if producto.tipo == 1 else "Ahorros"
             self.resultado.setText(
-                f"<b>ID:</b> {fila[0]}<br><b>Nombre:</b> {fila[1]}<br><b>Tipo:</b> {tipo}<br><b>Remuneración:</b> {fila[3]}%"
+                f"<b>ID:</b> {producto.noIdProducto}<br><b>Nombre:</b> {producto.nombre}<br>"
+                f"<b>Tipo:</b> {tipo}<br><b>Remuneración:</b> {producto.remuneracion}%"
             )
         else:
             self.resultado.setText("Producto no encontrado.")
 
+    @medirAccion
     def listar_productos(self):
         """
         Lista todos los productos en una tabla visual. Muestra ID, nombre, tipo y tasa de interés.
+        Si había un listado en curso se cancela y se descarta.
         """
+        if self.listado is not None:
+            self.listado.cancelar()
+        self.listado = self.trabajos.enviar(self.servicio.listarProductos,
+                                            alTerminar=self.mostrar_productos, alFallar=self.mostrar_error)
+
+    def mostrar_productos(self, productos):
+        self.listado = None
         self.tabla.setRowCount(0)
-        c = self.conn.cursor()
-        c.execute("SELECT * FROM PRODUCTOS")
-        for fila in c.fetchall():
-            row = self.tabla.rowCount()
-            self.tabla.insertRow(row)
-            tipo = "Crédito" if fila[2] == 1 else "Ahorros"
-            self.tabla.setItem(row, 0, QTableWidgetItem(str(fila[0])))
-            self.tabla.setItem(row, 1, QTableWidgetItem(fila[1]))
+        self.tabla.setRowCount(len(productos))
+        for row, producto in enumerate(productos):
+            tipo = "Crédito" if producto.tipo == 1 else "Ahorros"
+            self.tabla.setItem(row, 0, QTableWidgetItem(str(producto.noIdProducto)))
+            self.tabla.setItem(row, 1, QTableWidgetItem(producto.nombre))
             self.tabla.setItem(row, 2, QTableWidgetItem(tipo))
-            self.tabla.setItem(row, 3, QTableWidgetItem(str(fila[3])))
+            self.tabla.setItem(row, 3, QTableWidgetItem(str(producto.remuneracion)))
 
     def estilos(self):
         """
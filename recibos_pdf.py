@@ -0,0 +1,310 @@
+"""
+Generación de recibos y estados de cuenta en PDF, sin interfaz gráfica.
+
+DocumentoPDF escribe un PDF de texto (fuente Courier estándar, así que no hay
+que incrustar fuentes) directamente al disco a medida que se agregan páginas:
+solo guarda en memoria los desplazamientos de cada objeto. La parte fija de
+cada página (fuente, interlineado, márgenes) se arma una sola vez y se reutiliza
+como plantilla, y el mismo objeto de fuente lo comparten todas las páginas.
+
+Los estados de cuenta se generan por rangos de idCuentaCredito repartidos en un
+multiprocessing.Pool. Cada trabajador abre su propia conexión de solo lectura y
+recorre los movimientos de su rango en una sola consulta ordenada por cuenta.
+Los movimientos salen de TransaccionesHistoricas (ver archivo_historico.py), así
+que el histórico y los meses cerrados incluyen lo ya archivado.
+La salida puede ser un PDF por cuenta o un único PDF con todos los estados.
+
+TransaccionesGUI.guardar_pdf usa guardarRecibo desde el Despachador, fuera del
+hilo de la interfaz.
+
+Uso: python recibos_pdf.py salida/ [--mes 2025-10] [--unico estados.pdf] [--procesos 4]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from collections import namedtuple
+from datetime import datetime
+from itertools import groupby
+
+from archivo_historico import adjuntarArchivos
+from basedatos import RUTA_BD, conexionLectura
+
+ANCHO, ALTO = 612, 792          # Carta, en puntos
+MARGEN = 50
+TAMANO_FUENTE = 10
+INTERLINEADO = 13
+LINEAS_POR_PAGINA = (ALTO - 2 * MARGEN) // INTERLINEADO - 2    # deja espacio al pie
+CUENTAS_POR_TAREA = 500
+PAGINAS_POR_NODO = 1000         # el árbol de páginas tiene dos niveles para no tener un /Kids gigante
+
+PLANTILLA_PAGINA = (
+    f"BT /F1 {TAMANO_FUENTE} Tf {INTERLINEADO} TL {MARGEN} {ALTO - MARGEN} Td\n".encode("ascii")
+)
+
+ResultadoEstados = namedtuple("ResultadoEstados", [
+    "cuentas", "paginas", "segundos", "paginasPorSegundo", "procesos",
+])
+
+
+def _texto(linea):
+    """
+    Literal de cadena PDF en WinAnsi; los caracteres que no existen ahí salen como '?'.
+    """
+    datos = linea.encode("cp1252", "replace")
+    return b"(" + datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def contenidoPagina(lineas, pie=None):
+    """
+    Flujo de contenido de una página con las líneas dadas y un pie opcional.
+    """
+    partes = [PLANTILLA_PAGINA]
+    partes.extend(_texto(linea) + b" '\n" for linea in lineas)
+    partes.append(b"ET\n")
+    if pie:
+        partes.append(b"BT /F1 8 Tf %d %d Td " % (MARGEN, MARGEN // 2) + _texto(pie) + b" Tj ET\n")
+    return b"".join(partes)
+
+
+def paginar(lineas, encabezado=()):
+    """
+    Reparte las líneas en páginas y retorna la lista de flujos de contenido.
+    El encabezado se repite al comienzo de cada página.
+    """
+    encabezado = list(encabezado)
+    por_pagina = max(1, LINEAS_POR_PAGINA - len(encabezado))
+    grupos = [lineas[i:i + por_pagina] for i in range(0, len(lineas), por_pagina)] or [[]]
+    total = len(grupos)
+    return [contenidoPagina(encabezado + grupo, f"Página {n} de {total}") for n, grupo in enumerate(grupos, 1)]
+
+
+class DocumentoPDF:
+    """
+    Escritor de PDF en flujo: agregarPagina escribe la página al disco de inmediato.
+    """
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, "wb")
+        self._desplazamientos = {}
+        self._nodos = []        # [(número de objeto del nodo intermedio, [páginas])]
+        self._siguiente = 4     # 1 catálogo, 2 raíz del árbol de páginas, 3 fuente
+        self._archivo.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        self._objeto(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>")
+
+    def _objeto(self, numero, cuerpo):
+        self._desplazamientos[numero] = self._archivo.tell()
+        self._archivo.write(b"%d 0 obj\n" % numero + cuerpo + b"\nendobj\n")
+
+    def _reservar(self):
+        numero = self._siguiente
+        self._siguiente += 1
+        return numero
+
+    def agregarPagina(self, contenido):
+        if not self._nodos or len(self._nodos[-1][1]) >= PAGINAS_POR_NODO:
+            self._nodos.append((self._reservar(), []))
+        nodo, hijos = self._nodos[-1]
+        flujo, pagina = self._reservar(), self._reservar()
+        self._objeto(flujo, b"<< /Length %d >>\nstream\n" % len(contenido) + contenido + b"\nendstream")
+        self._objeto(pagina, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (nodo, ANCHO, ALTO, flujo)
+        ))
+        hijos.append(pagina)
+
+    @property
+    def paginas(self):
+        return sum(len(hijos) for _, hijos in self._nodos)
+
+    def cerrar(self):
+        for nodo, hijos in self._nodos:
+            self._objeto(nodo, b"<< /Type /Pages /Parent 2 0 R /Kids [" + b" ".join(b"%d 0 R" % p for p in hijos)
+                         + b"] /Count %d >>" % len(hijos))
+        self._objeto(2, b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % n for n, _ in self._nodos)
+                     + b"] /Count %d >>" % self.paginas)
+        inicio_xref = self._archivo.tell()
+        total = self._siguiente
+        self._archivo.write(b"xref\n0 %d\n0000000000 65535 f \n" % total)
+        for numero in range(1, total):
+            self._archivo.write(b"%010d 00000 n \n" % self._desplazamientos[numero])
+        self._archivo.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (total, inicio_xref))
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+# === Recibos ===
+
+def guardarRecibo(ruta, texto):
+    """
+    Guarda el texto de un recibo (como el de TransaccionesGUI) en 'ruta'. Retorna 'ruta'.
+    """
+    lineas = [linea.strip() for linea in texto.strip().splitlines()]
+    with DocumentoPDF(ruta) as doc:
+        for contenido in paginar(lineas):
+            doc.agregarPagina(contenido)
+    return ruta
+
+
+# === Estados de cuenta ===
+
+SQL_ESTADOS = """
+    SELECT PC.idCuentaCredito, P.NombreProducto, P.TipoProducto, PC.idCliente, C.nombre, C.apellido,
+           PC.saldoCapital, PC.plazoPendiente, PC.sumatoriaInteresesPagados,
+           T.idTransaccion, T.fechaPago, T.valorPagado
+    FROM ProductosContratados PC
+    LEFT JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+    LEFT JOIN Clientes C ON C.noIdCliente = PC.idCliente
+    -- El rango va dentro de la subconsulta para que llegue al índice de cada parte
+    -- de la vista; así solo se materializan los movimientos de las cuentas del rango
+    LEFT JOIN (
+        SELECT * FROM TransaccionesHistoricas
+        WHERE idCuentaCredito BETWEEN :desde AND :hasta
+          AND (:mes IS NULL OR fechaPago BETWEEN :mes || '-01' AND :mes || '-31')
+    ) T ON T.idCuentaCredito = PC.idCuentaCredito
+    WHERE PC.idCuentaCredito BETWEEN :desde AND :hasta
+    ORDER BY PC.idCuentaCredito, T.fechaPago, T.idTransaccion
+"""
+
+
+def paginasEstado(filas, periodo, emision):
+    """
+    Páginas del estado de cuenta de una cuenta, a partir de sus filas de SQL_ESTADOS.
+    """
+    (id_cuenta, producto, tipo, id_cliente, nombre, apellido,
+     saldo, plazo, intereses, *_) = filas[0]
+    tipo = "Crédito" if tipo == 1 else "Ahorros"
+    encabezado = [
+        "NEOBANCO DIGITAL - ESTADO DE CUENTA",
+        f"Periodo: {periodo:<24}Emitido: {emision}",
+        f"Cuenta: {id_cuenta:<10}Producto: {producto} ({tipo})",
+        f"Titular: {nombre or ''} {apellido or ''} (ID {id_cliente})",
+        "",
+        f"{'Fecha':<12}{'Factura':>10}{'Valor':>20}",
+        "-" * 42,
+    ]
+    movimientos = [f for f in filas if f[9] is not None]
+    lineas = [f"{f[10]:<12}{f[9]:>10}{f[11]:>20,.2f}" for f in movimientos]
+    lineas += [
+        "-" * 42,
+        f"Movimientos: {len(movimientos):<10}Total: {sum(f[11] for f in movimientos):>18,.2f}",
+        f"Saldo actual: {saldo or 0:,.2f}",
+    ]
+    if tipo == "Crédito":
+        lineas.append(f"Plazo pendiente: {plazo} meses   Intereses pagados: {intereses or 0:,.2f}")
+    return paginar(lineas, encabezado)
+
+
+_con = None
+
+
+def _iniciarTrabajador(ruta, mes):
+    global _con
+    _con = conexionLectura(ruta)
+    # Con un mes solo hace falta el archivo de su año
+    anio = int(mes[:4]) if mes else None
+    adjuntarArchivos(_con, ruta, anio, anio)
+
+
+def _estadosRango(rango, mes, emision):
+    """
+    Genera los estados de las cuentas del rango: [(idCuenta, [páginas])].
+    """
+    desde, hasta = rango
+    cursor = _con.execute(SQL_ESTADOS, {"mes": mes, "desde": desde, "hasta": hasta})
+    return [
+        (id_cuenta, paginasEstado(list(filas), mes or "Histórico", emision))
+        for id_cuenta, filas in groupby(cursor, key=lambda f: f[0])
+    ]
+
+
+def _escribirRango(rango, mes, emision, carpeta):
+    """
+    Escribe un PDF por cuenta del rango. Retorna (pid, cuentas, páginas).
+    """
+    cuentas = paginas = 0
+    for id_cuenta, contenidos in _estadosRango(rango, mes, emision):
+        with DocumentoPDF(os.path.join(carpeta, f"estado_{id_cuenta:08d}.pdf")) as doc:
+            for contenido in contenidos:
+                doc.agregarPagina(contenido)
+        cuentas += 1
+        paginas += len(contenidos)
+    return os.getpid(), cuentas, paginas
+
+
+def _contenidosRango(tarea):
+    """
+    Páginas de todas las cuentas del rango, en orden. Retorna (pid, páginas, cuentas).
+    """
+    estados = _estadosRango(*tarea)
+    return os.getpid(), [contenido for _, contenidos in estados for contenido in contenidos], len(estados)
+
+
+def rangosCuentas(ruta, tamano=CUENTAS_POR_TAREA):
+    con = conexionLectura(ruta)
+    try:
+        minimo, maximo = con.execute(
+            "SELECT MIN(idCuentaCredito), MAX(idCuentaCredito) FROM ProductosContratados"
+        ).fetchone()
+    finally:
+        con.close()
+    if minimo is None:
+        return []
+    return [(inicio, min(inicio + tamano - 1, maximo)) for inicio in range(minimo, maximo + 1, tamano)]
+
+
+def generarEstados(carpeta, mes=None, unico=None, procesos=None, ruta=RUTA_BD, tamano=CUENTAS_POR_TAREA):
+    """
+    Genera los estados de cuenta de todas las cuentas. Con 'unico' (ruta de un
+    PDF) se escribe un solo documento con todos, en orden de cuenta; si no, un
+    PDF por cuenta en 'carpeta'. Retorna un ResultadoEstados.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    emision = datetime.now().strftime("%Y-%m-%d")
+    rangos = rangosCuentas(ruta, tamano)
+    inicio = time.perf_counter()
+    cuentas = paginas = 0
+    por_proceso = {}
+
+    with multiprocessing.Pool(procesos, initializer=_iniciarTrabajador, initargs=(ruta, mes)) as pool:
+        if unico:
+            with DocumentoPDF(unico) as doc:
+                # imap conserva el orden de los rangos; el padre solo concatena páginas
+                for pid, contenidos, n in pool.imap(_contenidosRango, [(r, mes, emision) for r in rangos]):
+                    for contenido in contenidos:
+                        doc.agregarPagina(contenido)
+                    cuentas += n
+                    paginas += len(contenidos)
+                    por_proceso[pid] = por_proceso.get(pid, 0) + len(contenidos)
+        else:
+            os.makedirs(carpeta, exist_ok=True)
+            tareas = [(r, mes, emision, carpeta) for r in rangos]
+            for pid, n, p in pool.starmap(_escribirRango, tareas):
+                cuentas += n
+                paginas += p
+                por_proceso[pid] = por_proceso.get(pid, 0) + p
+
+    segundos = time.perf_counter() - inicio
+    velocidad = paginas / segundos if segundos > 0 else 0.0
+    return ResultadoEstados(cuentas, paginas, segundos, velocidad, por_proceso)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estados de cuenta en PDF")
+    parser.add_argument("carpeta", help="Carpeta de salida para un PDF por cuenta")
+    parser.add_argument("--mes", help="Solo movimientos del mes YYYY-MM (por defecto, todo el histórico)")
+    parser.add_argument("--unico", help="Escribir un solo PDF con todos los estados en esta ruta")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--tamano", type=int, default=CUENTAS_POR_TAREA, help="Cuentas por tarea")
+    args = parser.parse_args()
+
+    r = generarEstados(args.carpeta, args.mes, args.unico, args.procesos, tamano=args.tamano)
+    print(f"{r.cuentas} estados, {r.paginas} páginas en {r.segundos:.2f} s ({r.paginasPorSegundo:,.0f} páginas/s)")
+    for pid, p in sorted(r.procesos.items()):
+        print(f"  proceso {pid}: {p} páginas")
@@ -0,0 +1,172 @@
+"""
+Reportes gerenciales sobre la cartera y el libro de transacciones.
+
+Cada reporte es una sola consulta SQL (agregados agrupados y funciones de
+ventana) que recorre las tablas una vez apoyándose en los índices de la
+migración 2. El resultado se lee del cursor por bloques y se escribe a CSV o
+al formato columnar (ver columnar.py) a medida que llega, así que la memoria no
+depende del número de cuentas o movimientos.
+
+Los movimientos se leen de TransaccionesHistoricas, así que incluyen los meses
+ya trasladados a los archivos anuales (ver archivo_historico.py).
+
+Reportes:
+    saldo_por_producto   créditos vigentes y saldo pendiente por producto
+    mora                 créditos vigentes sin ningún pago en el mes
+    ingresos_intereses   intereses cobrados (sumatoriaInteresesPagados) por producto
+    volumen_ahorros      consignaciones, retiros e intereses de ahorros por mes, con acumulado
+
+Uso: python reportes.py [--mes 2025-10] [--formato csv|columnar] [--salida reportes] [nombre ...]
+"""
+import argparse
+import os
+import re
+import time
+from collections import namedtuple
+from datetime import datetime
+
+from archivo_historico import lecturaHistorica
+from basedatos import obtenerBD, cerrarBD
+from columnar import EXTENSIONES, abrirEscritor
+from cuentas import CREDITO, AHORROS
+from tablas import crearTablas
+
+TAMANO_BLOQUE = 5000
+
+Reporte = namedtuple("Reporte", ["nombre", "descripcion", "columnas", "sql", "parametros"])
+ResultadoReporte = namedtuple("ResultadoReporte", ["nombre", "filas", "segundos", "ruta"])
+
+REPORTES = {r.nombre: r for r in [
+    Reporte(
+        "saldo_por_producto",
+        "Créditos vigentes y saldo pendiente por producto",
+        ["idProducto", "producto", "creditos", "saldoPendiente", "saldoPromedio", "participacion"],
+        """
+        SELECT P.NoIdProducto, P.NombreProducto, COUNT(*), ROUND(SUM(PC.saldoCapital), 2),
+               ROUND(AVG(PC.saldoCapital), 2),
+               ROUND(100.0 * SUM(PC.saldoCapital) / SUM(SUM(PC.saldoCapital)) OVER (), 2)
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE P.TipoProducto = :credito AND PC.plazoPendiente > 0
+        GROUP BY P.NoIdProducto
+        ORDER BY 4 DESC
+        """,
+        lambda mes: {"credito": CREDITO},
+    ),
+    Reporte(
+        "mora",
+        "Créditos vigentes sin pago registrado en el mes",
+        ["idCuenta", "idCliente", "nombre", "apellido", "saldoCapital", "plazoPendiente", "ultimoPago"],
+        """
+        SELECT PC.idCuentaCredito, PC.idCliente, C.nombre, C.apellido, PC.saldoCapital, PC.plazoPendiente,
+               -- ORDER BY ... LIMIT 1 (y no MAX) para que la búsqueda por cuenta llegue al
+               -- índice de cada parte de la vista en vez de materializarla
+               (SELECT T.fechaPago FROM TransaccionesHistoricas T
+                WHERE T.idCuentaCredito = PC.idCuentaCredito ORDER BY T.fechaPago DESC LIMIT 1)
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        LEFT JOIN Clientes C ON C.noIdCliente = PC.idCliente
+        WHERE P.TipoProducto = :credito AND PC.plazoPendiente > 0
+          AND NOT EXISTS (
+              SELECT 1 FROM TransaccionesHistoricas T
+              WHERE T.idCuentaCredito = PC.idCuentaCredito
+                AND T.fechaPago BETWEEN :mes || '-01' AND :mes || '-31'
+          )
+        ORDER BY PC.idCuentaCredito
+        """,
+        lambda mes: {"credito": CREDITO, "mes": mes},
+    ),
+    Reporte(
+        "ingresos_intereses",
+        "Intereses cobrados por producto de crédito",
+        ["idProducto", "producto", "creditos", "interesesCobrados", "participacion", "posicion"],
+        """
+        SELECT P.NoIdProducto, P.NombreProducto, COUNT(*), ROUND(SUM(PC.sumatoriaInteresesPagados), 2),
+               ROUND(100.0 * SUM(PC.sumatoriaInteresesPagados)
+                     / NULLIF(SUM(SUM(PC.sumatoriaInteresesPagados)) OVER (), 0), 2),
+               RANK() OVER (ORDER BY SUM(PC.sumatoriaInteresesPagados) DESC)
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        WHERE P.TipoProducto = :credito
+        GROUP BY P.NoIdProducto
+        ORDER BY 6
+        """,
+        lambda mes: {"credito": CREDITO},
+    ),
+    Reporte(
+        "volumen_ahorros",
+        "Consignaciones, retiros e intereses abonados de ahorros por mes",
+        ["mes", "movimientos", "consignado", "retirado", "intereses", "neto", "netoAcumulado"],
+        """
+        SELECT substr(T.fechaPago, 1, 7), COUNT(*),
+               ROUND(SUM(CASE WHEN T.valorPagado > 0 AND L.mes IS NULL THEN T.valorPagado ELSE 0 END), 2),
+               ROUND(-SUM(CASE WHEN T.valorPagado < 0 THEN T.valorPagado ELSE 0 END), 2),
+               ROUND(SUM(CASE WHEN L.mes IS NOT NULL THEN T.valorPagado ELSE 0 END), 2),
+               ROUND(SUM(T.valorPagado), 2),
+               ROUND(SUM(SUM(T.valorPagado)) OVER (ORDER BY substr(T.fechaPago, 1, 7)), 2)
+        FROM TransaccionesHistoricas T
+        -- El abono de liquidacion_ahorros es el movimiento que quedó marcado en
+        -- LiquidacionesAhorro (migración 9): va en 'intereses', no en 'consignado'
+        LEFT JOIN LiquidacionesAhorro L
+               ON L.idCuentaCredito = T.idCuentaCredito AND L.mes = substr(T.fechaPago, 1, 7)
+              AND L.idTransaccion = T.idTransaccion
+        -- Un solo recorrido de la base caliente y de los archivos; las cuentas de
+        -- ahorros se buscan en la lista que arma la subconsulta una sola vez
+        WHERE T.idCuentaCredito IN (
+            SELECT PC.idCuentaCredito FROM ProductosContratados PC
+            JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+            WHERE P.TipoProducto = :ahorros
+        )
+        GROUP BY 1
+        ORDER BY 1
+        """,
+        lambda mes: {"ahorros": AHORROS},
+    ),
+]}
+
+
+def generarReporte(bd, nombre, ruta, formato="csv", mes=None):
+    """
+    Ejecuta el reporte y lo escribe en 'ruta'. Retorna un ResultadoReporte.
+    'mes' (YYYY-MM) solo lo usa el reporte de mora; por defecto es el mes actual.
+    """
+    reporte = REPORTES[nombre]
+    mes = mes or datetime.now().strftime("%Y-%m")
+    if not re.fullmatch(r"\d{4}-\d{2}", mes):
+        raise ValueError(f"Mes inválido: {mes!r}. Use el formato YYYY-MM.")
+
+    inicio = time.perf_counter()
+    with lecturaHistorica(bd) as s, abrirEscritor(formato, ruta, reporte.columnas) as salida:
+        salida.escribirVarias(s.iterar(reporte.sql, reporte.parametros(mes), TAMANO_BLOQUE))
+    return ResultadoReporte(nombre, salida.filas, time.perf_counter() - inicio, ruta)
+
+
+def generarReportes(bd, carpeta, nombres=None, formato="csv", mes=None):
+    """
+    Genera los reportes indicados (todos por defecto) en 'carpeta'.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    return [
+        generarReporte(bd, nombre, os.path.join(carpeta, nombre + EXTENSIONES[formato]), formato, mes)
+        for nombre in (nombres or REPORTES)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reportes de cartera, mora, intereses y volumen")
+    parser.add_argument("nombres", nargs="*", metavar="nombre",
+                        help="reportes a generar (todos por defecto): " + ", ".join(REPORTES))
+    parser.add_argument("--mes", help="mes de referencia YYYY-MM (mora); por defecto el actual")
+    parser.add_argument("--formato", choices=list(EXTENSIONES), default="csv")
+    parser.add_argument("--salida", default="reportes", help="carpeta de salida")
+    args = parser.parse_args()
+    desconocidos = [n for n in args.nombres if n not in REPORTES]
+    if desconocidos:
+        parser.error("reportes desconocidos: " + ", ".join(desconocidos))
+
+    bd = obtenerBD()
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    for r in generarReportes(bd, args.salida, args.nombres, args.formato, args.mes):
+        print(f"{r.nombre:<20}{r.filas:>10} filas {r.segundos * 1000:>10.1f} ms  -> {r.ruta}")
+    cerrarBD()
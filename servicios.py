@@ -0,0 +1,362 @@
+"""
+Capa de servicios del Neobanco, sin dependencias de PyQt.
+
+Aquí viven las reglas de negocio que antes estaban repartidas entre los métodos
+de los QWidget y el menú de consola: registrar clientes, crear y contratar
+productos, cotizar y pagar cuotas, consultar saldo y consignar/retirar. Las
+vistas y el menú de transacciones son clientes delgados de ServicioBanco, y lo
+mismo pueden usar scripts, benchmarks o procesos en paralelo.
+
+Las solicitudes son dataclasses que se validan al construirse desde texto
+(desdeTexto); cualquier regla incumplida se reporta con OperacionInvalida y un
+mensaje listo para mostrar.
+"""
+import re
+import sqlite3
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime
+
+from amortizacion import cuotaMes
+from archivo_historico import archivosEnRango, lecturaHistorica
+from catalogo import catalogoDe
+from contabilidad import extracto, registrarAperturas, saldoAl
+from cuentas import (
+    CREDITO, AHORROS, OperacionInvalida, movimientosEntre, normalizarFecha,
+    obtenerSnapshot, pagarCuotaCredito, transaccionAhorro, validarValor
+)
+
+AHORRO_MINIMO = 100000
+LIMITE_BUSQUEDA = 50
+
+Cliente = namedtuple("Cliente", ["noIdCliente", "nombre", "apellido", "direccion", "telefono", "correo"])
+Cuota = namedtuple("Cuota", ["idCuenta", "capital", "interes", "total", "plazoPendiente"])
+SaldoAhorros = namedtuple("SaldoAhorros", ["idCuenta", "saldo", "interes", "proyeccion"])
+Movimiento = namedtuple("Movimiento", ["idTransaccion", "fecha", "valor"])
+ContratoEntregado = namedtuple("ContratoEntregado", [
+    "idCuenta", "idCliente", "idProducto", "fechaEntrega", "capitalInicial",
+])
+ResumenCartera = namedtuple("ResumenCartera", [
+    "idCliente", "creditosVigentes", "deudaTotal", "cuentasAhorro", "ahorroTotal",
+    "interesesPagados", "movimientos", "ultimoMovimiento",
+])
+
+
+def hoy():
+    return datetime.now().strftime('%Y-%m-%d')
+
+
+# === Validaciones compartidas ===
+
+def validarCorreo(correo):
+    """
+    Retorna el correo sin espacios si tiene la forma usuario@dominio.ext.
+    """
+    correo = correo.strip()
+    partes = correo.split("@")
+    if len(partes) == 2 and "." in partes[1]:
+        return correo
+    raise OperacionInvalida("Ingrese un correo válido con formato usuario@dominio.com")
+
+
+def validarContrato(tipo, capital, plazo):
+    """
+    Reglas de contratación por tipo de producto. Retorna el plazo a guardar.
+    """
+    if tipo == CREDITO:
+        if capital <= 0 or plazo <= 0:
+            raise OperacionInvalida("Crédito debe tener capital y plazo > 0.")
+        return plazo
+    if capital < AHORRO_MINIMO:
+        raise OperacionInvalida("Ahorros mínimo de $100.000")
+    return 0  # Ahorros no tiene plazo
+
+
+def consultaBusqueda(texto):
+    """
+    Convierte lo que escribe el usuario en una consulta FTS5: cada palabra (los
+    correos se parten en '.', '@'...) se busca como prefijo y todas deben aparecer.
+    """
+    return " ".join(f'"{termino}"*' for termino in re.findall(r"\w+", texto))
+
+
+# === Solicitudes ===
+
+@dataclass(frozen=True)
+class SolicitudCliente:
+    noIdCliente: int
+    nombre: str
+    apellido: str
+    direccion: str
+    telefono: int
+    correo: str
+
+    @classmethod
+    def desdeTexto(cls, noIdCliente, nombre, apellido, direccion, telefono, correo):
+        correo = validarCorreo(correo)
+        try:
+            return cls(int(noIdCliente), nombre, apellido, direccion, int(telefono), correo)
+        except ValueError:
+            raise OperacionInvalida("Verifica que el ID y Teléfono sean numéricos.")
+
+
+@dataclass(frozen=True)
+class SolicitudProducto:
+    noIdProducto: int
+    nombre: str
+    tipo: int
+    remuneracion: float
+
+    @classmethod
+    def desdeTexto(cls, noIdProducto, nombre, tipo, remuneracion):
+        try:
+            solicitud = cls(int(noIdProducto), nombre, int(tipo), float(remuneracion))
+        except ValueError:
+            raise OperacionInvalida("ID, tipo y tasa de interés deben ser numéricos.")
+        if solicitud.tipo not in (CREDITO, AHORROS):
+            raise OperacionInvalida("El tipo debe ser 1 (Crédito) o 2 (Ahorros).")
+        return solicitud
+
+
+@dataclass(frozen=True)
+class SolicitudContrato:
+    idCliente: int
+    idProducto: int
+    tipo: int
+    capital: float
+    plazo: int
+    fechaEntrega: str
+
+    @classmethod
+    def desdeTexto(cls, idCliente, idProducto, tipo, capital, plazo, fechaEntrega):
+        try:
+            capital = float(capital)
+            plazo = int(plazo)
+        except ValueError:
+            raise OperacionInvalida("Capital y plazo deben ser numéricos.")
+        plazo = validarContrato(tipo, capital, plazo)
+        return cls(idCliente, idProducto, tipo, capital, plazo, normalizarFecha(fechaEntrega))
+
+
+@dataclass(frozen=True)
+class SolicitudPago:
+    idCuenta: int
+    fecha: str
+    valor: float = None     # None: se paga la cuota completa
+
+    @classmethod
+    def desdeTexto(cls, idCuenta, fecha=None, valor=None):
+        if valor is not None and str(valor).strip() != "":
+            valor = validarValor(valor, positivo=True)
+        else:
+            valor = None
+        return cls(idCuenta, normalizarFecha(fecha or hoy()), valor)
+
+
+@dataclass(frozen=True)
+class SolicitudMovimiento:
+    idCuenta: int
+    valor: float
+    fecha: str
+
+    @classmethod
+    def desdeTexto(cls, idCuenta, valor, fecha=None):
+        try:
+            valor = validarValor(valor)
+        except OperacionInvalida:
+            raise OperacionInvalida("Error: valor inválido.")
+        return cls(idCuenta, valor, normalizarFecha(fecha or hoy()))
+
+
+# === Servicio ===
+
+class ServicioBanco:
+    """
+    Operaciones del banco sobre una BaseDatos. No guarda estado propio, así que
+    se puede crear una instancia por hilo, proceso o vista.
+
+    Con una ColaEscritura ('cola') los pagos y movimientos de ahorro se confirman
+    en grupo con los de otros hilos (ver cola_escritura.py); sin ella cada uno
+    va en su propia transacción.
+    """
+
+    def __init__(self, bd, cola=None):
+        self.bd = bd
+        self.cola = cola
+
+    # --- Clientes ---
+
+    def registrarCliente(self, solicitud):
+        try:
+            self.bd.ejecutar("INSERT INTO CLIENTES VALUES (?, ?, ?, ?, ?, ?)", (
+                solicitud.noIdCliente, solicitud.nombre, solicitud.apellido,
+                solicitud.direccion, solicitud.telefono, solicitud.correo
+            ))
+        except sqlite3.IntegrityError:
+            raise OperacionInvalida("Ya existe un cliente con ese ID.")
+
+    def consultarCliente(self, noIdCliente):
+        fila = self.bd.consultarUno("SELECT * FROM CLIENTES WHERE noIdCliente=?", (noIdCliente,))
+        return Cliente._make(fila) if fila else None
+
+    def actualizarDireccion(self, noIdCliente, direccion):
+        cursor = self.bd.ejecutar("UPDATE CLIENTES SET direccion=? WHERE noIdCliente=?", (direccion, noIdCliente))
+        if cursor.rowcount == 0:
+            raise OperacionInvalida("Cliente no encontrado.")
+
+    def buscarClientes(self, texto, limite=LIMITE_BUSQUEDA):
+        """
+        Clientes cuyo nombre, apellido, correo o teléfono empiezan por las palabras
+        de 'texto', según el índice ClientesBusqueda (migración 8). Un número
+        también se busca como ID exacto, que va primero.
+        """
+        consulta = consultaBusqueda(texto)
+        if not consulta:
+            return []
+        filas = self.bd.consultar("""
+            SELECT C.noIdCliente, C.nombre, C.apellido, C.direccion, C.telefono, C.correo
+            FROM ClientesBusqueda B
+            JOIN Clientes C ON C.noIdCliente = B.rowid
+            WHERE ClientesBusqueda MATCH ?
+            LIMIT ?
+        """, (consulta, limite))
+        texto = texto.strip()
+        if texto.isdigit():
+            exacto = self.bd.consultarUno("SELECT * FROM CLIENTES WHERE noIdCliente=?", (int(texto),))
+            if exacto is not None:
+                filas = [exacto] + [f for f in filas if f[0] != exacto[0]][:limite - 1]
+        return [Cliente._make(f) for f in filas]
+
+    def resumenCartera(self, noIdCliente):
+        """
+        Deuda, ahorro e intereses pagados del cliente, leídos de la tabla
+        ResumenCartera que mantienen los triggers (una sola fila por cliente).
+        """
+        fila = self.bd.consultarUno("SELECT * FROM ResumenCartera WHERE idCliente=?", (noIdCliente,))
+        if fila is None:
+            return ResumenCartera(noIdCliente, 0, 0.0, 0, 0.0, 0.0, 0, None)
+        return ResumenCartera._make(fila)
+
+    # --- Productos ---
+
+    def crearProducto(self, solicitud):
+        try:
+            self.bd.ejecutar("INSERT INTO PRODUCTOS VALUES (?, ?, ?, ?)", (
+                solicitud.noIdProducto, solicitud.nombre, solicitud.tipo, solicitud.remuneracion
+            ))
+        except sqlite3.IntegrityError:
+            raise OperacionInvalida("El ID ya existe o el nombre está duplicado.")
+        catalogoDe(self.bd).invalidar()
+
+    def consultarProducto(self, noIdProducto):
+        try:
+            noIdProducto = int(noIdProducto)
+        except ValueError:
+            return None
+        return catalogoDe(self.bd).obtener(self.bd, noIdProducto)
+
+    def listarProductos(self):
+        return catalogoDe(self.bd).listar(self.bd)
+
+    def versionCatalogo(self):
+        return catalogoDe(self.bd).version
+
+    def contratarProducto(self, solicitud):
+        """
+        Registra el contrato y retorna el número de la cuenta creada.
+        """
+        with self.bd.transaccion() as s:
+            if not s.consultarUno("SELECT 1 FROM CLIENTES WHERE noIdCliente=?", (solicitud.idCliente,)):
+                raise OperacionInvalida("El cliente no existe.")
+            id_cuenta = s.consultar('''
+                INSERT INTO PRODUCTOSCONTRATADOS
+                (idProducto, idCliente, capitalInicial, plazoMeses, fechaEntrega, saldoCapital, sumatoriaInteresesPagados, plazoPendiente)
+                VALUES (?, ?, ?, ?, ?, ?, 0, ?)
+                RETURNING idCuentaCredito
+            ''', (solicitud.idProducto, solicitud.idCliente, solicitud.capital, solicitud.plazo,
+                  solicitud.fechaEntrega, solicitud.capital, solicitud.plazo))[0][0]
+            registrarAperturas(s, id_cuenta, id_cuenta)
+            return id_cuenta
+
+    # --- Créditos ---
+
+    def cotizarCuota(self, idCuenta):
+        cuenta = obtenerSnapshot(self.bd, idCuenta)
+        if cuenta is None or cuenta.tipo != CREDITO:
+            raise OperacionInvalida("No es un crédito.")
+        if cuenta.plazoPendiente <= 0:
+            raise OperacionInvalida("No hay cuotas pendientes.")
+        capital, interes, total = cuotaMes(cuenta.saldo, cuenta.plazoPendiente, cuenta.interes)
+        return Cuota(cuenta.idCuenta, capital, interes, total, cuenta.plazoPendiente)
+
+    def pagarCuota(self, solicitud):
+        """
+        Retorna el PagoCredito registrado (ver cuentas.pagarCuotaCredito).
+        """
+        if self.cola is not None:
+            return self.cola.pagarCuota(solicitud.idCuenta, solicitud.fecha, solicitud.valor).result()
+        return pagarCuotaCredito(self.bd, solicitud.idCuenta, solicitud.fecha, solicitud.valor)
+
+    # --- Ahorros ---
+
+    def consultarSaldoAhorros(self, idCuenta):
+        cuenta = obtenerSnapshot(self.bd, idCuenta)
+        if cuenta is None or cuenta.tipo != AHORROS:
+            raise OperacionInvalida("No es una cuenta de ahorros.")
+        return SaldoAhorros(cuenta.idCuenta, cuenta.saldo, cuenta.interes,
+                            cuenta.saldo * (1 + cuenta.interes / 100))
+
+    def consignarRetirar(self, solicitud):
+        """
+        Retorna el MovimientoAhorro registrado (ver cuentas.transaccionAhorro).
+        """
+        if self.cola is not None:
+            return self.cola.movimientoAhorro(solicitud.idCuenta, solicitud.valor, solicitud.fecha).result()
+        return transaccionAhorro(self.bd, solicitud.idCuenta, solicitud.valor, solicitud.fecha)
+
+    # --- Consultas por fecha ---
+
+    def _rangoFechas(self, desde, hasta):
+        desde, hasta = normalizarFecha(desde), normalizarFecha(hasta)
+        if desde > hasta:
+            raise OperacionInvalida("La fecha inicial es posterior a la final.")
+        return desde, hasta
+
+    def movimientosEntre(self, idCuenta, desde, hasta):
+        """
+        Movimientos de la cuenta entre dos fechas, inclusive (ver cuentas.movimientosEntre).
+        Si algún año del rango ya tiene archivo histórico se consulta también el archivo.
+        """
+        desde, hasta = self._rangoFechas(desde, hasta)
+        anios = int(desde[:4]), int(hasta[:4])
+        if archivosEnRango(self.bd.ruta, *anios):
+            with lecturaHistorica(self.bd, *anios) as s:
+                filas = movimientosEntre(s, idCuenta, desde, hasta, historico=True)
+        else:
+            filas = movimientosEntre(self.bd, idCuenta, desde, hasta)
+        return [Movimiento._make(f) for f in filas]
+
+    def contratosEntregadosEntre(self, desde, hasta):
+        """
+        Contratos con fecha de entrega entre dos fechas, inclusive (índice idxContratadosEntrega).
+        """
+        desde, hasta = self._rangoFechas(desde, hasta)
+        return [ContratoEntregado._make(f) for f in self.bd.consultar("""
+            SELECT idCuentaCredito, idCliente, idProducto, fechaEntrega, capitalInicial
+            FROM ProductosContratados
+            WHERE fechaEntrega BETWEEN ? AND ?
+            ORDER BY fechaEntrega, idCuentaCredito
+        """, (desde, hasta))]
+
+    def saldoAl(self, idCuenta, fecha):
+        """
+        Saldo de la cuenta al cierre de la fecha, según el libro de asientos.
+        """
+        return saldoAl(self.bd, idCuenta, normalizarFecha(fecha))
+
+    def extracto(self, idCuenta, desde, hasta):
+        """
+        Partidas del libro (capital, interés, depósitos...) entre dos fechas, inclusive.
+        """
+        desde, hasta = self._rangoFechas(desde, hasta)
+        return extracto(self.bd, idCuenta, desde, hasta)
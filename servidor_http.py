@@ -0,0 +1,221 @@
+"""
+Servidor HTTP/JSON local (asyncio, solo biblioteca estándar) para que varios
+cajeros y canales operen al mismo tiempo sobre ServicioBanco.
+
+Rutas:
+    GET  /clientes/<id>                 datos del cliente
+    GET  /cuentas/<id>/cuota            cotización de la cuota del mes (créditos)
+    GET  /cuentas/<id>/saldo            saldo y proyección (ahorros)
+    POST /cuentas/<id>/pagos            {"fecha"?, "valor"?}  paga la cuota
+    POST /cuentas/<id>/movimientos      {"valor", "fecha"?}   consigna o retira
+
+Las lecturas van a un ThreadPoolExecutor del tamaño del pool de lectores y las
+escrituras a una ColaEscritura, un único hilo escritor que agrupa los pagos y
+movimientos concurrentes en una sola transacción (group commit). Un semáforo
+limita las operaciones en vuelo para que las colas no crezcan sin tope. La base
+se abre con synchronous=FULL: cuando el servidor responde un pago, el COMMIT
+del lote ya llegó al disco.
+
+Uso: python servidor_http.py [--host 127.0.0.1] [--puerto 8080]
+"""
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from basedatos import NUM_LECTORES, BaseDatos
+from cola_escritura import ColaEscritura
+from servicios import (
+    OperacionInvalida, ServicioBanco, SolicitudMovimiento, SolicitudPago
+)
+from tablas import crearTablas
+
+MAX_EN_VUELO = 256
+TAMANO_MAXIMO_CUERPO = 64 * 1024
+
+ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 422: "Unprocessable Entity", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def aJSON(valor):
+    """
+    Convierte namedtuples (también anidadas) a dicts serializables.
+    """
+    if hasattr(valor, "_asdict"):
+        return {k: aJSON(v) for k, v in valor._asdict().items()}
+    if isinstance(valor, (list, tuple)):
+        return [aJSON(v) for v in valor]
+    return valor
+
+
+class ServidorBanco:
+
+    def __init__(self, servicio, lectores=NUM_LECTORES):
+        self.servicio = servicio
+        self.lecturas = ThreadPoolExecutor(max_workers=lectores, thread_name_prefix="lector")
+        self.escrituras = ColaEscritura(servicio.bd)
+        self.en_vuelo = asyncio.Semaphore(MAX_EN_VUELO)
+        self.rutas = [
+            ("GET", re.compile(r"/clientes/(\d+)"), self.cliente),
+            ("GET", re.compile(r"/cuentas/(\d+)/cuota"), self.cuota),
+            ("GET", re.compile(r"/cuentas/(\d+)/saldo"), self.saldo),
+            ("POST", re.compile(r"/cuentas/(\d+)/pagos"), self.pagar),
+            ("POST", re.compile(r"/cuentas/(\d+)/movimientos"), self.movimiento),
+        ]
+
+    async def _leer(self, funcion, *args):
+        async with self.en_vuelo:
+            return await asyncio.get_running_loop().run_in_executor(self.lecturas, funcion, *args)
+
+    async def _escribir(self, operacion, *args):
+        # La operación se encola ya dentro del semáforo, para que también limite la cola de escritura
+        async with self.en_vuelo:
+            return await asyncio.wrap_future(operacion(*args))
+
+    # === Manejadores ===
+
+    async def cliente(self, id_cliente, cuerpo):
+        cliente = await self._leer(self.servicio.consultarCliente, int(id_cliente))
+        if cliente is None:
+            raise ErrorHTTP(404, "Cliente no encontrado.")
+        return cliente
+
+    async def cuota(self, id_cuenta, cuerpo):
+        return await self._leer(self.servicio.cotizarCuota, int(id_cuenta))
+
+    async def saldo(self, id_cuenta, cuerpo):
+        return await self._leer(self.servicio.consultarSaldoAhorros, int(id_cuenta))
+
+    async def pagar(self, id_cuenta, cuerpo):
+        solicitud = SolicitudPago.desdeTexto(int(id_cuenta), cuerpo.get("fecha"), cuerpo.get("valor"))
+        return await self._escribir(
+            self.escrituras.pagarCuota, solicitud.idCuenta, solicitud.fecha, solicitud.valor
+        )
+
+    async def movimiento(self, id_cuenta, cuerpo):
+        if "valor" not in cuerpo:
+            raise ErrorHTTP(400, "Falta el campo 'valor'.")
+        solicitud = SolicitudMovimiento.desdeTexto(int(id_cuenta), cuerpo["valor"], cuerpo.get("fecha"))
+        return await self._escribir(
+            self.escrituras.movimientoAhorro, solicitud.idCuenta, solicitud.valor, solicitud.fecha
+        )
+
+    # === Protocolo HTTP ===
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        ruta = ruta.split("?", 1)[0].rstrip("/")
+        encontrada = False
+        for metodo_ruta, patron, manejador in self.rutas:
+            coincidencia = patron.fullmatch(ruta)
+            if coincidencia:
+                encontrada = True
+                if metodo_ruta == metodo:
+                    return await manejador(*coincidencia.groups(), cuerpo)
+        if encontrada:
+            raise ErrorHTTP(405, "Método no permitido.")
+        raise ErrorHTTP(404, "Ruta no encontrada.")
+
+    async def atender(self, lector, escritor):
+        """
+        Atiende una conexión; soporta keep-alive para que los clientes reutilicen el socket.
+        """
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, version = linea.decode("latin-1").split()
+                except ValueError:
+                    break
+                encabezados = {}
+                while True:
+                    linea = await lector.readline()
+                    if linea in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = linea.decode("latin-1").partition(":")
+                    encabezados[nombre.strip().lower()] = valor.strip()
+
+                mantener = (encabezados.get("connection", "").lower() != "close"
+                            and version == "HTTP/1.1")
+                try:
+                    try:
+                        largo = int(encabezados.get("content-length", 0) or 0)
+                    except ValueError:
+                        largo = -1
+                    if largo < 0:
+                        # Sin un largo confiable no se sabe dónde empieza la siguiente solicitud
+                        mantener = False
+                        raise ErrorHTTP(400, "Content-Length inválido.")
+                    if largo > TAMANO_MAXIMO_CUERPO:
+                        # El cuerpo queda sin leer: la conexión se cierra después de responder
+                        mantener = False
+                        raise ErrorHTTP(413, "Cuerpo demasiado grande.")
+                    datos = await lector.readexactly(largo) if largo else b""
+                    try:
+                        cuerpo = json.loads(datos) if datos else {}
+                    except ValueError:
+                        raise ErrorHTTP(400, "JSON inválido.")
+                    if not isinstance(cuerpo, dict):
+                        raise ErrorHTTP(400, "Se esperaba un objeto JSON.")
+                    estado, respuesta = 200, aJSON(await self.despachar(metodo, ruta, cuerpo))
+                except ErrorHTTP as e:
+                    estado, respuesta = e.estado, {"error": str(e)}
+                except OperacionInvalida as e:
+                    estado, respuesta = 422, {"error": str(e)}
+                except ValueError as e:
+                    estado, respuesta = 400, {"error": str(e)}
+                except Exception as e:
+                    estado, respuesta = 500, {"error": str(e)}
+
+                carga = json.dumps(respuesta, ensure_ascii=False).encode("utf-8")
+                escritor.write(
+                    f"HTTP/1.1 {estado} {ESTADOS[estado]}\r\n"
+                    f"Content-Type: application/json; charset=utf-8\r\n"
+                    f"Content-Length: {len(carga)}\r\n"
+                    f"Connection: {'keep-alive' if mantener else 'close'}\r\n\r\n".encode("latin-1") + carga
+                )
+                await escritor.drain()
+                if not mantener:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    def cerrar(self):
+        self.lecturas.shutdown()
+        self.escrituras.cerrar()
+
+
+async def servir(host, puerto):
+    bd = BaseDatos(sincronizacion="FULL")
+    with bd.transaccion() as sesion:
+        crearTablas(sesion.con)
+    servidor = ServidorBanco(ServicioBanco(bd))
+    tcp = await asyncio.start_server(servidor.atender, host, puerto)
+    print(f"Neobanco escuchando en http://{host}:{puerto}")
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        servidor.cerrar()
+        bd.cerrar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON del Neobanco")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.host, args.puerto))
+    except KeyboardInterrupt:
+        pass
@@ -1,7 +1,12 @@
-#Tablas---------------------------------------------------------------------------------------------------------------------------------- 
-# Creacion de tablas para los 4 modulos 
-def crearTablas(con):
-    cursor = con.cursor()
+#Tablas----------------------------------------------------------------------------------------------------------------------------------
+# El esquema se versiona con PRAGMA user_version: cada migración tiene un número
+# y solo se aplican las que la base todavía no tiene. Así un 'basemibanco.db'
+# existente se actualiza en su lugar al arrancar la aplicación.
+from datetime import datetime
+
+
+# Creacion de tablas para los 4 modulos
+def _v1_tablasBase(cursor):
     # Tabla de productos
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS PRODUCTOS (
@@ -47,4 +52,375 @@ def crearTablas(con):
             FOREIGN KEY(idCuentaCredito) REFERENCES ProductosContratados(idCuentaCredito)
         )
     ''')
+
+
+# Índices para las búsquedas por cuenta, cliente y producto
+def _v2_indices(cursor):
+    # Columna año-mes derivada de fechaPago. SQLite no permite agregar columnas
+    # STORED con ALTER TABLE, así que es VIRTUAL y su valor queda guardado en el índice.
+    cursor.execute('''
+        ALTER TABLE Transacciones
+        ADD COLUMN mesPago TEXT GENERATED ALWAYS AS (substr(fechaPago, 1, 7)) VIRTUAL
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxTransaccionesCuentaFecha
+        ON Transacciones(idCuentaCredito, fechaPago, valorPagado)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxTransaccionesCuentaMes
+        ON Transacciones(idCuentaCredito, mesPago)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxContratadosCliente
+        ON ProductosContratados(idCliente)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxContratadosProducto
+        ON ProductosContratados(idProducto)
+    ''')
+
+
+# Registro de intereses abonados a cuentas de ahorro, uno por cuenta y mes
+def _v3_liquidacionesAhorro(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS LiquidacionesAhorro(
+            idCuentaCredito INTEGER,
+            mes TEXT,
+            interes REAL,
+            PRIMARY KEY (idCuentaCredito, mes),
+            FOREIGN KEY(idCuentaCredito) REFERENCES ProductosContratados(idCuentaCredito)
+        ) WITHOUT ROWID
+    ''')
+
+
+# Índices para ordenar y paginar la consulta de clientes por nombre y apellido
+def _v4_indicesClientes(cursor):
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxClientesNombre
+        ON Clientes(nombre, noIdCliente)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxClientesApellido
+        ON Clientes(apellido, noIdCliente)
+    ''')
+
+
+# Resumen de cartera por cliente, mantenido por triggers
+def _aporteCartera(fila, signo):
+    # Upsert que suma (signo '+') o resta (signo '-') lo que una fila de
+    # ProductosContratados aporta al resumen de su cliente. Tipo 1 = crédito, 2 = ahorros.
+    tipo = f"(SELECT TipoProducto FROM PRODUCTOS WHERE NoIdProducto = {fila}.idProducto)"
+    return f'''
+            INSERT INTO ResumenCartera
+            (idCliente, creditosVigentes, deudaTotal, cuentasAhorro, ahorroTotal, interesesPagados)
+            VALUES (
+                {fila}.idCliente,
+                {signo}({tipo} = 1 AND {fila}.plazoPendiente > 0),
+                {signo}(CASE WHEN {tipo} = 1 THEN {fila}.saldoCapital ELSE 0 END),
+                {signo}({tipo} = 2),
+                {signo}(CASE WHEN {tipo} = 2 THEN {fila}.saldoCapital ELSE 0 END),
+                {signo}IFNULL({fila}.sumatoriaInteresesPagados, 0)
+            )
+            ON CONFLICT(idCliente) DO UPDATE SET
+                creditosVigentes = creditosVigentes + excluded.creditosVigentes,
+                deudaTotal = deudaTotal + excluded.deudaTotal,
+                cuentasAhorro = cuentasAhorro + excluded.cuentasAhorro,
+                ahorroTotal = ahorroTotal + excluded.ahorroTotal,
+                interesesPagados = interesesPagados + excluded.interesesPagados;
+    '''
+
+
+def _v5_resumenCartera(cursor):
+    # Una fila por cliente con su deuda, ahorro e intereses pagados, para que el
+    # panel de cartera lea un solo registro en vez de agregar cuentas y movimientos.
+    # Los triggers solo reaccionan a INSERT y UPDATE: borrar filas (por ejemplo al
+    # archivarlas) no altera el resumen.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ResumenCartera(
+            idCliente INTEGER PRIMARY KEY,
+            creditosVigentes INTEGER NOT NULL DEFAULT 0,
+            deudaTotal REAL NOT NULL DEFAULT 0,
+            cuentasAhorro INTEGER NOT NULL DEFAULT 0,
+            ahorroTotal REAL NOT NULL DEFAULT 0,
+            interesesPagados REAL NOT NULL DEFAULT 0,
+            movimientos INTEGER NOT NULL DEFAULT 0,
+            ultimoMovimiento TEXT
+        )
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trgCarteraContrato
+        AFTER INSERT ON ProductosContratados
+        BEGIN
+            {_aporteCartera("NEW", "+")}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trgCarteraCuenta
+        AFTER UPDATE OF idCliente, idProducto, saldoCapital, plazoPendiente, sumatoriaInteresesPagados
+        ON ProductosContratados
+        BEGIN
+            {_aporteCartera("OLD", "-")}
+            {_aporteCartera("NEW", "+")}
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trgCarteraMovimiento
+        AFTER INSERT ON Transacciones
+        BEGIN
+            INSERT INTO ResumenCartera (idCliente, movimientos, ultimoMovimiento)
+            SELECT idCliente, 1, NEW.fechaPago
+            FROM ProductosContratados WHERE idCuentaCredito = NEW.idCuentaCredito
+            ON CONFLICT(idCliente) DO UPDATE SET
+                movimientos = movimientos + 1,
+                ultimoMovimiento = MAX(IFNULL(ultimoMovimiento, ''), excluded.ultimoMovimiento);
+        END
+    ''')
+    # Carga inicial con lo que ya exista en la base
+    cursor.execute('''
+        INSERT OR REPLACE INTO ResumenCartera
+        (idCliente, creditosVigentes, deudaTotal, cuentasAhorro, ahorroTotal,
+         interesesPagados, movimientos, ultimoMovimiento)
+        SELECT PC.idCliente,
+               SUM(P.TipoProducto = 1 AND PC.plazoPendiente > 0),
+               SUM(CASE WHEN P.TipoProducto = 1 THEN PC.saldoCapital ELSE 0 END),
+               SUM(P.TipoProducto = 2),
+               SUM(CASE WHEN P.TipoProducto = 2 THEN PC.saldoCapital ELSE 0 END),
+               SUM(IFNULL(PC.sumatoriaInteresesPagados, 0)),
+               IFNULL(SUM(T.movimientos), 0),
+               MAX(T.ultimo)
+        FROM ProductosContratados PC
+        LEFT JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+        LEFT JOIN (
+            SELECT idCuentaCredito, COUNT(*) AS movimientos, MAX(fechaPago) AS ultimo
+            FROM Transacciones GROUP BY idCuentaCredito
+        ) T ON T.idCuentaCredito = PC.idCuentaCredito
+        GROUP BY PC.idCliente
+    ''')
+
+
+# Formatos que han llegado a la base: ISO (consola, transacciones) y dd/MM/yyyy (ContratarGUI)
+_FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d", "%d-%m-%Y")
+
+
+def _fechaISO(texto):
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto.strip(), formato).strftime("%Y-%m-%d")
+        except ValueError:
+            pass
+    return None
+
+
+def _normalizarColumna(cursor, tabla, columna):
+    """
+    Reescribe en ISO las fechas de 'columna' que no lo están. Las que no se pueden
+    interpretar se dejan como están. Retorna los rowid modificados.
+    """
+    filas = cursor.execute(f"""
+        SELECT rowid, {columna} FROM {tabla}
+        WHERE {columna} IS NOT NULL AND {columna} IS NOT date({columna}, '+0 days')
+    """).fetchall()
+    cambios = [(_fechaISO(str(valor)), rowid) for rowid, valor in filas]
+    cambios = [(fecha, rowid) for fecha, rowid in cambios if fecha is not None]
+    cursor.executemany(f"UPDATE {tabla} SET {columna} = ? WHERE rowid = ?", cambios)
+    return [rowid for _, rowid in cambios]
+
+
+# Fechas en ISO 'YYYY-MM-DD': se ordenan como texto, sirven para rangos indexados
+# y para la columna mesPago. Desde aquí las fechas mal formadas no entran a las tablas.
+def _v6_fechasISO(cursor):
+    _normalizarColumna(cursor, "ProductosContratados", "fechaEntrega")
+    movidas = _normalizarColumna(cursor, "Transacciones", "fechaPago")
+    if movidas:
+        # El último movimiento del resumen pudo haberse calculado con fechas en otro formato
+        cursor.execute('''
+            UPDATE ResumenCartera SET ultimoMovimiento = (
+                SELECT MAX(CASE WHEN T.fechaPago = date(T.fechaPago, '+0 days') THEN T.fechaPago END)
+                FROM ProductosContratados PC
+                JOIN Transacciones T ON T.idCuentaCredito = PC.idCuentaCredito
+                WHERE PC.idCliente = ResumenCartera.idCliente
+            )
+        ''')
+    # date(x, '+0 days') devuelve la fecha normalizada (y desborda días inexistentes como
+    # el 30 de febrero), así que solo coincide con x cuando ya es una fecha ISO válida
+    for tabla, columna, evento in [
+        ("Transacciones", "fechaPago", "INSERT"),
+        ("Transacciones", "fechaPago", "UPDATE"),
+        ("ProductosContratados", "fechaEntrega", "INSERT"),
+        ("ProductosContratados", "fechaEntrega", "UPDATE"),
+    ]:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trgFecha{tabla}{evento.title()}
+            BEFORE {evento} {"OF " + columna + " " if evento == "UPDATE" else ""}ON {tabla}
+            WHEN NEW.{columna} IS NOT date(NEW.{columna}, '+0 days')
+            BEGIN
+                SELECT RAISE(ABORT, '{columna} debe ser una fecha YYYY-MM-DD');
+            END
+        ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxContratadosEntrega
+        ON ProductosContratados(fechaEntrega)
+    ''')
+
+
+# Libro de asientos por partida doble y saldos de corte (ver contabilidad.py)
+def _v7_libroAsientos(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS Asientos(
+            idAsiento INTEGER PRIMARY KEY,
+            idTransaccion INTEGER,
+            idCuentaCredito INTEGER NOT NULL,
+            fecha TEXT NOT NULL,
+            concepto TEXT NOT NULL,
+            debito TEXT NOT NULL,
+            credito TEXT NOT NULL,
+            valor REAL NOT NULL CHECK (valor >= 0),
+            variacion REAL NOT NULL,
+            saldo REAL NOT NULL,
+            FOREIGN KEY(idCuentaCredito) REFERENCES ProductosContratados(idCuentaCredito)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS CortesSaldo(
+            idCuentaCredito INTEGER,
+            fecha TEXT,
+            saldo REAL NOT NULL,
+            PRIMARY KEY (idCuentaCredito, fecha)
+        ) WITHOUT ROWID
+    ''')
+    # Cubriente para saldoAl y los extractos por cuenta; el segundo para tomar cortes
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxAsientosCuentaFecha
+        ON Asientos(idCuentaCredito, fecha, variacion)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxAsientosFecha
+        ON Asientos(fecha, idCuentaCredito)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idxCortesFecha
+        ON CortesSaldo(fecha)
+    ''')
+    # Las cuentas existentes abren el libro con su saldo actual, fechado en su último
+    # movimiento: la historia anterior a esta migración no tiene el detalle capital/interés
+    cursor.execute('''
+        INSERT INTO Asientos
+        (idTransaccion, idCuentaCredito, fecha, concepto, debito, credito, valor, variacion, saldo)
+        SELECT NULL, PC.idCuentaCredito,
+               COALESCE(
+                   (SELECT MAX(T.fechaPago) FROM Transacciones T
+                    WHERE T.idCuentaCredito = PC.idCuentaCredito AND T.fechaPago = date(T.fechaPago, '+0 days')),
+                   date(PC.fechaEntrega, '+0 days'),
+                   date('now')
+               ),
+               'saldo_inicial',
+               CASE WHEN P.TipoProducto = 1 THEN 'CARTERA_CREDITOS' ELSE 'SALDOS_INICIALES' END,
+               CASE WHEN P.TipoProducto = 1 THEN 'SALDOS_INICIALES' ELSE 'DEPOSITOS_AHORRO' END,
+               IFNULL(PC.saldoCapital, 0), IFNULL(PC.saldoCapital, 0), IFNULL(PC.saldoCapital, 0)
+        FROM ProductosContratados PC
+        JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trgAsientosInvalidaCortes
+        AFTER INSERT ON Asientos
+        BEGIN
+            DELETE FROM CortesSaldo
+            WHERE idCuentaCredito = NEW.idCuentaCredito AND fecha >= NEW.fecha;
+        END
+    ''')
+
+
+# Búsqueda de texto completo sobre Clientes. La tabla FTS5 es de contenido externo:
+# no duplica los datos, solo guarda el índice invertido, y los triggers la mantienen
+# al día. 'prefix' precalcula los prefijos de 2 y 3 letras para buscar mientras se escribe.
+def _v8_busquedaClientes(cursor):
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS ClientesBusqueda USING fts5(
+            nombre, apellido, correo, telefono,
+            content='Clientes', content_rowid='noIdCliente',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trgBusquedaClienteInsert
+        AFTER INSERT ON Clientes
+        BEGIN
+            INSERT INTO ClientesBusqueda (rowid, nombre, apellido, correo, telefono)
+            VALUES (NEW.noIdCliente, NEW.nombre, NEW.apellido, NEW.correo, NEW.telefono);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trgBusquedaClienteDelete
+        AFTER DELETE ON Clientes
+        BEGIN
+            INSERT INTO ClientesBusqueda (ClientesBusqueda, rowid, nombre, apellido, correo, telefono)
+            VALUES ('delete', OLD.noIdCliente, OLD.nombre, OLD.apellido, OLD.correo, OLD.telefono);
+        END
+    ''')
+    # Cambiar la dirección (lo más frecuente) no toca el índice
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trgBusquedaClienteUpdate
+        AFTER UPDATE OF noIdCliente, nombre, apellido, correo, telefono ON Clientes
+        BEGIN
+            INSERT INTO ClientesBusqueda (ClientesBusqueda, rowid, nombre, apellido, correo, telefono)
+            VALUES ('delete', OLD.noIdCliente, OLD.nombre, OLD.apellido, OLD.correo, OLD.telefono);
+            INSERT INTO ClientesBusqueda (rowid, nombre, apellido, correo, telefono)
+            VALUES (NEW.noIdCliente, NEW.nombre, NEW.apellido, NEW.correo, NEW.telefono);
+        END
+    ''')
+    cursor.execute("INSERT INTO ClientesBusqueda (ClientesBusqueda) VALUES ('rebuild')")
+
+
+# Movimiento de Transacciones con el que se abonó cada liquidación de intereses,
+# para distinguirlo de una consignación del mismo día y valor
+def _v9_transaccionLiquidacion(cursor):
+    cursor.execute("ALTER TABLE LiquidacionesAhorro ADD COLUMN idTransaccion INTEGER")
+    # Las liquidaciones anteriores se enlazan con su partida de intereses del libro
+    # o, si son anteriores al libro, con el abono del último día del mes por ese valor
+    cursor.execute('''
+        UPDATE LiquidacionesAhorro SET idTransaccion = COALESCE(
+            (SELECT MIN(A.idTransaccion) FROM Asientos A
+             WHERE A.idCuentaCredito = LiquidacionesAhorro.idCuentaCredito
+               AND A.concepto = 'interes' AND A.debito = 'GASTO_INTERESES'
+               AND substr(A.fecha, 1, 7) = LiquidacionesAhorro.mes),
+            (SELECT MIN(T.idTransaccion) FROM Transacciones T
+             WHERE T.idCuentaCredito = LiquidacionesAhorro.idCuentaCredito
+               AND T.mesPago = LiquidacionesAhorro.mes
+               AND T.fechaPago = date(T.fechaPago, 'start of month', '+1 month', '-1 day')
+               AND T.valorPagado = LiquidacionesAhorro.interes)
+        )
+    ''')
+
+
+# Lista ordenada de migraciones: (versión, función)
+MIGRACIONES = [
+    (1, _v1_tablasBase),
+    (2, _v2_indices),
+    (3, _v3_liquidacionesAhorro),
+    (4, _v4_indicesClientes),
+    (5, _v5_resumenCartera),
+    (6, _v6_fechasISO),
+    (7, _v7_libroAsientos),
+    (8, _v8_busquedaClientes),
+    (9, _v9_transaccionLiquidacion),
+]
+
+
+def versionEsquema(con):
+    return con.execute("PRAGMA user_version").fetchone()[0]
+
+
+def crearTablas(con, hasta=None):
+    """
+    Aplica sobre la conexión todas las migraciones pendientes, en orden,
+    y deja registrada la versión alcanzada en PRAGMA user_version.
+    Con 'hasta' se detiene en esa versión (p. ej. hasta=1 para cargar datos
+    masivos en las tablas base y crear índices, triggers y resúmenes después).
+    """
+    cursor = con.cursor()
+    actual = versionEsquema(con)
+    for version, migracion in MIGRACIONES:
+        if version > actual and (hasta is None or version <= hasta):
+            migracion(cursor)
+            cursor.execute(f"PRAGMA user_version = {version}")
     con.commit()
@@ -0,0 +1,47 @@
+"""
+Regresión del orden de los resultados de búsqueda en ModeloClientes: las filas
+con la columna en NULL van al final tanto en orden ascendente como descendente.
+
+Uso: python -m pytest test_consulta_clientes.py
+"""
+import unittest
+
+from PyQt5.QtCore import Qt
+
+from consulta_clientes_gui import ModeloClientes
+
+DIRECCION = 3
+
+FILAS = [
+    (1, "Ana", "Gómez", "Calle 2", 300, "ana@correo.com"),
+    (2, "Luis", "Pérez", None, 301, None),
+    (3, "Marta", "Ruiz", "Calle 9", None, "marta@correo.com"),
+    (4, "Juan", "Díaz", None, 303, "juan@correo.com"),
+    (5, "Sara", "López", "Calle 5", 304, None),
+]
+
+
+class TestOrdenConNulos(unittest.TestCase):
+
+    def setUp(self):
+        self.modelo = ModeloClientes(bd=None)
+        self.modelo.mostrarResultados(FILAS)
+
+    def _columna(self, columna):
+        return [self.modelo.data(self.modelo.index(fila, columna)) for fila in range(self.modelo.rowCount())]
+
+    def test_ascendente(self):
+        self.modelo.sort(DIRECCION, Qt.AscendingOrder)
+        self.assertEqual(self._columna(DIRECCION), ["Calle 2", "Calle 5", "Calle 9", "", ""])
+
+    def test_descendente(self):
+        self.modelo.sort(DIRECCION, Qt.DescendingOrder)
+        self.assertEqual(self._columna(DIRECCION), ["Calle 9", "Calle 5", "Calle 2", "", ""])
+
+    def test_numericos_descendente(self):
+        self.modelo.sort(4, Qt.DescendingOrder)
+        self.assertEqual(self._columna(4), ["304", "303", "301", "300", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Regresión de importar_pagos: valores no finitos, que no son números o que
+superan el saldo del crédito se rechazan fila por fila, sin tocar el crédito
+ni abortar la importación.
+
+Uso: python -m pytest test_importar_pagos.py
+"""
+import csv
+import json
+import os
+import tempfile
+import unittest
+
+from basedatos import BaseDatos
+from cuentas import CREDITO
+from datos_sinteticos import generarBase, mesRelativo
+from importar_pagos import importarPagos
+
+
+class TestValoresInvalidos(unittest.TestCase):
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        ruta = os.path.join(self.carpeta.name, "pagos.db")
+        generarBase(ruta, 2000)
+        self.bd = BaseDatos(ruta)
+        self.creditos = [fila[0] for fila in self.bd.consultar("""
+            SELECT PC.idCuentaCredito FROM ProductosContratados PC
+            JOIN PRODUCTOS P ON P.NoIdProducto = PC.idProducto
+            WHERE P.TipoProducto = ? AND PC.plazoPendiente > 0
+            ORDER BY PC.idCuentaCredito LIMIT 3
+        """, (CREDITO,))]
+
+    def tearDown(self):
+        self.bd.cerrar()
+        self.carpeta.cleanup()
+
+    def _saldo(self, idCuenta):
+        return self.bd.consultarUno(
+            "SELECT saldoCapital FROM ProductosContratados WHERE idCuentaCredito = ?", (idCuenta,)
+        )[0]
+
+    def test_nan_y_lista_se_rechazan(self):
+        nan, lista, valido = self.creditos
+        fecha = mesRelativo(0).replace(day=5).isoformat()
+        entrada = os.path.join(self.carpeta.name, "pagos.jsonl")
+        with open(entrada, "w", encoding="utf-8") as archivo:
+            for idCuenta, valor in ((nan, "nan"), (lista, [1]), (valido, None)):
+                archivo.write(json.dumps({"idCuentaCredito": idCuenta, "fechaPago": fecha,
+                                          "valorPagado": valor}) + "\n")
+        saldos = {idc: self._saldo(idc) for idc in self.creditos}
+
+        rechazos = os.path.join(self.carpeta.name, "rechazos.csv")
+        r = importarPagos(self.bd, entrada, rechazos)
+
+        self.assertEqual((r.leidas, r.aplicadas, r.rechazadas), (3, 1, 2))
+        self.assertEqual(self._saldo(nan), saldos[nan])
+        self.assertEqual(self._saldo(lista), saldos[lista])
+        self.assertLess(self._saldo(valido), saldos[valido])
+        self.assertIsNone(self.bd.consultarUno(
+            "SELECT 1 FROM Transacciones WHERE valorPagado IS NULL"
+        ))
+        with open(rechazos, newline="", encoding="utf-8") as archivo:
+            motivos = [fila["motivo"] for fila in csv.DictReader(archivo)]
+        self.assertEqual(motivos, ["Valor inválido.", "Valor inválido."])
+
+    def test_sobrepago_se_rechaza(self):
+        sobrepago, valido, _ = self.creditos
+        fecha = mesRelativo(0).replace(day=5).isoformat()
+        entrada = os.path.join(self.carpeta.name, "pagos.csv")
+        saldos = {idc: self._saldo(idc) for idc in self.creditos}
+        with open(entrada, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.writer(archivo)
+            escritor.writerow(["idCuentaCredito", "fechaPago", "valorPagado"])
+            escritor.writerow([sobrepago, fecha, saldos[sobrepago] * 10])
+            escritor.writerow([valido, fecha, ""])
+
+        rechazos = os.path.join(self.carpeta.name, "rechazos.csv")
+        r = importarPagos(self.bd, entrada, rechazos)
+
+        self.assertEqual((r.leidas, r.aplicadas, r.rechazadas), (2, 1, 1))
+        self.assertEqual(self._saldo(sobrepago), saldos[sobrepago])
+        self.assertIsNone(self.bd.consultarUno(
+            "SELECT 1 FROM Transacciones WHERE idCuentaCredito = ? AND mesPago = ?", (sobrepago, fecha[:7])
+        ))
+        with open(rechazos, newline="", encoding="utf-8") as archivo:
+            motivos = [fila["motivo"] for fila in csv.DictReader(archivo)]
+        self.assertEqual(motivos, ["El valor supera el saldo del crédito más el interés del mes."])
+
+
+if __name__ == "__main__":
+    unittest.main()
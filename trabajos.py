@@ -0,0 +1,130 @@
+"""
+Despacho de trabajos de base de datos fuera del hilo de la interfaz.
+
+Los manejadores de los botones no ejecutan SQL directamente: envían una función
+al Despachador, que la corre en un QThreadPool. Cada hilo toma prestada una
+conexión del pool de BaseDatos mientras dura la consulta, y el resultado (o la
+excepción) vuelve al hilo de la interfaz por señales de Qt, donde se pinta.
+Cada trabajo queda medido en instrumentacion.METRICAS (familia 'trabajo').
+"""
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from basedatos import NUM_LECTORES
+from instrumentacion import accion
+
+
+class SenalesTrabajo(QObject):
+    terminado = pyqtSignal(object)
+    fallido = pyqtSignal(object)
+    finalizado = pyqtSignal()
+
+
+class Trabajo(QRunnable):
+    """
+    Una función a ejecutar en segundo plano. Si se cancela antes de terminar,
+    su resultado se descarta y no se llama a ningún manejador.
+    """
+
+    def __init__(self, funcion, args, kwargs):
+        super().__init__()
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.senales = SenalesTrabajo()
+        self._cancelado = threading.Event()
+        # El Despachador guarda la referencia hasta que el trabajo termina
+        self.setAutoDelete(False)
+
+    def cancelar(self):
+        self._cancelado.set()
+
+    def cancelado(self):
+        return self._cancelado.is_set()
+
+    def run(self):
+        try:
+            if self.cancelado():
+                return
+            nombre = getattr(self.funcion, "__qualname__", repr(self.funcion))
+            try:
+                with accion(nombre, familia="trabajo"):
+                    resultado = self.funcion(*self.args, **self.kwargs)
+            except Exception as e:
+                if not self.cancelado():
+                    self.senales.fallido.emit(e)
+                return
+            if not self.cancelado():
+                self.senales.terminado.emit(resultado)
+        finally:
+            self.senales.finalizado.emit()
+
+
+class Despachador(QObject):
+    """
+    Cola de trabajos sobre un QThreadPool. Emite 'ocupado' cuando hay trabajos
+    en curso para que la ventana muestre un indicador y permita cancelarlos.
+    """
+
+    ocupado = pyqtSignal(bool)
+
+    def __init__(self, maxHilos=NUM_LECTORES, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(maxHilos)
+        self.activos = set()
+
+    def enviar(self, funcion, *args, alTerminar=None, alFallar=None, **kwargs):
+        """
+        Ejecuta funcion(*args, **kwargs) en segundo plano. alTerminar recibe el
+        resultado y alFallar la excepción; ambos corren en el hilo de la interfaz.
+        """
+        trabajo = Trabajo(funcion, args, kwargs)
+        if alTerminar is not None:
+            trabajo.senales.terminado.connect(alTerminar)
+        if alFallar is not None:
+            trabajo.senales.fallido.connect(alFallar)
+        trabajo.senales.finalizado.connect(lambda: self._finalizar(trabajo))
+
+        self.activos.add(trabajo)
+        if len(self.activos) == 1:
+            self.ocupado.emit(True)
+        self.pool.start(trabajo)
+        return trabajo
+
+    def _finalizar(self, trabajo):
+        self.activos.discard(trabajo)
+        if not self.activos:
+            self.ocupado.emit(False)
+
+    def cancelar(self, trabajo):
+        """
+        Saca el trabajo de la cola si no ha empezado; si está corriendo, su resultado se descarta.
+        """
+        trabajo.cancelar()
+        if self.pool.tryTake(trabajo):
+            self._finalizar(trabajo)
+
+    def cancelarTodo(self):
+        """
+        Cancela los trabajos pendientes y descarta el resultado de los que estén corriendo.
+        """
+        for trabajo in list(self.activos):
+            self.cancelar(trabajo)
+
+    def esperar(self, milisegundos=-1):
+        return self.pool.waitForDone(milisegundos)
+
+
+_despachador = None
+
+
+def obtenerDespachador():
+    """
+    Despachador compartido por todas las vistas. Debe crearse desde el hilo de la interfaz.
+    """
+    global _despachador
+    if _despachador is None:
+        _despachador = Despachador()
+    return _despachador
@@ -1,11 +1,16 @@
-import sqlite3
-from datetime import datetime
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QLineEdit, QPushButton,
     QMessageBox, QTextEdit, QFileDialog
 )
-from PyQt5.QtPrintSupport import QPrinter
-from PyQt5.QtGui import QTextDocument
+
+from basedatos import obtenerBD
+from cola_escritura import obtenerCola
+from instrumentacion import accion, medirAccion
+from recibos_pdf import guardarRecibo
+from servicios import (
+    OperacionInvalida, ServicioBanco, SolicitudPago, SolicitudMovimiento, hoy
+)
+from trabajos import obtenerDespachador
 
 class TransaccionesGUI(QWidget):
     """
@@ -16,7 +21,8 @@ class TransaccionesGUI(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Transacciones – Créditos y Ahorros")
-        self.conn = sqlite3.connect("basemibanco.db")
+        self.servicio = ServicioBanco(obtenerBD(), obtenerCola())
+        self.trabajos = obtenerDespachador()
         self.setStyleSheet(self.estilos())  # Aplicar estilo a los botones
         self.init_ui()
 
@@ -75,7 +81,9 @@ class TransaccionesGUI(QWidget):
 
     def guardar_pdf(self):
         """
-        Guarda el contenido del recibo en un archivo PDF usando QPrinter.
+        Guarda el contenido del recibo en un archivo PDF. El diálogo corre en la
+        interfaz; el PDF lo genera recibos_pdf.guardarRecibo en segundo plano.
+        Solo se mide lo que pasa después de cerrar el diálogo, no el tiempo del usuario.
         """
         contenido = self.recibo.toPlainText()
         if not contenido.strip():
@@ -83,183 +91,86 @@ class TransaccionesGUI(QWidget):
             return
 
         ruta, _ = QFileDialog.getSaveFileName(self, "Guardar recibo como PDF", "", "Archivos PDF (*.pdf)")
-        if ruta:
-            printer = QPrinter(QPrinter.HighResolution)
-            printer.setOutputFormat(QPrinter.PdfFormat)
-            printer.setOutputFileName(ruta)
-
-            doc = QTextDocument()
-            doc.setPlainText(contenido)
-            doc.print_(printer)
-
-            QMessageBox.information(self, "PDF Guardado", f"Recibo guardado exitosamente en:\n{ruta}")
-
-    def tipo_producto(self, cuenta):
-        c = self.conn.cursor()
-        c.execute("""
-            SELECT P.TipoProducto
-            FROM PRODUCTOSCONTRATADOS PC
-            JOIN PRODUCTOS P ON PC.idProducto = P.NoIdProducto
-            WHERE PC.idCuentaCredito = ?
-        """, (cuenta,))
-        r = c.fetchone()
-        return r[0] if r else None
-
+        if not ruta:
+            return
+        with accion(f"{__name__}.TransaccionesGUI.guardar_pdf"):
+            self.trabajos.enviar(
+                guardarRecibo, ruta, contenido,
+                alTerminar=lambda r: QMessageBox.information(self, "PDF Guardado", f"Recibo guardado exitosamente en:\n{r}"),
+                alFallar=lambda e: QMessageBox.critical(self, "Error", f"No se pudo guardar el PDF: {e}")
+            )
+
+    def mostrar_error(self, e):
+        if isinstance(e, OperacionInvalida):
+            self.recibo.setText(str(e))
+        else:
+            self.recibo.setText(f"Error: {e}")
+
+    @medirAccion
     def consultar_cuota(self):
         idc = self.id_credito.text()
-        if self.tipo_producto(idc) != 1:
-            self.recibo.setText("No es un crédito.")
-            return
-
-        c = self.conn.cursor()
-        c.execute("""
-            SELECT saldoCapital, plazoPendiente, P.Remuneracion
-            FROM PRODUCTOSCONTRATADOS PC
-            JOIN PRODUCTOS P ON PC.idProducto = P.NoIdProducto
-            WHERE PC.idCuentaCredito = ?
-        """, (idc,))
-        datos = c.fetchone()
-        if not datos or datos[1] <= 0:
-            self.recibo.setText("No hay cuotas pendientes.")
-            return
-
-        saldo, plazo, interes = datos
-        capital = saldo / plazo
-        interes_mensual = saldo * (interes / 100)
-        total = capital + interes_mensual
+        self.trabajos.enviar(self.servicio.cotizarCuota, idc,
+                             alTerminar=self.mostrar_cuota, alFallar=self.mostrar_error)
 
+    def mostrar_cuota(self, cuota):
         self.recibo.setText(f"""
         CUOTA A PAGAR:
-        Capital: {capital:.2f}
-        Interés: {interes_mensual:.2f}
-        Total: {total:.2f}
-        Plazo pendiente: {plazo} meses
+        Capital: {cuota.capital:.2f}
+        Interés: {cuota.interes:.2f}
+        Total: {cuota.total:.2f}
+        Plazo pendiente: {cuota.plazoPendiente} meses
         """)
 
+    @medirAccion
     def pagar_cuota(self):
-        idc = self.id_credito.text()
-        if self.tipo_producto(idc) != 1:
-            self.recibo.setText("No es un crédito.")
-            return
-
-        c = self.conn.cursor()
-        c.execute("""
-            SELECT saldoCapital, plazoPendiente, P.Remuneracion
-            FROM PRODUCTOSCONTRATADOS PC
-            JOIN PRODUCTOS P ON PC.idProducto = P.NoIdProducto
-            WHERE PC.idCuentaCredito = ?
-        """, (idc,))
-        datos = c.fetchone()
-        if not datos or datos[1] <= 0:
-            self.recibo.setText("Crédito ya pagado.")
-            return
-
-        saldo, plazo, interes = datos
-        capital = saldo / plazo
-        interes_mes = saldo * (interes / 100)
-        total = capital + interes_mes
-
-        nuevo_saldo = max(0, saldo - capital)
-        nuevo_plazo = max(0, plazo - 1)
-        fecha = datetime.now().strftime('%Y-%m-%d')
-
-        c.execute("INSERT INTO TRANSACCIONES VALUES(NULL,?,?,?)", (idc, fecha, total))
-        id_transaccion = c.lastrowid
-
-        c.execute("""
-            UPDATE PRODUCTOSCONTRATADOS
-            SET saldoCapital=?, plazoPendiente=?, sumatoriaInteresesPagados=sumatoriaInteresesPagados+?
-            WHERE idCuentaCredito=?
-        """, (nuevo_saldo, nuevo_plazo, interes_mes, idc))
-        self.conn.commit()
-
-        c.execute("SELECT idCliente FROM PRODUCTOSCONTRATADOS WHERE idCuentaCredito=?", (idc,))
-        id_cliente = c.fetchone()[0]
-        c.execute("SELECT nombre, apellido FROM CLIENTES WHERE noIdCliente=?", (id_cliente,))
-        nombre, apellido = c.fetchone()
+        solicitud = SolicitudPago(self.id_credito.text(), hoy())
+        self.trabajos.enviar(self.servicio.pagarCuota, solicitud,
+                             alTerminar=self.mostrar_pago, alFallar=self.mostrar_error)
 
+    def mostrar_pago(self, pago):
         self.recibo.setText(f"""
         ====== RECIBO DE PAGO CRÉDITO ======
-        Factura Número: {id_transaccion}
-        Cliente: {nombre} {apellido}
-        Valor pagado: {total:.2f}
-        Nuevo saldo: {nuevo_saldo:.2f}
-        Plazo restante: {nuevo_plazo} meses
+        Factura Número: {pago.idTransaccion}
+        Cliente: {pago.cuenta.nombre} {pago.cuenta.apellido}
+        Valor pagado: {pago.valor:.2f}
+        Nuevo saldo: {pago.nuevoSaldo:.2f}
+        Plazo restante: {pago.nuevoPlazo} meses
         ====================================
         """)
 
+    @medirAccion
     def consultar_saldo_ahorros(self):
         idc = self.id_ahorro.text()
-        if self.tipo_producto(idc) != 2:
-            self.recibo.setText("No es una cuenta de ahorros.")
-            return
+        self.trabajos.enviar(self.servicio.consultarSaldoAhorros, idc,
+                             alTerminar=self.mostrar_saldo_ahorros, alFallar=self.mostrar_error)
 
-        c = self.conn.cursor()
-        c.execute("""
-            SELECT saldoCapital, P.Remuneracion
-            FROM PRODUCTOSCONTRATADOS PC
-            JOIN PRODUCTOS P ON PC.idProducto = P.NoIdProducto
-            WHERE PC.idCuentaCredito = ?
-        """, (idc,))
-        datos = c.fetchone()
-        if not datos:
-            self.recibo.setText("Cuenta no encontrada.")
-            return
-
-        saldo, interes = datos
-        proyeccion = saldo * (1 + interes / 100)
+    def mostrar_saldo_ahorros(self, saldo):
         self.recibo.setText(f"""
         SALDO AHORROS:
-        Saldo actual: {saldo:.2f}
-        Interés mensual: {interes}%
-        Proyección fin de mes: {proyeccion:.2f}
+        Saldo actual: {saldo.saldo:.2f}
+        Interés mensual: {saldo.interes}%
+        Proyección fin de mes: {saldo.proyeccion:.2f}
         """)
 
+    @medirAccion
     def transaccion_ahorros(self):
-        idc = self.id_ahorro.text()
-        if self.tipo_producto(idc) != 2:
-            self.recibo.setText("No es una cuenta de ahorros.")
-            return
-
         try:
-            val = float(self.valor.text())
-        except ValueError:
-            self.recibo.setText("Error: valor inválido.")
-            return
-
-        c = self.conn.cursor()
-        c.execute("SELECT saldoCapital FROM PRODUCTOSCONTRATADOS WHERE idCuentaCredito=?", (idc,))
-        row = c.fetchone()
-        if not row:
-            self.recibo.setText("Cuenta no encontrada.")
-            return
-
-        saldo_actual = row[0]
-        nuevo_saldo = saldo_actual + val
-
-        if nuevo_saldo < 0:
-            self.recibo.setText("Fondos insuficientes.")
+            solicitud = SolicitudMovimiento.desdeTexto(self.id_ahorro.text(), self.valor.text())
+        except OperacionInvalida as e:
+            self.mostrar_error(e)
             return
 
-        fecha = datetime.now().strftime('%Y-%m-%d')
-        c.execute("INSERT INTO TRANSACCIONES VALUES(NULL,?,?,?)", (idc, fecha, val))
-        id_transaccion = c.lastrowid
-
-        c.execute("UPDATE PRODUCTOSCONTRATADOS SET saldoCapital=? WHERE idCuentaCredito=?", (nuevo_saldo, idc))
-        self.conn.commit()
-
-        c.execute("SELECT idCliente FROM PRODUCTOSCONTRATADOS WHERE idCuentaCredito=?", (idc,))
-        id_cliente = c.fetchone()[0]
-        c.execute("SELECT nombre, apellido FROM CLIENTES WHERE noIdCliente=?", (id_cliente,))
-        nombre, apellido = c.fetchone()
+        self.trabajos.enviar(self.servicio.consignarRetirar, solicitud,
+                             alTerminar=self.mostrar_movimiento, alFallar=self.mostrar_error)
 
+    def mostrar_movimiento(self, mov):
         self.recibo.setText(f"""
         ====== RECIBO TRANSACCIÓN AHORROS ======
-        Nº Factura: {id_transaccion}
-        Cliente: {nombre} {apellido}
-        Fecha: {fecha}
-        Valor transacción: {val:.2f}
-        Nuevo saldo: {nuevo_saldo:.2f}
+        Nº Factura: {mov.idTransaccion}
+        Cliente: {mov.cuenta.nombre} {mov.cuenta.apellido}
+        Fecha: {mov.fecha}
+        Valor transacción: {mov.valor:.2f}
+        Nuevo saldo: {mov.nuevoSaldo:.2f}
         ========================================
         """)
 